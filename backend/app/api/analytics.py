@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.schemas.analytics import PortfolioAnalytics
+from app.services.portfolio_analytics import PortfolioAnalyticsService
+
+router = APIRouter()
+
+@router.get("/portfolio", response_model=PortfolioAnalytics)
+def get_portfolio_analytics(db: Session = Depends(get_db)):
+    """
+    Portfolio totals by currency, facility type, governing law and agent bank
+
+    Includes covenant status breakdowns and document counts. Served from
+    the portfolio_summary table, which is refreshed for the affected
+    groups whenever loans, covenants or documents change.
+    """
+    return PortfolioAnalyticsService(db).portfolio()
+
+@router.post("/portfolio/rebuild", response_model=PortfolioAnalytics)
+def rebuild_portfolio_analytics(db: Session = Depends(get_db)):
+    """Recompute the whole portfolio summary from the loan, covenant and document tables"""
+    service = PortfolioAnalyticsService(db)
+    service.rebuild()
+    return service.portfolio()
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.core.database import get_db
-from app.models.bank import Bank
-from app.schemas.bank import BankCreate, BankResponse, BankUpdate, BankFilter
+from app.core.etag import not_modified
+from app.core.pagination import fetch_page, paginate
+from app.models.bank import Bank, rating_rank
+from app.models.loan_proposal import LoanProposal
+from app.models.quotation import Quotation
+from app.schemas.bank import (
+    BankCreate, BankResponse, BankUpdate, BankFilter, BankSuggestion, BankRecommendationResponse
+)
+from app.services.bank_directory import get_bank_directory
+from app.services.bank_recommender import BankRecommender
 
 router = APIRouter()
 
@@ -24,8 +32,11 @@ def create_bank(bank: BankCreate, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[BankResponse])
 def list_banks(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     country: Optional[str] = None,
     bank_type: Optional[str] = None,
     risk_appetite: Optional[str] = None,
@@ -40,6 +51,8 @@ def list_banks(
     - bank_type: Commercial, Investment, Development
     - risk_appetite: Conservative, Moderate, Aggressive
     - is_active: Only active banks (default: true)
+
+    Pass the X-Next-Cursor response header back as cursor for the next page.
     """
     query = db.query(Bank)
 
@@ -55,8 +68,12 @@ def list_banks(
     if risk_appetite:
         query = query.filter(Bank.risk_appetite == risk_appetite)
 
-    banks = query.offset(skip).limit(limit).all()
-    return banks
+    query = paginate(query, Bank.created_at, Bank.id, skip, limit, cursor)
+    cached = not_modified(request, response, "banks", query.with_entities(Bank.id, Bank.version).all())
+    if cached:
+        return cached
+
+    return fetch_page(query, Bank.created_at, Bank.id, response, limit)
 
 @router.get("/search", response_model=List[BankResponse])
 def search_banks(
@@ -72,60 +89,109 @@ def search_banks(
     - loan_amount: Find banks that can handle this amount
     - sector: Find banks interested in this sector
     - region: Find banks serving this region
-    - min_rating: Minimum credit rating (e.g., 'A', 'AA')
-    """
-    query = db.query(Bank).filter(Bank.is_active == True)
-
-    if loan_amount:
-        query = query.filter(
-            Bank.min_loan_amount <= loan_amount,
-            Bank.max_loan_amount >= loan_amount
-        )
+    - min_rating: Minimum credit rating (e.g., 'A', 'AA', 'Baa2'); unrated banks are excluded
 
-    # Note: Sector and region filters require JSON query support
-    # For now, we'll return all and filter in Python
-    banks = query.all()
-
-    # Python-side filtering for JSON fields
-    if sector and banks:
-        banks = [b for b in banks if b.preferred_sectors and sector in b.preferred_sectors]
+    Answered from the in-memory bank directory: each filter is a set
+    intersection over its precomputed index. A bank with no maximum loan
+    amount matches any loan_amount above its minimum.
+    """
+    min_rank = None
+    if min_rating:
+        min_rank = rating_rank(min_rating)
+        if min_rank is None:
+            raise HTTPException(status_code=400, detail=f"Unknown credit rating: {min_rating}")
+
+    return get_bank_directory(db).search(loan_amount, sector, region, min_rank)
+
+@router.get("/suggestions/{proposal_id}", response_model=List[BankSuggestion])
+def suggest_banks(
+    proposal_id: int,
+    min_share: float = Query(10.0, gt=0, le=100),
+    include_requested: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Banks that can take at least min_share % of a proposal's requested amount
 
-    if region and banks:
-        banks = [b for b in banks if b.regions_served and region in b.regions_served]
+    A bank qualifies when its ticket size range reaches min_share % of the
+    deal and its minimum ticket is not above the whole deal. Answered by
+    the directory's capacity index, largest possible ticket first. Banks
+    already sent a quotation request are left out unless include_requested.
+    """
+    proposal = db.query(LoanProposal.requested_amount).filter(LoanProposal.id == proposal_id).first()
+    if not proposal:
+        raise HTTPException(status_code=404, detail="Loan proposal not found")
+
+    deal_amount = proposal.requested_amount
+    if not deal_amount or deal_amount <= 0:
+        return []
+    requested = {
+        bank_id for (bank_id,) in
+        db.query(Quotation.bank_id).filter(Quotation.loan_proposal_id == proposal_id)
+    }
+    directory = get_bank_directory(db)
+
+    suggestions = []
+    for bank_id in directory.ids_for_share(deal_amount, min_share / 100):
+        if bank_id in requested and not include_requested:
+            continue
+        bank = directory.banks[bank_id]
+        max_ticket = deal_amount if bank.max_loan_amount is None else min(bank.max_loan_amount, deal_amount)
+        suggestions.append(BankSuggestion(
+            bank=BankResponse.from_orm(bank),
+            max_ticket=max_ticket,
+            max_share=round(100 * max_ticket / deal_amount, 2),
+            already_requested=bank_id in requested
+        ))
+
+    suggestions.sort(key=lambda s: (-s.max_ticket, s.bank.id))
+    return suggestions
+
+@router.get("/recommendations/{proposal_id}", response_model=List[BankRecommendationResponse])
+def recommend_banks(
+    proposal_id: int,
+    k: int = Query(10, ge=1, le=100),
+    include_requested: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    The k banks most likely to quote on a proposal, best first
 
-    return banks
+    Scores sector and region fit, capacity, risk appetite against the
+    client research, pricing, track record and past response rate (see
+    BankRecommender). Use the ids as bank_ids when requesting quotations.
+    Banks already sent a request are left out unless include_requested.
+    """
+    proposal = db.query(LoanProposal).filter(LoanProposal.id == proposal_id).first()
+    if not proposal:
+        raise HTTPException(status_code=404, detail="Loan proposal not found")
+
+    exclude = None
+    if not include_requested:
+        exclude = {
+            bank_id for (bank_id,) in
+            db.query(Quotation.bank_id).filter(Quotation.loan_proposal_id == proposal_id)
+        }
+
+    return [
+        BankRecommendationResponse(
+            bank=BankResponse.from_orm(r.bank),
+            score=r.score,
+            max_ticket=r.max_ticket,
+            features=r.features
+        )
+        for r in BankRecommender(db).recommend(proposal, k, exclude)
+    ]
 
 @router.get("/stats")
 def get_bank_stats(db: Session = Depends(get_db)):
-    """Get statistics about the bank directory"""
-    total_banks = db.query(Bank).filter(Bank.is_active == True).count()
-
-    by_country = db.query(
-        Bank.headquarters_country,
-        func.count(Bank.id)
-    ).filter(Bank.is_active == True).group_by(Bank.headquarters_country).all()
-
-    by_type = db.query(
-        Bank.bank_type,
-        func.count(Bank.id)
-    ).filter(Bank.is_active == True).group_by(Bank.bank_type).all()
-
-    by_risk = db.query(
-        Bank.risk_appetite,
-        func.count(Bank.id)
-    ).filter(Bank.is_active == True).group_by(Bank.risk_appetite).all()
-
-    return {
-        "total_banks": total_banks,
-        "by_country": {country: count for country, count in by_country},
-        "by_type": {type_: count for type_, count in by_type},
-        "by_risk_appetite": {risk: count for risk, count in by_risk}
-    }
+    """Get statistics about the bank directory (counts precomputed in the directory snapshot)"""
+    return get_bank_directory(db).stats()
 
 @router.get("/{bank_id}", response_model=BankResponse)
 def get_bank(bank_id: int, db: Session = Depends(get_db)):
     """Get bank details"""
-    bank = db.query(Bank).filter(Bank.id == bank_id).first()
+    bank = get_bank_directory(db).get(bank_id)
 
     if not bank:
         raise HTTPException(status_code=404, detail="Bank not found")
@@ -148,6 +214,3 @@ def update_bank(bank_id: int, bank_update: BankUpdate, db: Session = Depends(get
     db.refresh(bank)
 
     return bank
-
-# Import for stats endpoint
-from sqlalchemy import func
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.core.database import get_db
+from app.core.etag import not_modified
+from app.core.pagination import fetch_page, paginate
 from app.models.covenant import Covenant, CovenantStatus
-from app.schemas.covenant import CovenantResponse, CovenantUpdate
+from app.schemas.covenant import (
+    CovenantResponse, CovenantUpdate, CovenantEvaluationRequest, CovenantEvaluationResponse
+)
+from app.services.covenant_evaluator import CovenantEvaluator, covenant_status
 
 router = APIRouter()
 
@@ -19,19 +24,30 @@ def get_covenant(covenant_id: int, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[CovenantResponse])
 def list_covenants(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     status: CovenantStatus = None,
     db: Session = Depends(get_db)
 ):
-    """List all covenants, optionally filtered by status"""
+    """
+    List all covenants, optionally filtered by status
+
+    Pass the X-Next-Cursor response header back as cursor for the next page.
+    """
     query = db.query(Covenant)
 
     if status:
         query = query.filter(Covenant.status == status)
 
-    covenants = query.offset(skip).limit(limit).all()
-    return covenants
+    query = paginate(query, Covenant.created_at, Covenant.id, skip, limit, cursor)
+    cached = not_modified(request, response, "covenants", query.with_entities(Covenant.id, Covenant.version).all())
+    if cached:
+        return cached
+
+    return fetch_page(query, Covenant.created_at, Covenant.id, response, limit)
 
 @router.get("/loan/{loan_id}", response_model=List[CovenantResponse])
 def get_loan_covenants(loan_id: int, db: Session = Depends(get_db)):
@@ -69,6 +85,21 @@ def update_covenant(
 
     return covenant
 
+@router.post("/evaluate", response_model=CovenantEvaluationResponse)
+def evaluate_covenants(request: CovenantEvaluationRequest, db: Session = Depends(get_db)):
+    """
+    Re-test every covenant matching a batch of metric observations
+
+    For when a period's financials land: each observation is a loan,
+    metric and value, and every active covenant on that loan and metric
+    with a threshold is re-tested. Returns the status transitions.
+    """
+    return CovenantEvaluator(db).evaluate(
+        ((o.loan_id, o.metric_name, o.value) for o in request.observations),
+        tested_at=request.tested_at,
+        dry_run=request.dry_run
+    )
+
 @router.get("/alerts/at-risk", response_model=List[CovenantResponse])
 def get_at_risk_covenants(db: Session = Depends(get_db)):
     """Get covenants that are at risk of breach (warning or breach status)"""
@@ -82,29 +113,8 @@ def _calculate_covenant_status(
     threshold: float,
     operator: str
 ) -> CovenantStatus:
-    """Calculate covenant status based on current value vs threshold"""
+    """Calculate covenant status based on current value vs threshold (rules in covenant_evaluator)"""
     try:
-        if operator == "<=":
-            if current <= threshold * 0.8:
-                return CovenantStatus.COMPLIANT
-            elif current <= threshold:
-                return CovenantStatus.WARNING
-            else:
-                return CovenantStatus.BREACH
-        elif operator == ">=":
-            if current >= threshold * 1.2:
-                return CovenantStatus.COMPLIANT
-            elif current >= threshold:
-                return CovenantStatus.WARNING
-            else:
-                return CovenantStatus.BREACH
-        elif operator == "==" or operator == "=":
-            tolerance = threshold * 0.05
-            if abs(current - threshold) <= tolerance:
-                return CovenantStatus.COMPLIANT
-            else:
-                return CovenantStatus.BREACH
-        else:
-            return CovenantStatus.UNKNOWN
-    except:
+        return covenant_status(current, threshold, operator)
+    except (TypeError, ValueError):
         return CovenantStatus.UNKNOWN
@@ -1,30 +1,40 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.core.database import get_db
-from app.schemas.document import DocumentResponse
-from app.services.document_service import DocumentService
+from app.core.etag import not_modified
+from app.core.pagination import fetch_page
+from app.models.document import Document, DocumentStatus
+from app.schemas.document import DocumentResponse, DocumentSummary, DocumentTextResponse
+from app.services.document_service import DocumentService, UploadRejected
+from app.services.job_queue import JobQueue, JOB_PROCESS_DOCUMENT
 
 router = APIRouter()
 
 @router.post("/upload", response_model=DocumentResponse)
 async def upload_document(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
     """
-    Upload a loan document and trigger AI extraction
+    Upload a loan document and queue it for AI extraction
 
-    - **file**: PDF document to upload
+    Processing is picked up by the ingestion workers (`python worker.py`).
+
+    - **file**: PDF document to upload (at most `MAX_UPLOAD_SIZE` bytes)
     """
     if not file.filename.endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
 
     service = DocumentService(db)
-    document = await service.upload_document(file)
+    try:
+        document = await service.upload_document(file)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
-    background_tasks.add_task(service.process_document, document.id)
+    # Identical content that was already processed is reused at upload time
+    if document.status != DocumentStatus.COMPLETED:
+        JobQueue(db).enqueue(JOB_PROCESS_DOCUMENT, {"document_id": document.id})
 
     return document
 
@@ -39,11 +49,46 @@ def get_document(document_id: int, db: Session = Depends(get_db)):
 
     return document
 
-@router.get("/", response_model=List[DocumentResponse])
-def list_documents(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """List all documents"""
-    service = DocumentService(db)
-    return service.list_documents(skip=skip, limit=limit)
+@router.get("/{document_id}/text", response_model=DocumentTextResponse)
+def get_document_text(
+    document_id: int,
+    start_page: int = Query(1, ge=1),
+    pages: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Extracted text by page range
+
+    - **start_page**: First page (1-based)
+    - **pages**: Number of pages to return; follow next_page for the rest
+    """
+    text = DocumentService(db).get_text_pages(document_id, start_page, pages)
+
+    if text is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    return text
+
+@router.get("/", response_model=List[DocumentSummary])
+def list_documents(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    List all documents
+
+    Pass the X-Next-Cursor response header back as cursor for the next page.
+    """
+    query = DocumentService(db).list_documents(skip=skip, limit=limit, cursor=cursor)
+    cached = not_modified(request, response, "documents", query.with_entities(Document.id, Document.version).all())
+    if cached:
+        return cached
+
+    return fetch_page(query, Document.created_at, Document.id, response, limit)
 
 @router.post("/{document_id}/process", response_model=DocumentResponse)
 def process_document(document_id: int, db: Session = Depends(get_db)):
@@ -1,11 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import exists, func, select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.etag import not_modified
+from app.core.pagination import fetch_page, paginate
 from app.models.loan_proposal import LoanProposal, ProposalStatus
+from app.models.mla_bid import MLABid
+from app.models.quotation import Quotation
+from app.models.syndicate import Syndicate
 from app.models.client_research import ClientResearch
 from app.models.pitch import Pitch
 from app.schemas.loan_proposal import LoanProposalCreate, LoanProposalResponse, LoanProposalDetail
+from app.services.event_bus import format_sse, get_event_bus, publish
 from app.services.research_agent import ResearchAgent
 from app.services.pitch_generator import PitchGenerator
 
@@ -42,36 +52,68 @@ def create_loan_proposal(
     return db_proposal
 
 @router.get("/{proposal_id}", response_model=LoanProposalDetail)
-def get_loan_proposal(proposal_id: int, db: Session = Depends(get_db)):
+def get_loan_proposal(proposal_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get loan proposal details"""
-    proposal = db.query(LoanProposal).filter(LoanProposal.id == proposal_id).first()
+    # Computed fields come from SQL aggregates instead of loading every bid
+    # and quotation row. The same lookup feeds the ETag, so an unchanged
+    # poll is answered 304 without loading the proposal.
+    mla_bids_count = select(func.count(MLABid.id)).where(
+        MLABid.loan_proposal_id == LoanProposal.id
+    ).scalar_subquery()
+    quotations_count = select(func.count(Quotation.id)).where(
+        Quotation.loan_proposal_id == LoanProposal.id
+    ).scalar_subquery()
+    has_syndicate = exists().where(
+        Syndicate.loan_proposal_id == LoanProposal.id,
+        Syndicate.is_candidate == False
+    )
 
-    if not proposal:
+    row = db.query(LoanProposal.version, mla_bids_count, quotations_count, has_syndicate).filter(
+        LoanProposal.id == proposal_id
+    ).first()
+
+    if not row:
         raise HTTPException(status_code=404, detail="Loan proposal not found")
 
-    # Add computed fields
+    _, mla_bids, quotations, syndicate_exists = row
+    cached = not_modified(request, response, "proposal", proposal_id, tuple(row))
+    if cached:
+        return cached
+
+    proposal = db.query(LoanProposal).filter(LoanProposal.id == proposal_id).first()
     response_data = LoanProposalDetail.from_orm(proposal)
-    response_data.mla_bids_count = len(proposal.mla_bids)
-    response_data.quotations_count = len(proposal.quotations)
-    response_data.has_syndicate = proposal.syndicate is not None
+    response_data.mla_bids_count = mla_bids
+    response_data.quotations_count = quotations
+    response_data.has_syndicate = bool(syndicate_exists)
 
     return response_data
 
 @router.get("/", response_model=List[LoanProposalResponse])
 def list_loan_proposals(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     status: ProposalStatus = None,
     db: Session = Depends(get_db)
 ):
-    """List all loan proposals"""
+    """
+    List all loan proposals
+
+    Pass the X-Next-Cursor response header back as cursor for the next page.
+    """
     query = db.query(LoanProposal)
 
     if status:
         query = query.filter(LoanProposal.status == status)
 
-    proposals = query.offset(skip).limit(limit).all()
-    return proposals
+    query = paginate(query, LoanProposal.created_at, LoanProposal.id, skip, limit, cursor)
+    cached = not_modified(request, response, "proposals", query.with_entities(LoanProposal.id, LoanProposal.version).all())
+    if cached:
+        return cached
+
+    return fetch_page(query, LoanProposal.created_at, LoanProposal.id, response, limit)
 
 @router.post("/{proposal_id}/research", response_model=dict)
 async def trigger_research(proposal_id: int, db: Session = Depends(get_db)):
@@ -101,6 +143,7 @@ async def trigger_research(proposal_id: int, db: Session = Depends(get_db)):
     proposal.status = ProposalStatus.RESEARCH_IN_PROGRESS
     proposal.research_completed = True
     db.commit()
+    publish(proposal.id, "research")
 
     return {"message": "Research completed", "research_id": db_research.id}
 
@@ -150,9 +193,52 @@ async def generate_pitch(proposal_id: int, db: Session = Depends(get_db)):
     proposal.status = ProposalStatus.PITCH_GENERATED
     proposal.pitch_generated = True
     db.commit()
+    publish(proposal.id, "pitch")
 
     return {"message": "Pitch generated", "pitch_id": db_pitch.id}
 
+@router.get("/{proposal_id}/events")
+async def proposal_events(proposal_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    Server-sent events stream of changes to a proposal
+
+    Replaces polling: the client loads the proposal once and refetches a
+    part only when it gets the matching event. Events are "proposal",
+    "research", "pitch", "quotation" and "syndicate". Their data names what
+    changed; it is not the changed resource.
+    """
+    exists = db.query(LoanProposal.id).filter(LoanProposal.id == proposal_id).first()
+    # Don't hold a connection for the life of the stream
+    db.close()
+
+    if not exists:
+        raise HTTPException(status_code=404, detail="Loan proposal not found")
+
+    bus = get_event_bus()
+    queue = bus.subscribe(proposal_id)
+
+    async def stream():
+        try:
+            # Browsers reconnect after this many milliseconds if the stream drops
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=settings.EVENT_STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(message)
+        finally:
+            bus.unsubscribe(proposal_id, queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/{proposal_id}/research")
 def get_research(proposal_id: int, db: Session = Depends(get_db)):
     """Get research data for a proposal"""
@@ -201,6 +287,7 @@ async def _research_and_pitch(
         proposal.research_completed = True
         proposal.status = ProposalStatus.PITCH_GENERATED
         db.commit()
+        publish(proposal_id, "research")
 
         # Generate pitch
         generator = PitchGenerator()
@@ -217,6 +304,7 @@ async def _research_and_pitch(
 
         proposal.pitch_generated = True
         db.commit()
+        publish(proposal_id, "pitch")
 
     except Exception as e:
         print(f"Background research/pitch failed: {e}")
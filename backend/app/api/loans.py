@@ -1,16 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
 from app.core.database import get_db
+from app.core.etag import not_modified
+from app.core.pagination import fetch_page, paginate
+from app.models.covenant import Covenant
 from app.models.loan import Loan
 from app.schemas.loan import LoanResponse, LoanWithCovenants
 
 router = APIRouter()
 
 @router.get("/{loan_id}", response_model=LoanWithCovenants)
-def get_loan(loan_id: int, db: Session = Depends(get_db)):
+def get_loan(loan_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get loan details with covenants"""
-    loan = db.query(Loan).filter(Loan.id == loan_id).first()
+    versions = db.query(Loan.version, Covenant.id, Covenant.version).outerjoin(
+        Covenant, Covenant.loan_id == Loan.id
+    ).filter(Loan.id == loan_id).order_by(Covenant.id).all()
+
+    if not versions:
+        raise HTTPException(status_code=404, detail="Loan not found")
+
+    cached = not_modified(request, response, "loan", loan_id, versions)
+    if cached:
+        return cached
+
+    loan = db.query(Loan).options(selectinload(Loan.covenants)).filter(Loan.id == loan_id).first()
 
     if not loan:
         raise HTTPException(status_code=404, detail="Loan not found")
@@ -18,10 +32,25 @@ def get_loan(loan_id: int, db: Session = Depends(get_db)):
     return loan
 
 @router.get("/", response_model=List[LoanResponse])
-def list_loans(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """List all loans"""
-    loans = db.query(Loan).offset(skip).limit(limit).all()
-    return loans
+def list_loans(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    List all loans
+
+    Pass the X-Next-Cursor response header back as cursor for the next page.
+    """
+    query = paginate(db.query(Loan), Loan.created_at, Loan.id, skip, limit, cursor)
+    cached = not_modified(request, response, "loans", query.with_entities(Loan.id, Loan.version).all())
+    if cached:
+        return cached
+
+    return fetch_page(query, Loan.created_at, Loan.id, response, limit)
 
 @router.get("/document/{document_id}", response_model=List[LoanResponse])
 def get_loans_by_document(document_id: int, db: Session = Depends(get_db)):
@@ -1,14 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from typing import List
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, Response
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional
 from datetime import datetime
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.etag import not_modified
+from app.core.pagination import fetch_page, paginate
 from app.models.quotation import Quotation, QuotationStatus
 from app.models.bank import Bank
 from app.models.loan_proposal import LoanProposal, ProposalStatus
 from app.models.client_research import ClientResearch
 from app.schemas.quotation import QuotationCreate, QuotationResponse, QuotationUpdate, QuotationWithBank
+from app.services.bank_directory import BankRecord, get_bank_directory
+from app.services.event_bus import publish
 from app.services.quotation_generator import QuotationGenerator
+from app.services.syndicate_service import SyndicateService
 
 router = APIRouter()
 
@@ -43,11 +50,22 @@ async def create_quotation_requests(
         )
 
     # Validate banks exist
-    banks = db.query(Bank).filter(Bank.id.in_(quotation_request.bank_ids)).all()
+    directory = get_bank_directory(db)
+    banks = directory.get_many(dict.fromkeys(quotation_request.bank_ids))
 
     if len(banks) != len(quotation_request.bank_ids):
         raise HTTPException(status_code=400, detail="Some banks not found")
 
+    # Pre-screen by capacity: a bank whose minimum ticket exceeds the whole
+    # request cannot take part, so no quotation (or LLM call) is made for it.
+    # The capacity index only holds active banks, so inactive ones are skipped too.
+    can_lend = directory.capacity.overlapping(0, quotation_request.requested_amount)
+    skipped = [b for b in banks if b.id not in can_lend]
+    banks = [b for b in banks if b.id in can_lend]
+
+    if not banks:
+        raise HTTPException(status_code=400, detail="None of the selected banks lends at the requested amount")
+
     # Create quotation records
     quotations_created = []
     for bank in banks:
@@ -66,6 +84,8 @@ async def create_quotation_requests(
     # Update proposal status
     proposal.status = ProposalStatus.SENT_TO_BANKS
     db.commit()
+    publish(proposal.id, "quotation", {"quotation_ids": [q.id for q in quotations_created]})
+    publish(proposal.id, "proposal", {"status": proposal.status.value})
 
     # Trigger AI quotation generation in background
     background_tasks.add_task(
@@ -79,36 +99,62 @@ async def create_quotation_requests(
         "proposal_id": proposal.id,
         "banks": [{"id": b.id, "name": b.name} for b in banks],
         "quotations_created": len(quotations_created),
+        "skipped_banks": [
+            {
+                "id": b.id,
+                "name": b.name,
+                "reason": "Minimum ticket above the requested amount" if b.is_active else "Bank is inactive"
+            }
+            for b in skipped
+        ],
         "status": "AI is generating responses..."
     }
 
 @router.get("/", response_model=List[QuotationResponse])
 def list_quotations(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     status: QuotationStatus = None,
     db: Session = Depends(get_db)
 ):
-    """List all quotations"""
+    """
+    List all quotations, in the order they were sent
+
+    Pass the X-Next-Cursor response header back as cursor for the next page.
+    """
     query = db.query(Quotation)
 
     if status:
         query = query.filter(Quotation.status == status)
 
-    quotations = query.offset(skip).limit(limit).all()
-    return quotations
+    query = paginate(query, Quotation.sent_at, Quotation.id, skip, limit, cursor)
+    cached = not_modified(request, response, "quotations", query.with_entities(Quotation.id, Quotation.version).all())
+    if cached:
+        return cached
+
+    return fetch_page(query, Quotation.sent_at, Quotation.id, response, limit)
 
 @router.get("/proposal/{proposal_id}", response_model=List[QuotationWithBank])
-def get_quotations_for_proposal(proposal_id: int, db: Session = Depends(get_db)):
+def get_quotations_for_proposal(proposal_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get all quotations for a loan proposal"""
-    quotations = db.query(Quotation).filter(
+    versions = db.query(Quotation.id, Quotation.version, Bank.version).join(
+        Bank, Bank.id == Quotation.bank_id
+    ).filter(Quotation.loan_proposal_id == proposal_id).order_by(Quotation.id).all()
+    cached = not_modified(request, response, "proposal_quotations", proposal_id, versions)
+    if cached:
+        return cached
+
+    quotations = db.query(Quotation).options(joinedload(Quotation.bank)).filter(
         Quotation.loan_proposal_id == proposal_id
     ).all()
 
-    # Enhance with bank details
+    # Enhance with bank details, loaded in the same query
     result = []
     for q in quotations:
-        bank = db.query(Bank).filter(Bank.id == q.bank_id).first()
+        bank = q.bank
         q_dict = QuotationResponse.from_orm(q).dict()
         q_dict['bank_name'] = bank.name if bank else None
         q_dict['bank_country'] = bank.headquarters_country if bank else None
@@ -150,8 +196,13 @@ def update_quotation(
     quotation.status = QuotationStatus.RESPONDED
     quotation.responded_at = datetime.utcnow()
 
+    db.commit()
+
+    # Keep the proposal's live syndicate current
+    syndicate = SyndicateService(db).quotation_changed(quotation)
     db.commit()
     db.refresh(quotation)
+    _publish_quotation(quotation, syndicate is not None)
 
     return quotation
 
@@ -176,12 +227,49 @@ async def regenerate_quotation(quotation_id: int, db: Session = Depends(get_db))
         ClientResearch.loan_proposal_id == proposal.id
     ).first()
 
-    bank = db.query(Bank).filter(Bank.id == quotation.bank_id).first()
+    bank = get_bank_directory(db).get(quotation.bank_id)
 
     # Generate new quotation
     generator = QuotationGenerator()
 
-    loan_proposal_data = {
+    ai_quotation = await generator.generate_quotation(
+        bank.name,
+        _bank_profile(bank),
+        _proposal_data(proposal),
+        _research_data(research)
+    )
+
+    def save() -> bool:
+        """Update the quotation and re-optimize; blocking, so it runs off the event loop"""
+        _apply_ai_quotation(quotation, ai_quotation)
+        db.commit()
+
+        syndicate = SyndicateService(db).quotation_changed(quotation)
+        db.commit()
+        db.refresh(quotation)
+        return syndicate is not None
+
+    _publish_quotation(quotation, await asyncio.to_thread(save))
+
+    return {
+        "message": "Quotation regenerated successfully",
+        "quotation_id": quotation.id,
+        "status": quotation.status,
+        "will_participate": ai_quotation.get('will_participate')
+    }
+
+def _publish_quotation(quotation: Quotation, syndicate_changed: bool):
+    """Tell the proposal's event stream a quotation (and possibly its syndicate) changed"""
+    publish(quotation.loan_proposal_id, "quotation", {
+        "quotation_ids": [quotation.id],
+        "status": quotation.status.value
+    })
+    if syndicate_changed:
+        publish(quotation.loan_proposal_id, "syndicate")
+
+def _proposal_data(proposal: LoanProposal) -> dict:
+    """Loan request details passed to the quotation generator"""
+    return {
         'client_name': proposal.client_name,
         'client_industry': proposal.client_industry,
         'requested_amount': proposal.requested_amount,
@@ -191,7 +279,19 @@ async def regenerate_quotation(quotation_id: int, db: Session = Depends(get_db))
         'max_acceptable_rate': proposal.max_acceptable_rate
     }
 
-    bank_profile = {
+def _research_data(research: ClientResearch) -> dict:
+    """Borrower research passed to the quotation generator"""
+    return {
+        'annual_revenue': research.annual_revenue,
+        'credit_rating': research.credit_rating,
+        'debt_to_equity_ratio': research.debt_to_equity_ratio,
+        'risk_assessment': research.risk_assessment,
+        'strengths': research.strengths or []
+    }
+
+def _bank_profile(bank: BankRecord) -> dict:
+    """Bank characteristics passed to the quotation generator"""
+    return {
         'bank_type': bank.bank_type,
         'headquarters_country': bank.headquarters_country,
         'credit_rating': bank.credit_rating,
@@ -203,22 +303,8 @@ async def regenerate_quotation(quotation_id: int, db: Session = Depends(get_db))
         'contact_email': bank.contact_email
     }
 
-    client_research_data = {
-        'annual_revenue': research.annual_revenue,
-        'credit_rating': research.credit_rating,
-        'debt_to_equity_ratio': research.debt_to_equity_ratio,
-        'risk_assessment': research.risk_assessment,
-        'strengths': research.strengths or []
-    }
-
-    ai_quotation = await generator.generate_quotation(
-        bank.name,
-        bank_profile,
-        loan_proposal_data,
-        client_research_data
-    )
-
-    # Update quotation
+def _apply_ai_quotation(quotation: Quotation, ai_quotation: dict):
+    """Copy a generated bank response onto the quotation row"""
     if ai_quotation.get('will_participate'):
         quotation.offered_amount = ai_quotation.get('offered_amount')
         quotation.offered_interest_rate = ai_quotation.get('offered_interest_rate')
@@ -238,18 +324,14 @@ async def regenerate_quotation(quotation_id: int, db: Session = Depends(get_db))
         quotation.status = QuotationStatus.REJECTED
         quotation.response_notes = ai_quotation.get('decline_reason')
 
-    db.commit()
-    db.refresh(quotation)
-
-    return {
-        "message": "Quotation regenerated successfully",
-        "quotation_id": quotation.id,
-        "status": quotation.status,
-        "will_participate": ai_quotation.get('will_participate')
-    }
-
 async def _generate_ai_quotations(proposal_id: int, quotation_ids: List[int]):
-    """Background task to generate AI quotations"""
+    """
+    Background task to generate AI quotations
+
+    Banks are queried concurrently (at most QUOTATION_FANOUT_CONCURRENCY at
+    once, further paced by the LLM rate limiter) and each response is
+    committed as soon as it arrives so the UI sees quotes stream in.
+    """
     from app.core.database import SessionLocal
     db = SessionLocal()
 
@@ -260,78 +342,66 @@ async def _generate_ai_quotations(proposal_id: int, quotation_ids: List[int]):
             ClientResearch.loan_proposal_id == proposal_id
         ).first()
 
-        loan_proposal_data = {
-            'client_name': proposal.client_name,
-            'client_industry': proposal.client_industry,
-            'requested_amount': proposal.requested_amount,
-            'currency': proposal.currency,
-            'loan_purpose': proposal.loan_purpose,
-            'desired_term_months': proposal.desired_term_months,
-            'max_acceptable_rate': proposal.max_acceptable_rate
-        }
-
-        client_research_data = {
-            'annual_revenue': research.annual_revenue,
-            'credit_rating': research.credit_rating,
-            'debt_to_equity_ratio': research.debt_to_equity_ratio,
-            'risk_assessment': research.risk_assessment,
-            'strengths': research.strengths or []
-        }
-
-        generator = QuotationGenerator()
-
-        # Process each quotation
-        for quotation_id in quotation_ids:
-            quotation = db.query(Quotation).filter(Quotation.id == quotation_id).first()
-            bank = db.query(Bank).filter(Bank.id == quotation.bank_id).first()
-
-            bank_profile = {
-                'bank_type': bank.bank_type,
-                'headquarters_country': bank.headquarters_country,
-                'credit_rating': bank.credit_rating,
-                'risk_appetite': bank.risk_appetite,
-                'avg_interest_rate': bank.avg_interest_rate,
-                'preferred_sectors': bank.preferred_sectors or [],
-                'min_loan_amount': bank.min_loan_amount,
-                'max_loan_amount': bank.max_loan_amount,
-                'contact_email': bank.contact_email
-            }
+        loan_proposal_data = _proposal_data(proposal)
+        client_research_data = _research_data(research)
 
-            # Generate AI quotation
-            ai_quotation = await generator.generate_quotation(
-                bank.name,
-                bank_profile,
-                loan_proposal_data,
-                client_research_data
-            )
-
-            # Update quotation in database
-            if ai_quotation.get('will_participate'):
-                quotation.offered_amount = ai_quotation.get('offered_amount')
-                quotation.offered_interest_rate = ai_quotation.get('offered_interest_rate')
-                quotation.offered_term_months = ai_quotation.get('offered_term_months')
-                quotation.conditions = ai_quotation.get('conditions')
-                quotation.covenants = ai_quotation.get('covenants')
-                quotation.processing_time_days = ai_quotation.get('processing_time_days')
-                quotation.early_repayment_penalty = ai_quotation.get('early_repayment_penalty')
-                quotation.collateral_requirements = ai_quotation.get('collateral_requirements')
-                quotation.bank_contact_name = ai_quotation.get('bank_contact_name')
-                quotation.bank_contact_email = ai_quotation.get('bank_contact_email')
-                quotation.response_notes = ai_quotation.get('rationale')
-                quotation.status = QuotationStatus.RESPONDED
-                quotation.responded_at = datetime.utcnow()
-                quotation.fees = ai_quotation.get('fees')
-            else:
-                quotation.status = QuotationStatus.REJECTED
-                quotation.response_notes = ai_quotation.get('decline_reason')
+        quotations = db.query(Quotation).filter(Quotation.id.in_(quotation_ids)).all()
+        directory = get_bank_directory(db)
+        banks = {q.bank_id: directory.get(q.bank_id) for q in quotations if q.bank_id in directory.banks}
 
+        generator = QuotationGenerator()
+        syndicate_service = SyndicateService(db)
+        semaphore = asyncio.Semaphore(settings.QUOTATION_FANOUT_CONCURRENCY)
+
+        async def generate_one(quotation: Quotation, bank_name: str, bank_profile: dict):
+            async with semaphore:
+                ai_quotation = await generator.generate_quotation(
+                    bank_name,
+                    bank_profile,
+                    loan_proposal_data,
+                    client_research_data
+                )
+            return quotation, ai_quotation
+
+        def save(quotation: Quotation, ai_quotation: dict) -> bool:
+            """Commit a response and re-optimize; blocking, so it runs off the event loop"""
+            _apply_ai_quotation(quotation, ai_quotation)
             db.commit()
 
+            # Re-optimize incrementally so the proposal shows the best syndicate so far
+            try:
+                syndicate = syndicate_service.quotation_changed(quotation)
+                db.commit()
+                return syndicate is not None
+            except Exception as e:
+                db.rollback()
+                print(f"❌ Live syndicate update failed: {str(e)}")
+                return False
+
+        # Bank profiles are built up front so tasks never touch the session
+        tasks = [
+            generate_one(q, banks[q.bank_id].name, _bank_profile(banks[q.bank_id]))
+            for q in quotations if q.bank_id in banks
+        ]
+
+        generated = 0
+        for next_result in asyncio.as_completed(tasks):
+            try:
+                quotation, ai_quotation = await next_result
+            except Exception as e:
+                print(f"❌ Quotation generation failed: {str(e)}")
+                continue
+
+            syndicate_changed = await asyncio.to_thread(save, quotation, ai_quotation)
+            generated += 1
+            _publish_quotation(quotation, syndicate_changed)
+
         # Update proposal status
         proposal.status = ProposalStatus.COLLECTING_QUOTES
         db.commit()
+        publish(proposal_id, "proposal", {"status": proposal.status.value})
 
-        print(f"✅ Generated {len(quotation_ids)} AI quotations for proposal {proposal_id}")
+        print(f"✅ Generated {generated} AI quotations for proposal {proposal_id}")
 
     except Exception as e:
         print(f"❌ AI quotation generation failed: {str(e)}")
@@ -0,0 +1,270 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session, selectinload
+from app.core.config import settings
+from app.core.database import get_db
+from app.models.bank import Bank
+from app.models.loan_proposal import LoanProposal, ProposalStatus
+from app.models.syndicate import Syndicate
+from app.schemas.syndicate import (
+    OptimizationRequest, SyndicateResponse, SyndicateMemberResponse,
+    ParetoRequest, ScenarioSweepRequest, ScenarioSweepResponse
+)
+from app.services.event_bus import publish
+from app.services.loan_optimizer import LoanOptimizer, SWEEP_METRICS
+from app.services.syndicate_service import SyndicateService, SyndicateConstraints
+
+router = APIRouter()
+
+MAX_SWEEP_SCENARIOS = 100_000
+# Finest share-cap spacing for /pareto: at most 100 caps, each one or more solves
+MIN_CONCENTRATION_STEP = 0.01
+
+@router.post("/optimize", response_model=dict)
+def optimize_syndicate(request: OptimizationRequest, db: Session = Depends(get_db)):
+    """
+    Build the cheapest syndicate from the bank responses for a proposal
+
+    Replaces any syndicate previously saved for the proposal.
+    """
+    if request.time_budget_seconds is not None and \
+            not 0 < request.time_budget_seconds <= settings.OPTIMIZER_MAX_TIME_BUDGET_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"time_budget_seconds must be in (0, {settings.OPTIMIZER_MAX_TIME_BUDGET_SECONDS}]"
+        )
+
+    proposal = db.query(LoanProposal).filter(
+        LoanProposal.id == request.loan_proposal_id
+    ).first()
+
+    if not proposal:
+        raise HTTPException(status_code=404, detail="Loan proposal not found")
+
+    service = SyndicateService(db)
+    rows = service.responded_quotations(proposal.id)
+
+    if not rows:
+        raise HTTPException(status_code=400, detail="No bank responses with an offered amount and rate")
+
+    quotes = [service.quote_data(quotation, bank, proposal.desired_term_months) for quotation, bank in rows]
+
+    constraints = SyndicateConstraints(
+        target_amount=request.target_amount,
+        max_interest_rate=request.max_interest_rate,
+        min_banks=request.min_banks or 1,
+        max_banks=request.max_banks or 10,
+        use_all_in_cost=request.use_all_in_cost
+    )
+
+    result = LoanOptimizer().optimize(
+        quotes,
+        constraints.target_amount,
+        max_interest_rate=constraints.max_interest_rate,
+        min_banks=constraints.min_banks,
+        max_banks=constraints.max_banks,
+        time_budget=request.time_budget_seconds or settings.OPTIMIZER_TIME_BUDGET_SECONDS,
+        use_all_in_cost=constraints.use_all_in_cost
+    )
+
+    if not result.is_feasible:
+        raise HTTPException(
+            status_code=400,
+            detail="No syndicate meets the target amount, bank limits and rate cap"
+        )
+
+    # Later quote changes re-optimize under the same constraints
+    service.set_constraints(proposal, constraints)
+    syndicate = service.save_syndicate(proposal, result)
+
+    proposal.status = ProposalStatus.OPTIMIZATION_COMPLETE
+    db.commit()
+    db.refresh(syndicate)
+    publish(proposal.id, "syndicate")
+
+    return {
+        "message": f"Syndicate of {result.number_of_banks} banks optimized",
+        "is_optimal": result.is_optimal,
+        "weighted_all_in_rate": result.weighted_all_in_rate,
+        "syndicate": _syndicate_response(syndicate, db)
+    }
+
+@router.post("/pareto", response_model=dict)
+def pareto_syndicates(request: ParetoRequest, db: Session = Depends(get_db)):
+    """
+    Non-dominated syndicates trading cost against bank count and concentration
+
+    With persist, the frontier replaces the proposal's previous candidate
+    syndicates. The chosen syndicate is left alone until a candidate is
+    selected.
+    """
+    if not MIN_CONCENTRATION_STEP <= request.concentration_step <= 1:
+        raise HTTPException(status_code=400, detail=f"concentration_step must be in [{MIN_CONCENTRATION_STEP}, 1]")
+
+    proposal = db.query(LoanProposal).filter(
+        LoanProposal.id == request.loan_proposal_id
+    ).first()
+
+    if not proposal:
+        raise HTTPException(status_code=404, detail="Loan proposal not found")
+
+    service = SyndicateService(db)
+    rows = service.responded_quotations(proposal.id)
+
+    if not rows:
+        raise HTTPException(status_code=400, detail="No bank responses with an offered amount and rate")
+
+    quotes = [service.quote_data(quotation, bank, proposal.desired_term_months) for quotation, bank in rows]
+    frontier = LoanOptimizer().pareto_frontier(
+        quotes,
+        request.target_amount,
+        min_banks=request.min_banks or 1,
+        max_banks=request.max_banks or 10,
+        concentration_step=request.concentration_step,
+        time_budget=settings.PARETO_TIME_BUDGET_SECONDS,
+        use_all_in_cost=request.use_all_in_cost
+    )
+
+    points = [
+        {
+            "weighted_avg_rate": result.weighted_avg_rate,
+            "weighted_all_in_rate": result.weighted_all_in_rate,
+            "number_of_banks": result.number_of_banks,
+            "concentration": result.concentration,
+            "is_optimal": result.is_optimal,
+            "allocations": [
+                {"quotation_id": q.id, "bank_id": q.bank_id, "bank_name": q.bank_name, "amount": q.offered_amount}
+                for q in result.selected_quotations
+            ]
+        }
+        for result in frontier
+    ]
+
+    if request.persist:
+        candidates = service.replace_candidates(proposal, frontier)
+        db.commit()
+        for point, candidate in zip(points, candidates):
+            point["syndicate_id"] = candidate.id
+
+    return {
+        "message": f"{len(frontier)} non-dominated syndicates found",
+        "frontier": points
+    }
+
+@router.post("/sweep", response_model=ScenarioSweepResponse)
+def sweep_scenarios(request: ScenarioSweepRequest, db: Session = Depends(get_db)):
+    """
+    Weighted average rate and bank count over a grid of constraint scenarios
+
+    Evaluates every combination of target_amounts x max_interest_rates x
+    max_banks with the rate-ordered fill (see LoanOptimizer.sweep_scenarios).
+    A null max_interest_rate means no cap. Nothing is persisted.
+    """
+    scenario_count = len(request.target_amounts) * len(request.max_interest_rates) * len(request.max_banks)
+    if scenario_count == 0:
+        raise HTTPException(status_code=400, detail="Each scenario axis needs at least one value")
+    if scenario_count > MAX_SWEEP_SCENARIOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Sweep has {scenario_count} scenarios; the limit is {MAX_SWEEP_SCENARIOS}"
+        )
+
+    proposal = db.query(LoanProposal).filter(
+        LoanProposal.id == request.loan_proposal_id
+    ).first()
+
+    if not proposal:
+        raise HTTPException(status_code=404, detail="Loan proposal not found")
+
+    rows = SyndicateService(db).responded_quotations(proposal.id)
+
+    optimizer = LoanOptimizer()
+    targets, rate_caps, bank_limits = optimizer.scenario_grid(
+        request.target_amounts,
+        [float('nan') if rate is None else rate for rate in request.max_interest_rates],
+        request.max_banks
+    )
+    matrix = optimizer.sweep_scenarios(
+        [q.offered_amount for q, _ in rows],
+        [q.offered_interest_rate for q, _ in rows],
+        targets,
+        rate_caps,
+        bank_limits
+    )
+
+    # NaN is not valid JSON
+    return {
+        "metrics": list(SWEEP_METRICS),
+        "scenarios": [[None if value != value else value for value in row] for row in matrix.tolist()]
+    }
+
+@router.get("/proposal/{proposal_id}", response_model=SyndicateResponse)
+def get_syndicate_for_proposal(proposal_id: int, db: Session = Depends(get_db)):
+    """Get the saved syndicate for a loan proposal"""
+    syndicate = db.query(Syndicate).filter(
+        Syndicate.loan_proposal_id == proposal_id,
+        Syndicate.is_candidate == False
+    ).first()
+
+    if not syndicate:
+        raise HTTPException(status_code=404, detail="Syndicate not found")
+
+    return _syndicate_response(syndicate, db)
+
+@router.get("/proposal/{proposal_id}/candidates", response_model=List[SyndicateResponse])
+def get_candidates_for_proposal(proposal_id: int, db: Session = Depends(get_db)):
+    """Candidate syndicates from the last persisted frontier, cheapest first"""
+    candidates = db.query(Syndicate).options(selectinload(Syndicate.members)).filter(
+        Syndicate.loan_proposal_id == proposal_id,
+        Syndicate.is_candidate == True
+    ).order_by(Syndicate.weighted_avg_interest_rate, Syndicate.number_of_banks).all()
+
+    bank_names = _bank_names({m.bank_id for c in candidates for m in c.members}, db)
+    return [_syndicate_response(candidate, db, bank_names) for candidate in candidates]
+
+@router.post("/{syndicate_id}/select", response_model=SyndicateResponse)
+def select_candidate(syndicate_id: int, db: Session = Depends(get_db)):
+    """Make a candidate the proposal's syndicate, replacing the current one"""
+    candidate = db.query(Syndicate).filter(Syndicate.id == syndicate_id).first()
+
+    if not candidate:
+        raise HTTPException(status_code=404, detail="Syndicate not found")
+    if not candidate.is_candidate:
+        raise HTTPException(status_code=400, detail="Syndicate is not a candidate")
+
+    proposal = candidate.loan_proposal
+    if proposal.syndicate and proposal.syndicate.is_approved_by_client:
+        raise HTTPException(status_code=400, detail="The client has already approved a syndicate")
+
+    syndicate = SyndicateService(db).select_candidate(proposal, candidate)
+    proposal.status = ProposalStatus.OPTIMIZATION_COMPLETE
+    db.commit()
+    db.refresh(syndicate)
+    publish(proposal.id, "syndicate")
+
+    return _syndicate_response(syndicate, db)
+
+def _bank_names(bank_ids, db: Session) -> Dict[int, str]:
+    """Bank names by id in one query"""
+    if not bank_ids:
+        return {}
+    return dict(db.query(Bank.id, Bank.name).filter(Bank.id.in_(list(bank_ids))).all())
+
+def _syndicate_response(
+    syndicate: Syndicate,
+    db: Session,
+    bank_names: Optional[Dict[int, str]] = None
+) -> SyndicateResponse:
+    """Syndicate with bank names filled in on its members"""
+    if bank_names is None:
+        bank_names = _bank_names({m.bank_id for m in syndicate.members}, db)
+
+    members = []
+    for member in sorted(syndicate.members, key=lambda m: m.allocated_amount, reverse=True):
+        member_dict = SyndicateMemberResponse.from_orm(member).dict()
+        member_dict['bank_name'] = bank_names.get(member.bank_id)
+        members.append(SyndicateMemberResponse(**member_dict))
+
+    syndicate_dict = SyndicateResponse.from_orm(syndicate).dict()
+    syndicate_dict['members'] = members
+    return SyndicateResponse(**syndicate_dict)
@@ -16,6 +16,61 @@ class Settings(BaseSettings):
     UPLOAD_DIR: str = "./uploads"
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
 
+    # Ingestion Job Queue
+    INGEST_WORKERS: int = 2  # Worker processes started by worker.py
+    JOB_LEASE_SECONDS: int = 300  # Lease length before a job can be reclaimed
+    JOB_HEARTBEAT_SECONDS: int = 30  # How often a running job extends its lease
+    JOB_POLL_INTERVAL: float = 2.0  # Idle wait between queue polls
+    JOB_MAX_ATTEMPTS: int = 3
+
+    # PDF Extraction
+    PDF_EXTRACT_WORKERS: Optional[int] = None  # Per process; defaults to CPU count / INGEST_WORKERS
+    PDF_PARALLEL_MIN_PAGES: int = 40  # Smaller files are extracted serially
+    PDF_SLOW_PAGE_SECONDS: float = 2.0  # Pages slower than this are logged
+
+    # AI Extraction
+    AI_EXTRACTION_CHUNK_CHARS: int = 12000  # Max characters of document text per LLM call
+    AI_EXTRACTION_CONCURRENCY: int = 8  # Max chunk extractions in flight at once
+
+    # LLM Client
+    LLM_MAX_CONCURRENT_CALLS: int = 16  # Thread pool size for blocking Gemini calls
+    LLM_CALL_TIMEOUT_SECONDS: float = 120.0
+    LLM_RATE_LIMIT_PER_MINUTE: int = 60  # Gemini request quota per host (0 disables)
+    LLM_RATE_LIMIT_BURST: int = 10
+    LLM_RATE_LIMIT_BACKEND: str = "sqlite"  # "sqlite" shares the quota across API and worker processes, "memory" is per process
+    LLM_RATE_LIMIT_PATH: str = "./llm_rate_limit.db"
+    QUOTATION_FANOUT_CONCURRENCY: int = 8  # Bank quotations generated in parallel
+    RESEARCH_CACHE_TTL_SECONDS: int = 7 * 24 * 3600  # Company research reused for 7 days
+
+    # Syndicate Optimizer
+    OPTIMIZER_TIME_BUDGET_SECONDS: float = 1.0  # Exact search stops here and keeps the best syndicate found
+    OPTIMIZER_MAX_TIME_BUDGET_SECONDS: float = 10.0  # Largest time_budget_seconds a request may ask for
+    PARETO_TIME_BUDGET_SECONDS: float = 5.0  # Shared by every solve of one Pareto frontier
+    ALL_IN_UNDRAWN_SHARE: float = 0.2  # Expected undrawn share of commitments (commitment fee base)
+    ALL_IN_PREPAYMENT_PROBABILITY: float = 0.25  # Chance the early repayment penalty is paid
+    ALL_IN_REFINANCING_COST: float = 1.0  # % of amount to refinance when the offered term is too short
+
+    # Bank Directory
+    BANK_DIRECTORY_CHECK_SECONDS: float = 1.0  # How stale another worker's bank edits may look in this one
+    BANK_ACCEPTANCE_REFRESH_SECONDS: float = 300.0  # How long per-bank acceptance rates are reused before a recount
+
+    # Proposal Events (server-sent events)
+    EVENT_BUS_BACKEND: str = "memory"  # "memory" for one API worker, "sqlite" to share events across workers
+    EVENT_BUS_PATH: str = "./events.db"
+    EVENT_BUS_POLL_INTERVAL: float = 0.5  # Seconds between event log polls (sqlite backend)
+    EVENT_BUS_RETENTION_SECONDS: int = 3600
+    EVENT_STREAM_KEEPALIVE_SECONDS: float = 15.0  # Comment frame sent on idle streams
+
+    # LLM Response Cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = "./llm_cache.db"
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600  # 7 days
+    LLM_CACHE_MAX_BYTES: int = 200 * 1024 * 1024  # 200MB
+    LLM_CACHE_AI_EXTRACTOR: bool = True
+    LLM_CACHE_RESEARCH_AGENT: bool = True
+    LLM_CACHE_PITCH_GENERATOR: bool = True
+    LLM_CACHE_QUOTATION_GENERATOR: bool = True
+
     class Config:
         env_file = ".env"
         case_sensitive = True
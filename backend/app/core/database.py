@@ -1,6 +1,6 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import object_session, sessionmaker
 from app.core.config import settings
 
 engine = create_engine(
@@ -12,6 +12,20 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+def versioned(model):
+    """
+    Class decorator: increment model.version whenever a row is updated
+
+    The increment is part of the UPDATE (version = version + 1), so it is
+    atomic and, unlike updated_at, changes even for two writes in the same
+    second. ETags are built from it (see app/core/etag.py).
+    """
+    @event.listens_for(model, "before_update")
+    def bump_version(mapper, connection, target):
+        if object_session(target).is_modified(target, include_collections=False):
+            target.version = model.version + 1
+    return model
+
 def get_db():
     db = SessionLocal()
     try:
@@ -23,4 +37,8 @@ def init_db():
     """Initialize database tables"""
     from app.models import loan, document, covenant
     from app.models import bank, loan_proposal, mla_bid, client_research, pitch, quotation, syndicate
+    from app.models import job, portfolio_summary
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        bank.ensure_rating_rank(connection)
+        portfolio_summary.ensure_portfolio_summary(connection)
@@ -0,0 +1,46 @@
+"""Weak ETags and conditional GET for read endpoints"""
+import hashlib
+from typing import Optional
+from fastapi import Request, Response
+
+def make_etag(*parts) -> str:
+    """Weak ETag over the row ids and versions a response is built from"""
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match names etag (weak comparison, so W/ is ignored)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == wanted:
+            return True
+    return False
+
+def not_modified(request: Request, response: Response, *parts) -> Optional[Response]:
+    """
+    Conditional GET check, run before the response is loaded
+
+    Sets the ETag on response. If the client already has this version,
+    returns a bare 304 for the endpoint to return instead, so nothing is
+    loaded through the ORM or serialized. Cache-Control: no-cache makes
+    browsers revalidate with If-None-Match on every request on their own.
+
+    Usage:
+        cached = not_modified(request, response, "loan", loan_versions)
+        if cached:
+            return cached
+    """
+    etag = make_etag(*parts)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
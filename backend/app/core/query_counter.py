@@ -0,0 +1,48 @@
+"""Count the SQL statements a block of code sends to the database"""
+from contextlib import contextmanager
+from typing import List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.database import engine as default_engine
+
+class QueryCounter:
+    """Statements executed on an engine while the counter is active"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine: Optional[Engine] = None):
+    """
+    Record every statement executed on engine inside the block
+
+    Usage:
+        with count_queries() as counter:
+            get_quotations_for_proposal(proposal_id, db)
+        print(counter.count)
+    """
+    engine = engine or default_engine
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter._record)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter._record)
+
+
+@contextmanager
+def assert_max_queries(limit: int, engine: Optional[Engine] = None):
+    """Raise AssertionError if the block executes more than limit statements"""
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > limit:
+        listing = "\n".join(f"  {s}" for s in counter.statements)
+        raise AssertionError(f"Expected at most {limit} queries, got {counter.count}:\n{listing}")
@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.core.config import settings
 from app.api import documents, loans, covenants, loan_proposals
 
@@ -16,8 +17,76 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
+# Multipart framing overhead allowed on top of MAX_UPLOAD_SIZE
+UPLOAD_OVERHEAD_BYTES = 64 * 1024
+
+class UploadTooLarge(Exception):
+    """Raised from receive() once an upload body passes the size limit"""
+
+class UploadSizeLimit:
+    """
+    Reject oversized uploads before they are spooled
+
+    A declared Content-Length over the limit is refused before the body is
+    read. Bodies without one (chunked transfer encoding) are counted as they
+    are received, and the request is aborted with 413 as soon as they pass
+    the limit, instead of after Starlette has spooled the whole upload.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != "/api/documents/upload":
+            await self.app(scope, receive, send)
+            return
+
+        limit = settings.MAX_UPLOAD_SIZE + UPLOAD_OVERHEAD_BYTES
+        too_large = JSONResponse(
+            status_code=413,
+            content={"detail": f"File exceeds maximum upload size of {settings.MAX_UPLOAD_SIZE} bytes"}
+        )
+
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            await too_large(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    raise UploadTooLarge()
+            return message
+
+        async def send_until_exceeded(message):
+            nonlocal started
+            # FastAPI turns body errors into a 400; the 413 below replaces it
+            if exceeded:
+                return
+            started = started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, send_until_exceeded)
+        except Exception:
+            if not exceeded:
+                raise
+        if exceeded and not started:
+            await too_large(scope, receive, send)
+
+app.add_middleware(UploadSizeLimit)
+
 # Include API routers
 # Original MVP features
 app.include_router(documents.router, prefix="/api/documents", tags=["Document Processing"])
@@ -28,11 +97,12 @@ app.include_router(covenants.router, prefix="/api/covenants", tags=["Covenant Mo
 app.include_router(loan_proposals.router, prefix="/api/loan-proposals", tags=["Loan Proposals"])
 
 # Import new routers
-from app.api import banks, quotations
+from app.api import banks, quotations, syndicates, analytics
 
 app.include_router(banks.router, prefix="/api/banks", tags=["Bank Directory"])
 app.include_router(quotations.router, prefix="/api/quotations", tags=["Quotations & AI Generation"])
-# app.include_router(syndicates.router, prefix="/api/syndicates", tags=["Syndicate Optimization"])
+app.include_router(syndicates.router, prefix="/api/syndicates", tags=["Syndicate Optimization"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["Portfolio Analytics"])
 
 @app.get("/")
 async def root():
@@ -53,3 +123,9 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/api/llm-cache/stats", tags=["System"])
+def llm_cache_stats():
+    """LLM response cache hit/miss counters per AI service"""
+    from app.services.llm_cache import get_llm_cache
+    return get_llm_cache().stats()
@@ -1,10 +1,34 @@
-from sqlalchemy import Column, Integer, String, Float, Text, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Float, Text, Boolean, JSON, Index, event, inspect, select
+from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
 from sqlalchemy import DateTime
-from app.core.database import Base
+from typing import Optional
+from app.core.database import Base, versioned
 
+# Ordinal credit rating, higher is stronger; S&P/Fitch and Moody's notches share a rank
+RATING_RANKS = {
+    rating: rank
+    for ranks in (
+        ["D", "C", "CC", "CCC-", "CCC", "CCC+", "B-", "B", "B+", "BB-", "BB", "BB+",
+         "BBB-", "BBB", "BBB+", "A-", "A", "A+", "AA-", "AA", "AA+", "AAA"],
+        [None, "C", "Ca", "Caa3", "Caa2", "Caa1", "B3", "B2", "B1", "Ba3", "Ba2", "Ba1",
+         "Baa3", "Baa2", "Baa1", "A3", "A2", "A1", "Aa3", "Aa2", "Aa1", "Aaa"],
+    )
+    for rank, rating in enumerate(ranks) if rating
+}
+
+def rating_rank(rating: Optional[str]) -> Optional[int]:
+    """Ordinal of a credit rating such as "AA-" or "Baa1", None if unrated or unknown"""
+    if not rating:
+        return None
+    return RATING_RANKS.get(rating.strip())
+
+@versioned
 class Bank(Base):
     __tablename__ = "banks"
+    __table_args__ = (
+        Index("ix_banks_created_at_id", "created_at", "id"),  # Keyset pagination
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -23,6 +47,7 @@ class Bank(Base):
     total_assets_usd = Column(Float, nullable=True)  # Total assets in USD
     tier1_capital_ratio = Column(Float, nullable=True)
     credit_rating = Column(String, nullable=True)  # "AAA", "AA+", etc.
+    rating_rank = Column(Integer, nullable=True, index=True)  # rating_rank(credit_rating), set automatically
 
     # Lending Characteristics
     min_loan_amount = Column(Float, default=0)
@@ -49,3 +74,58 @@ class Bank(Base):
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=1)  # Bumped on every update, for ETags
+
+
+@event.listens_for(Bank.credit_rating, "set")
+def _sync_rating_rank(target, value, oldvalue, initiator):
+    target.rating_rank = rating_rank(value)
+
+def ensure_rating_rank(connection):
+    """Add and backfill banks.rating_rank in a database created before the column existed"""
+    if "rating_rank" not in {c["name"] for c in inspect(connection).get_columns("banks")}:
+        connection.exec_driver_sql("ALTER TABLE banks ADD COLUMN rating_rank INTEGER")
+        connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_banks_rating_rank ON banks (rating_rank)")
+
+    table = Bank.__table__
+    ratings = connection.execute(
+        select(table.c.credit_rating).distinct()
+        .where(table.c.rating_rank.is_(None), table.c.credit_rating.isnot(None))
+    ).scalars().all()
+    for rating in ratings:
+        rank = rating_rank(rating)
+        if rank is not None:
+            connection.execute(
+                table.update().where(table.c.credit_rating == rating, table.c.rating_rank.is_(None))
+                .values(rating_rank=rank)
+            )
+
+
+class BankDirectoryVersion(Base):
+    """
+    Single-row counter bumped by every flush that writes a bank
+
+    Workers compare it with the version of their in-memory bank directory
+    (app/services/bank_directory.py) to know when to reload it.
+    """
+    __tablename__ = "bank_directory_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_directory_version(session, flush_context):
+    changed = any(
+        isinstance(obj, Bank)
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+    )
+    if not changed:
+        return
+    # Same transaction as the bank write, so the bump commits or rolls back with it
+    connection = session.connection()
+    table = BankDirectoryVersion.__table__
+    bumped = connection.execute(table.update().where(table.c.id == 1).values(version=table.c.version + 1))
+    if not bumped.rowcount:
+        connection.execute(table.insert().values(id=1, version=1))
+    session.info["bank_directory_changed"] = True
@@ -63,3 +63,14 @@ class ClientResearch(Base):
 
     # Relationships
     loan_proposal = relationship("LoanProposal", back_populates="research")
+
+
+class CompanyResearchCache(Base):
+    """Latest research per company, reused by new proposals for the same borrower"""
+    __tablename__ = "company_research_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    company_key = Column(String, nullable=False, unique=True, index=True)  # Normalized name (+ domain)
+    company_name = Column(String, nullable=False)
+    research_data = Column(JSON, nullable=False)
+    researched_at = Column(DateTime, nullable=False, index=True)  # Naive UTC, compared against datetime.utcnow()
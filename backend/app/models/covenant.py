@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey, Enum, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.database import Base, versioned
 import enum
 
 class CovenantType(str, enum.Enum):
@@ -16,8 +16,13 @@ class CovenantStatus(str, enum.Enum):
     BREACH = "breach"
     UNKNOWN = "unknown"
 
+@versioned
 class Covenant(Base):
     __tablename__ = "covenants"
+    __table_args__ = (
+        Index("ix_covenants_created_at_id", "created_at", "id"),  # Keyset pagination
+        Index("ix_covenants_loan_id_status", "loan_id", "status"),  # Status counts per loan group
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     loan_id = Column(Integer, ForeignKey("loans.id"), nullable=False)
@@ -48,6 +53,7 @@ class Covenant(Base):
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=1)  # Bumped on every update, for ETags
 
     # Relationships
     loan = relationship("Loan", back_populates="covenants")
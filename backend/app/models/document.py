@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Text, Enum, ForeignKey, JSON, Index
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.database import Base, versioned
 import enum
 
 class DocumentStatus(str, enum.Enum):
@@ -9,16 +10,26 @@ class DocumentStatus(str, enum.Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+@versioned
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_created_at_id", "created_at", "id"),  # Keyset pagination
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, nullable=False)
     file_path = Column(String, nullable=False)
     file_type = Column(String, nullable=False)
     file_size = Column(Integer, nullable=False)
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of file contents
+    source_document_id = Column(Integer, ForeignKey("documents.id"), nullable=True)  # Set when extraction was reused
     status = Column(Enum(DocumentStatus), default=DocumentStatus.UPLOADED)
-    extracted_text = Column(Text, nullable=True)
+    # Loaded only when accessed; page ranges are read with SQL substr (see DocumentService.get_text_pages)
+    extracted_text = deferred(Column(Text, nullable=True))
+    page_count = Column(Integer, nullable=True)
+    page_offsets = Column(JSON, nullable=True)  # Character offset in extracted_text where each page starts
     error_message = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=1)  # Bumped on every update, for ETags
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Enum, JSON
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Job Definition
+    job_type = Column(String, nullable=False, index=True)  # e.g., "process_document"
+    payload = Column(JSON, nullable=True)
+
+    # Status and Retries
+    status = Column(Enum(JobStatus), default=JobStatus.QUEUED, index=True)
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    last_error = Column(Text, nullable=True)
+
+    # Lease (naive UTC, compared against datetime.utcnow())
+    locked_by = Column(String, nullable=True)  # Worker ID holding the lease
+    lease_expires_at = Column(DateTime, nullable=True, index=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -1,10 +1,19 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.database import Base, versioned
 
+@versioned
 class Loan(Base):
     __tablename__ = "loans"
+    __table_args__ = (
+        Index("ix_loans_created_at_id", "created_at", "id"),  # Keyset pagination
+        # Portfolio summary groups (see app/models/portfolio_summary.py)
+        Index("ix_loans_currency", "currency"),
+        Index("ix_loans_facility_type", "facility_type"),
+        Index("ix_loans_governing_law", "governing_law"),
+        Index("ix_loans_agent_bank", "agent_bank"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
@@ -33,6 +42,7 @@ class Loan(Base):
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=1)  # Bumped on every update, for ETags
 
     # Relationships
     document = relationship("Document", backref="loans")
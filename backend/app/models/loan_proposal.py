@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text, Enum, JSON, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text, Enum, JSON, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.database import Base, versioned
 import enum
 
 class ProposalStatus(str, enum.Enum):
@@ -17,8 +17,12 @@ class ProposalStatus(str, enum.Enum):
     APPROVED = "approved"
     REJECTED = "rejected"
 
+@versioned
 class LoanProposal(Base):
     __tablename__ = "loan_proposals"
+    __table_args__ = (
+        Index("ix_loan_proposals_created_at_id", "created_at", "id"),  # Keyset pagination
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -53,10 +57,17 @@ class LoanProposal(Base):
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=1)  # Bumped on every update, for ETags
 
     # Relationships
     mla_bids = relationship("MLABid", back_populates="loan_proposal", cascade="all, delete-orphan")
     research = relationship("ClientResearch", back_populates="loan_proposal", uselist=False)
     pitch = relationship("Pitch", back_populates="loan_proposal", uselist=False)
     quotations = relationship("Quotation", back_populates="loan_proposal", cascade="all, delete-orphan")
-    syndicate = relationship("Syndicate", back_populates="loan_proposal", uselist=False)
+    # The chosen syndicate; Pareto candidates are Syndicate rows with is_candidate set
+    syndicate = relationship(
+        "Syndicate",
+        primaryjoin="and_(LoanProposal.id == Syndicate.loan_proposal_id, Syndicate.is_candidate == False)",
+        uselist=False,
+        viewonly=True
+    )
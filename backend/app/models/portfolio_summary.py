@@ -0,0 +1,194 @@
+from typing import Dict, Iterable, Optional, Set
+from sqlalchemy import Column, Integer, String, Float, DateTime, event, inspect, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app.core.database import Base
+from app.models.covenant import Covenant, CovenantStatus
+from app.models.document import Document, DocumentStatus
+from app.models.loan import Loan
+
+# Loan columns the portfolio is broken down by
+LOAN_DIMENSIONS = {
+    "currency": Loan.currency,
+    "facility_type": Loan.facility_type,
+    "governing_law": Loan.governing_law,
+    "agent_bank": Loan.agent_bank,
+}
+DOCUMENT_DIMENSION = "document_status"
+
+# Stored key for loans with no value in a dimension (part of the primary key, so not NULL)
+NO_VALUE = ""
+
+class PortfolioSummary(Base):
+    """
+    Materialized portfolio totals, one row per (dimension, key)
+
+    Loan dimensions (LOAN_DIMENSIONS) hold loan count, amount and covenant
+    counts by status for the loans with that value; document_status holds
+    document counts. Every loan falls in exactly one key per dimension, so
+    portfolio totals are the sum over any one dimension. Kept current by
+    refresh_portfolio_summary, run for the groups each flush touches.
+    """
+    __tablename__ = "portfolio_summary"
+
+    dimension = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+
+    loan_count = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Float, nullable=False, default=0.0)
+    document_count = Column(Integer, nullable=False, default=0)
+    covenant_count = Column(Integer, nullable=False, default=0)
+    compliant_count = Column(Integer, nullable=False, default=0)
+    warning_count = Column(Integer, nullable=False, default=0)
+    breach_count = Column(Integer, nullable=False, default=0)
+    unknown_count = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+_COUNT_COLUMNS = (
+    "loan_count", "total_amount", "document_count", "covenant_count",
+    "compliant_count", "warning_count", "breach_count", "unknown_count",
+)
+
+STATUS_COLUMNS = {
+    CovenantStatus.COMPLIANT: "compliant_count",
+    CovenantStatus.WARNING: "warning_count",
+    CovenantStatus.BREACH: "breach_count",
+    CovenantStatus.UNKNOWN: "unknown_count",
+}
+
+def _key_filter(column, keys: Set[str]):
+    """column matches one of the stored keys (NO_VALUE meaning NULL), usable with an index"""
+    values = [k for k in keys if k != NO_VALUE]
+    clauses = [column.in_(values)] if values else []
+    if NO_VALUE in keys:
+        clauses.append(column.is_(None))
+    return or_(*clauses)
+
+def refresh_portfolio_summary(connection, groups: Optional[Dict[str, Optional[Set[str]]]] = None):
+    """
+    Recompute summary rows with GROUP BY queries
+
+    groups maps a dimension to the keys to recompute, or to None for the
+    whole dimension; without groups everything is rebuilt. Rows for keys
+    that no longer have any loans or documents are removed.
+    """
+    if groups is None:
+        groups = {dimension: None for dimension in list(LOAN_DIMENSIONS) + [DOCUMENT_DIMENSION]}
+
+    table = PortfolioSummary.__table__
+    for dimension, keys in groups.items():
+        if keys is not None and not keys:
+            continue
+
+        rows: Dict[str, dict] = {}
+        if dimension == DOCUMENT_DIMENSION:
+            query = select(Document.status, func.count(Document.id)).group_by(Document.status)
+            if keys is not None:
+                query = query.where(Document.status.in_([DocumentStatus(k) for k in keys]))
+            for status, count in connection.execute(query):
+                rows[status.value] = {"document_count": count}
+        else:
+            column = LOAN_DIMENSIONS[dimension]
+            loans = select(column, func.count(Loan.id), func.coalesce(func.sum(Loan.loan_amount), 0.0)).group_by(column)
+            covenants = select(column, Covenant.status, func.count(Covenant.id)).join(
+                Loan, Loan.id == Covenant.loan_id
+            ).group_by(column, Covenant.status)
+            if keys is not None:
+                loans = loans.where(_key_filter(column, keys))
+                covenants = covenants.where(_key_filter(column, keys))
+
+            for value, count, amount in connection.execute(loans):
+                rows[value if value is not None else NO_VALUE] = {"loan_count": count, "total_amount": amount}
+            for value, status, count in connection.execute(covenants):
+                row = rows.setdefault(value if value is not None else NO_VALUE, {})
+                row["covenant_count"] = row.get("covenant_count", 0) + count
+                status_column = STATUS_COLUMNS.get(status or CovenantStatus.UNKNOWN, "unknown_count")
+                row[status_column] = row.get(status_column, 0) + count
+
+        delete = table.delete().where(table.c.dimension == dimension)
+        if keys is not None:
+            delete = delete.where(table.c.key.in_(keys))
+        connection.execute(delete)
+        if rows:
+            connection.execute(table.insert(), [
+                {"dimension": dimension, "key": key, **{c: 0 for c in _COUNT_COLUMNS}, **values}
+                for key, values in rows.items()
+            ])
+
+def loan_groups(connection, loan_ids: Iterable[int]) -> Dict[str, Set[str]]:
+    """Keys, per loan dimension, of the groups the given loans belong to"""
+    groups: Dict[str, Set[str]] = {dimension: set() for dimension in LOAN_DIMENSIONS}
+    loan_ids = list(loan_ids)
+    if loan_ids:
+        rows = connection.execute(select(*LOAN_DIMENSIONS.values()).where(Loan.id.in_(loan_ids)))
+        for row in rows:
+            for dimension, value in zip(LOAN_DIMENSIONS, row):
+                groups[dimension].add(NO_VALUE if value is None else value)
+    return groups
+
+def refresh_for_loans(connection, loan_ids: Iterable[int]):
+    """Refresh the groups of the given loans, for writes that bypass the ORM (e.g. bulk UPDATEs)"""
+    refresh_portfolio_summary(connection, loan_groups(connection, loan_ids))
+
+def ensure_portfolio_summary(connection):
+    """Build the summary if it is empty but there are loans or documents (new table, existing data)"""
+    table = PortfolioSummary.__table__
+    if connection.execute(select(table.c.dimension).limit(1)).first():
+        return
+    has_data = connection.execute(select(Loan.id).limit(1)).first() or \
+        connection.execute(select(Document.id).limit(1)).first()
+    if has_data:
+        refresh_portfolio_summary(connection)
+
+
+def _values(session: Session, obj, attribute: str) -> Optional[Set]:
+    """Old and new values of an attribute in this flush; None if they cannot be known"""
+    history = inspect(obj).attrs[attribute].history
+    values = set(history.added or ()) | set(history.unchanged or ()) | set(history.deleted or ())
+    if obj in session.new:
+        values.add(getattr(obj, attribute))
+    return values or None
+
+def _keys(values: Iterable) -> Set[str]:
+    return {NO_VALUE if v is None else (v.value if hasattr(v, "value") else v) for v in values}
+
+@event.listens_for(Session, "after_flush")
+def _refresh_touched_groups(session, flush_context):
+    changed = list(session.new) + list(session.dirty) + list(session.deleted)
+    loans = [o for o in changed if isinstance(o, Loan)]
+    covenants = [o for o in changed if isinstance(o, Covenant)]
+    documents = [o for o in changed if isinstance(o, Document)]
+    if not (loans or covenants or documents):
+        return
+
+    groups: Dict[str, Optional[Set[str]]] = {}
+
+    def touch(dimension: str, values: Optional[Set]):
+        if values is None:
+            groups[dimension] = None  # Unknown old value: recompute the whole dimension
+        elif groups.get(dimension, set()) is not None:
+            groups.setdefault(dimension, set()).update(_keys(values))
+
+    for loan in loans:
+        for dimension in LOAN_DIMENSIONS:
+            touch(dimension, _values(session, loan, dimension))
+
+    connection = session.connection()
+    loan_ids = set()
+    for covenant in covenants:
+        ids = _values(session, covenant, "loan_id")
+        if ids is None:
+            for dimension in LOAN_DIMENSIONS:
+                touch(dimension, None)
+            continue
+        loan_ids |= {i for i in ids if i is not None}
+    for dimension, keys in loan_groups(connection, loan_ids).items():
+        touch(dimension, keys)
+
+    for document in documents:
+        statuses = _values(session, document, "status")
+        touch(DOCUMENT_DIMENSION, statuses and {s for s in statuses if s is not None} or None)
+
+    refresh_portfolio_summary(connection, groups)
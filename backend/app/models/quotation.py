@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey, Enum, JSON, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey, Enum, JSON, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.database import Base, versioned
 import enum
 
 class QuotationStatus(str, enum.Enum):
@@ -12,8 +12,13 @@ class QuotationStatus(str, enum.Enum):
     REJECTED = "rejected"
     EXPIRED = "expired"
 
+@versioned
 class Quotation(Base):
     __tablename__ = "quotations"
+    __table_args__ = (
+        Index("ix_quotations_sent_at_id", "sent_at", "id"),  # Keyset pagination
+        Index("ix_quotations_bank_id_status", "bank_id", "status"),  # Bank response history, for recommendations
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     loan_proposal_id = Column(Integer, ForeignKey("loan_proposals.id"), nullable=False)
@@ -51,6 +56,7 @@ class Quotation(Base):
     sent_at = Column(DateTime(timezone=True), server_default=func.now())
     responded_at = Column(DateTime(timezone=True), nullable=True)
     expires_at = Column(DateTime(timezone=True), nullable=True)
+    version = Column(Integer, nullable=False, default=1)  # Bumped on every update, for ETags
 
     # Relationships
     loan_proposal = relationship("LoanProposal", back_populates="quotations")
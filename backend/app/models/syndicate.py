@@ -7,7 +7,7 @@ class Syndicate(Base):
     __tablename__ = "syndicates"
 
     id = Column(Integer, primary_key=True, index=True)
-    loan_proposal_id = Column(Integer, ForeignKey("loan_proposals.id"), nullable=False, unique=True)
+    loan_proposal_id = Column(Integer, ForeignKey("loan_proposals.id"), nullable=False, index=True)
 
     # Syndicate Details
     total_amount = Column(Float, nullable=False)
@@ -16,6 +16,7 @@ class Syndicate(Base):
 
     # Optimization Metrics
     optimization_score = Column(Float, nullable=True)  # Quality of optimization
+    concentration = Column(Float, nullable=True)  # Largest single-bank share of the total (0-1)
     total_fees = Column(Float, nullable=True)
 
     # Aggregated Terms
@@ -24,6 +25,7 @@ class Syndicate(Base):
     aggregated_conditions = Column(JSON, nullable=True)
 
     # Status
+    is_candidate = Column(Boolean, default=False)  # Pareto frontier alternative, not the chosen syndicate
     is_optimized = Column(Boolean, default=False)
     is_approved_by_client = Column(Boolean, default=False)
 
@@ -32,7 +34,7 @@ class Syndicate(Base):
     approved_at = Column(DateTime(timezone=True), nullable=True)
 
     # Relationships
-    loan_proposal = relationship("LoanProposal", back_populates="syndicate")
+    loan_proposal = relationship("LoanProposal")
     members = relationship("SyndicateMember", back_populates="syndicate", cascade="all, delete-orphan")
 
 
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+
+class PortfolioGroup(BaseModel):
+    """Loans sharing one value of a dimension (key None: not extracted)"""
+    key: Optional[str] = None
+    loan_count: int
+    total_amount: float
+    covenant_count: int
+    covenant_status: Dict[str, int]  # compliant / warning / breach / unknown
+
+class PortfolioAnalytics(BaseModel):
+    total_documents: int
+    documents_by_status: Dict[str, int]
+    total_loans: int
+    total_covenants: int
+    covenant_status: Dict[str, int]
+    at_risk_covenants: int  # warning + breach, as in /api/covenants/alerts/at-risk
+    by_currency: List[PortfolioGroup]  # Amounts are only summed within a currency
+    by_facility_type: List[PortfolioGroup]
+    by_governing_law: List[PortfolioGroup]
+    by_agent_bank: List[PortfolioGroup]
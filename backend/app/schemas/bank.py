@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 class BankBase(BaseModel):
     name: str
@@ -14,6 +14,8 @@ class BankBase(BaseModel):
     credit_rating: Optional[str] = None
     min_loan_amount: float = 0
     max_loan_amount: Optional[float] = None
+    preferred_sectors: Optional[List[str]] = None
+    regions_served: Optional[List[str]] = None
     risk_appetite: Optional[str] = None
 
 class BankCreate(BankBase):
@@ -24,6 +26,9 @@ class BankUpdate(BaseModel):
     is_active: Optional[bool] = None
     contact_email: Optional[str] = None
     avg_interest_rate: Optional[float] = None
+    credit_rating: Optional[str] = None
+    preferred_sectors: Optional[List[str]] = None
+    regions_served: Optional[List[str]] = None
 
 class BankResponse(BankBase):
     id: int
@@ -36,6 +41,20 @@ class BankResponse(BankBase):
     class Config:
         from_attributes = True
 
+class BankSuggestion(BaseModel):
+    """A bank whose ticket size range fits a proposal"""
+    bank: BankResponse
+    max_ticket: float  # Largest amount the bank can lend on this deal
+    max_share: float  # max_ticket as a % of the requested amount
+    already_requested: bool  # A quotation was already requested from this bank
+
+class BankRecommendationResponse(BaseModel):
+    """A bank ranked for a proposal, with the feature scores (0-1) behind its score"""
+    bank: BankResponse
+    score: float
+    max_ticket: float
+    features: Dict[str, float]
+
 class BankFilter(BaseModel):
     """Filters for bank search"""
     country: Optional[str] = None
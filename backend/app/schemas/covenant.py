@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from app.models.covenant import CovenantType, CovenantStatus
 
 class CovenantBase(BaseModel):
@@ -35,3 +35,30 @@ class CovenantResponse(CovenantBase):
 
     class Config:
         from_attributes = True
+
+class MetricObservation(BaseModel):
+    """A measured value of a covenant metric for one loan"""
+    loan_id: int
+    metric_name: str  # Matched case-insensitively against Covenant.metric_name
+    value: float
+
+class CovenantEvaluationRequest(BaseModel):
+    observations: List[MetricObservation]
+    tested_at: Optional[datetime] = None  # Defaults to now
+    dry_run: bool = False  # Compute transitions without writing them
+
+class CovenantTransition(BaseModel):
+    covenant_id: int
+    loan_id: int
+    covenant_name: str
+    metric_name: str
+    threshold_value: float
+    comparison_operator: str
+    current_value: float
+    previous_status: CovenantStatus
+    status: CovenantStatus
+
+class CovenantEvaluationResponse(BaseModel):
+    evaluated: int  # Covenants re-tested
+    transitions: List[CovenantTransition]  # Covenants whose status changed
+    unmatched: List[MetricObservation]  # Observations with no evaluable covenant
@@ -9,16 +9,30 @@ class DocumentBase(BaseModel):
 class DocumentCreate(DocumentBase):
     pass
 
-class DocumentResponse(DocumentBase):
+class DocumentSummary(DocumentBase):
+    """List view; the extracted text is served by GET /api/documents/{id}/text"""
     id: int
-    file_path: str
-    file_type: str
     file_size: int
     status: DocumentStatus
-    extracted_text: Optional[str] = None
-    error_message: Optional[str] = None
+    page_count: Optional[int] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
+
+class DocumentResponse(DocumentSummary):
+    file_path: str
+    file_type: str
+    content_hash: Optional[str] = None
+    source_document_id: Optional[int] = None
+    error_message: Optional[str] = None
+
+class DocumentTextResponse(BaseModel):
+    """Extracted text of a range of pages"""
+    document_id: int
+    page_count: int
+    start_page: int
+    end_page: int
+    next_page: Optional[int] = None  # None on the last range
+    text: str
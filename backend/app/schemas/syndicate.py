@@ -21,7 +21,10 @@ class SyndicateResponse(BaseModel):
     weighted_avg_interest_rate: float
     number_of_banks: int
     optimization_score: Optional[float] = None
+    total_fees: Optional[float] = None
+    concentration: Optional[float] = None
     is_optimized: bool
+    is_candidate: bool = False
     is_approved_by_client: bool
     created_at: datetime
     members: List[SyndicateMemberResponse] = []
@@ -36,3 +39,27 @@ class OptimizationRequest(BaseModel):
     max_interest_rate: Optional[float] = None
     min_banks: Optional[int] = 1
     max_banks: Optional[int] = 10
+    time_budget_seconds: Optional[float] = None  # Defaults to OPTIMIZER_TIME_BUDGET_SECONDS, at most OPTIMIZER_MAX_TIME_BUDGET_SECONDS
+    use_all_in_cost: bool = False  # Rank on interest plus annualized fees and penalties
+
+class ParetoRequest(BaseModel):
+    """Request for the cost / bank count / concentration frontier of a proposal"""
+    loan_proposal_id: int
+    target_amount: float
+    min_banks: Optional[int] = 1
+    max_banks: Optional[int] = 10
+    concentration_step: float = 0.05  # Spacing of the single-bank share caps tried, 0.01 to 1
+    use_all_in_cost: bool = False
+    persist: bool = True  # Store the frontier as candidate syndicates
+
+class ScenarioSweepRequest(BaseModel):
+    """Grid of constraint scenarios to evaluate against a proposal's quotes"""
+    loan_proposal_id: int
+    target_amounts: List[float]
+    max_interest_rates: List[Optional[float]] = [None]
+    max_banks: List[int] = [10]
+
+class ScenarioSweepResponse(BaseModel):
+    """Scenario-by-metric matrix, one row per scenario in grid order"""
+    metrics: List[str]
+    scenarios: List[List[Optional[float]]]
@@ -1,7 +1,24 @@
 import json
 import re
-from typing import Dict, Any, Optional
+import asyncio
+from typing import Dict, Any, List, Optional
 from app.core.config import settings
+from app.services.llm_cache import with_llm_cache
+from app.services.llm_client import AsyncLLMClient
+
+# Line starts that open a new clause, section or schedule in LMA-style agreements
+SECTION_BOUNDARY = re.compile(
+    r'^[ \t]*(?:'
+    r'\d{1,2}(?:\.\d{1,2})*\.?[ \t]+[A-Z]'
+    r'|(?:SCHEDULE|Schedule|ARTICLE|Article|SECTION|Section|CLAUSE|Clause|PART|Part)[ \t]+[0-9IVXLC]+'
+    r')',
+    re.MULTILINE
+)
+
+SCALAR_FIELDS = [
+    "borrower_name", "facility_type", "loan_amount", "currency", "interest_rate",
+    "maturity_date", "origination_date", "agent_bank", "purpose", "governing_law"
+]
 
 class AIExtractor:
     """AI-powered extraction of structured loan data from document text"""
@@ -15,17 +32,47 @@ class AIExtractor:
         if settings.GEMINI_API_KEY:
             import google.generativeai as genai
             genai.configure(api_key=settings.GEMINI_API_KEY)
-            self.client = genai.GenerativeModel('gemini-1.5-flash')
+            self.client = with_llm_cache(
+                genai.GenerativeModel('gemini-1.5-flash'),
+                "ai_extractor",
+                settings.LLM_CACHE_AI_EXTRACTOR
+            )
             self.provider = "gemini"
         else:
             self.provider = None
 
-    def extract_loan_data(self, document_text: str) -> Dict[str, Any]:
+    def extract_loan_data(self, document_text: str, raise_errors: bool = False) -> Dict[str, Any]:
         """
         Extract structured loan data from document text using AI
 
+        Synchronous entry point for the ingestion worker and sync endpoints:
+        runs extract_loan_data_async in an event loop of its own. Async code
+        must await extract_loan_data_async instead.
+
+        Args:
+            document_text: Raw text extracted from loan document
+            raise_errors: Re-raise AI errors instead of falling back to regex
+
+        Returns:
+            Dictionary containing extracted loan information
+        """
+        if not self.client:
+            return self._extract_with_regex(document_text)
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.extract_loan_data_async(document_text, raise_errors))
+        raise RuntimeError("extract_loan_data called from a running event loop; await extract_loan_data_async")
+
+    async def extract_loan_data_async(self, document_text: str, raise_errors: bool = False) -> Dict[str, Any]:
+        """
+        Extract structured loan data from document text using AI, without blocking the event loop
+
         Args:
             document_text: Raw text extracted from loan document
+            raise_errors: Re-raise AI errors instead of falling back to regex,
+                so the job worker can retry them
 
         Returns:
             Dictionary containing extracted loan information
@@ -35,25 +82,158 @@ class AIExtractor:
 
         try:
             if self.provider == "gemini":
-                return self._extract_with_gemini(document_text)
+                return await self._extract_with_gemini(document_text)
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"AI extraction failed: {str(e)}, falling back to regex")
             return self._extract_with_regex(document_text)
 
-    def _extract_with_gemini(self, text: str) -> Dict[str, Any]:
-        """Extract using Google Gemini"""
-        prompt = self._create_extraction_prompt(text)
+    async def _extract_with_gemini(self, text: str) -> Dict[str, Any]:
+        """
+        Extract using Google Gemini
+
+        Documents longer than AI_EXTRACTION_CHUNK_CHARS are split on clause
+        boundaries and the chunks are extracted concurrently (map), then the
+        partial results are merged into a single loan dict (reduce).
+        """
+        chunks = self._split_into_chunks(text, settings.AI_EXTRACTION_CHUNK_CHARS)
+
+        if len(chunks) <= 1:
+            prompt = self._create_extraction_prompt(text)
+            response = await AsyncLLMClient(self.client).generate_content(prompt)
+            return self._parse_ai_response(response.text)
+
+        partials = await self._extract_chunks(chunks)
+
+        if not any(partials):
+            raise ValueError("No chunk produced a parseable extraction")
 
-        response = self.client.generate_content(prompt)
-        content = response.text
-        return self._parse_ai_response(content)
+        return self._merge_extractions(partials)
 
-    def _create_extraction_prompt(self, text: str) -> str:
+    async def _extract_chunks(self, chunks: List[str]) -> List[Dict[str, Any]]:
+        """Run one extraction per chunk, at most AI_EXTRACTION_CONCURRENCY at a time"""
+        semaphore = asyncio.Semaphore(settings.AI_EXTRACTION_CONCURRENCY)
+        llm = AsyncLLMClient(self.client)
+
+        async def extract_chunk(index: int, chunk: str) -> Dict[str, Any]:
+            prompt = self._create_extraction_prompt(chunk, part=index + 1, total=len(chunks))
+            async with semaphore:
+                try:
+                    response = await llm.generate_content(prompt)
+                    return self._parse_ai_response(response.text)
+                except Exception as e:
+                    print(f"Chunk {index + 1}/{len(chunks)} extraction failed: {str(e)}")
+                    return {}
+
+        return await asyncio.gather(*(extract_chunk(i, chunk) for i, chunk in enumerate(chunks)))
+
+    def _split_into_chunks(self, text: str, max_chars: int) -> List[str]:
+        """
+        Split document text into chunks of at most max_chars
+
+        Splits at clause/section/schedule headings and packs consecutive
+        sections together. Sections that are still too long are split on
+        paragraph breaks, then hard-cut as a last resort.
+        """
+        if len(text) <= max_chars:
+            return [text]
+
+        starts = [m.start() for m in SECTION_BOUNDARY.finditer(text)]
+        if not starts or starts[0] != 0:
+            starts.insert(0, 0)
+        sections = [text[start:end] for start, end in zip(starts, starts[1:] + [len(text)])]
+
+        pieces = []
+        for section in sections:
+            if len(section) <= max_chars:
+                pieces.append(section)
+                continue
+            for paragraph in re.split(r'(?<=\n\n)', section):
+                for offset in range(0, len(paragraph), max_chars):
+                    pieces.append(paragraph[offset:offset + max_chars])
+
+        chunks = []
+        current = []
+        current_len = 0
+        for piece in pieces:
+            if current and current_len + len(piece) > max_chars:
+                chunks.append("".join(current))
+                current = []
+                current_len = 0
+            current.append(piece)
+            current_len += len(piece)
+        if current:
+            chunks.append("".join(current))
+
+        return [chunk for chunk in chunks if chunk.strip()]
+
+    def _merge_extractions(self, partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Merge per-chunk extractions into one loan dict
+
+        Scalar terms take the first non-empty value in document order (terms
+        are normally defined before they are used). Lead arrangers and
+        covenants are concatenated and de-duplicated.
+        """
+        merged: Dict[str, Any] = {}
+
+        for field in SCALAR_FIELDS:
+            for partial in partials:
+                value = partial.get(field)
+                if value not in (None, "", [], {}):
+                    merged[field] = value
+                    break
+
+        arrangers = []
+        seen_arrangers = set()
+        for partial in partials:
+            for arranger in partial.get("lead_arrangers") or []:
+                key = str(arranger).strip().lower()
+                if key and key not in seen_arrangers:
+                    seen_arrangers.add(key)
+                    arrangers.append(arranger)
+        merged["lead_arrangers"] = arrangers
+
+        covenants = []
+        seen_covenants = set()
+        for partial in partials:
+            for covenant in partial.get("covenants") or []:
+                if not isinstance(covenant, dict):
+                    continue
+                key = (
+                    str(covenant.get("covenant_name") or "").strip().lower(),
+                    str(covenant.get("metric_name") or "").strip().lower(),
+                    covenant.get("threshold_value"),
+                    covenant.get("comparison_operator")
+                )
+                if key not in seen_covenants:
+                    seen_covenants.add(key)
+                    covenants.append(covenant)
+        merged["covenants"] = covenants
+
+        confidences = [
+            p["extraction_confidence"] for p in partials
+            if isinstance(p.get("extraction_confidence"), (int, float))
+        ]
+        merged["extraction_confidence"] = max(confidences) if confidences else 0.0
+        merged["chunks_processed"] = len(partials)
+
+        return merged
+
+    def _create_extraction_prompt(self, text: str, part: int = 1, total: int = 1) -> str:
         """Create prompt for AI extraction"""
-        return f"""You are an expert in syndicated loan documentation. Extract key information from this loan document.
+        scope = ""
+        if total > 1:
+            scope = (
+                f"\nThis is part {part} of {total} of the document. Extract only what appears in this part "
+                f"and use null (or an empty list) for anything not stated here.\n"
+            )
 
+        return f"""You are an expert in syndicated loan documentation. Extract key information from this loan document.
+{scope}
 Document text:
-{text[:4000]}
+{text}
 
 Extract the following information and return as JSON:
 {{
@@ -0,0 +1,76 @@
+"""All-in cost of a bank quotation as an effective annual rate"""
+from dataclasses import dataclass
+from typing import Dict, Optional
+from app.core.config import settings
+from app.services.loan_optimizer import QuotationData
+
+# Fee keys (percent of the allocation) charged once at signing
+UPFRONT_FEES = ("upfront_fee", "arrangement_fee", "participation_fee", "underwriting_fee")
+# Charged per annum on the undrawn part of the commitment only
+UNDRAWN_FEES = ("commitment_fee",)
+# Any other numeric fee (facility_fee, agent_fee, ...) is treated as percent per annum
+
+@dataclass
+class AllInCostModel:
+    """
+    Turns a quotation's fees, prepayment penalty and term into percent p.a.
+
+    all-in rate = interest rate
+                + per-annum fees
+                + commitment fee * expected undrawn share
+                + (upfront fees + prepayment probability * penalty) / offered term in years
+                + refinancing cost / desired term in years, if the offered term is shorter
+    """
+    undrawn_share: Optional[float] = None
+    prepayment_probability: Optional[float] = None
+    refinancing_cost: Optional[float] = None
+    default_term_months: int = 60
+
+    def __post_init__(self):
+        if self.undrawn_share is None:
+            self.undrawn_share = settings.ALL_IN_UNDRAWN_SHARE
+        if self.prepayment_probability is None:
+            self.prepayment_probability = settings.ALL_IN_PREPAYMENT_PROBABILITY
+        if self.refinancing_cost is None:
+            self.refinancing_cost = settings.ALL_IN_REFINANCING_COST
+
+    def components(
+        self,
+        fees: Optional[dict],
+        early_repayment_penalty: Optional[float],
+        term_months: Optional[int],
+        desired_term_months: Optional[int] = None
+    ) -> Dict[str, float]:
+        """Cost components in percent per annum, excluding the interest rate"""
+        term_years = (term_months or desired_term_months or self.default_term_months) / 12
+        desired_years = (desired_term_months or term_months or self.default_term_months) / 12
+
+        per_annum = 0.0
+        undrawn = 0.0
+        upfront = 0.0
+        for name, value in (fees or {}).items():
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            if name in UPFRONT_FEES:
+                upfront += value
+            elif name in UNDRAWN_FEES:
+                undrawn += value
+            else:
+                per_annum += value
+
+        refinancing = 0.0
+        if term_years < desired_years:
+            refinancing = self.refinancing_cost / desired_years
+
+        return {
+            "per_annum_fees": per_annum,
+            "commitment_fees": undrawn * self.undrawn_share,
+            "upfront_fees": upfront / term_years,
+            "prepayment_penalty": self.prepayment_probability * (early_repayment_penalty or 0.0) / term_years,
+            "refinancing": refinancing,
+        }
+
+    def all_in_rate(self, quote: QuotationData, desired_term_months: Optional[int] = None) -> float:
+        """Effective annual rate including fees, in percent"""
+        components = self.components(quote.fees, quote.early_repayment_penalty, quote.term_months, desired_term_months)
+        return quote.interest_rate + sum(components.values())
@@ -0,0 +1,236 @@
+"""Process-local, read-only snapshot of the bank directory"""
+import bisect
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.bank import Bank, BankDirectoryVersion
+from app.services.capacity_index import CapacityIndex
+
+_EMPTY: FrozenSet[int] = frozenset()
+
+@dataclass(frozen=True)
+class BankRecord:
+    """Immutable copy of a Bank row; has the attributes BankResponse and _bank_profile read"""
+    id: int
+    name: str
+    short_name: Optional[str]
+    bank_type: Optional[str]
+    headquarters_country: Optional[str]
+    headquarters_city: Optional[str]
+    contact_email: Optional[str]
+    website: Optional[str]
+    total_assets_usd: Optional[float]
+    tier1_capital_ratio: Optional[float]
+    credit_rating: Optional[str]
+    rating_rank: Optional[int]
+    min_loan_amount: float
+    max_loan_amount: Optional[float]
+    preferred_sectors: Tuple[str, ...]
+    regions_served: Tuple[str, ...]
+    risk_appetite: Optional[str]
+    default_rate_percentage: Optional[float]
+    avg_interest_rate: Optional[float]
+    participation_count: int
+    is_active: bool
+    is_verified: bool
+    description: Optional[str]
+    logo_url: Optional[str]
+    created_at: Optional[datetime]
+    version: int
+
+    @classmethod
+    def from_bank(cls, bank: Bank) -> "BankRecord":
+        return cls(
+            id=bank.id,
+            name=bank.name,
+            short_name=bank.short_name,
+            bank_type=bank.bank_type,
+            headquarters_country=bank.headquarters_country,
+            headquarters_city=bank.headquarters_city,
+            contact_email=bank.contact_email,
+            website=bank.website,
+            total_assets_usd=bank.total_assets_usd,
+            tier1_capital_ratio=bank.tier1_capital_ratio,
+            credit_rating=bank.credit_rating,
+            rating_rank=bank.rating_rank,
+            min_loan_amount=bank.min_loan_amount or 0,
+            max_loan_amount=bank.max_loan_amount,
+            preferred_sectors=tuple(bank.preferred_sectors or ()),
+            regions_served=tuple(bank.regions_served or ()),
+            risk_appetite=bank.risk_appetite,
+            default_rate_percentage=bank.default_rate_percentage,
+            avg_interest_rate=bank.avg_interest_rate,
+            participation_count=bank.participation_count or 0,
+            is_active=bool(bank.is_active),
+            is_verified=bool(bank.is_verified),
+            description=bank.description,
+            logo_url=bank.logo_url,
+            created_at=bank.created_at,
+            version=bank.version,
+        )
+
+    def can_lend(self, amount: float) -> bool:
+        """Whether amount is within the bank's ticket size range"""
+        return self.min_loan_amount <= amount and (self.max_loan_amount is None or amount <= self.max_loan_amount)
+
+
+def _group(records: Iterable[BankRecord], key) -> Mapping[str, FrozenSet[int]]:
+    groups: Dict[str, set] = {}
+    for record in records:
+        for value in key(record):
+            groups.setdefault(value, set()).add(record.id)
+    return MappingProxyType({value: frozenset(ids) for value, ids in groups.items()})
+
+
+class BankDirectory:
+    """
+    Every bank, indexed for the lookups the API makes
+
+    Built once per directory version and never modified, so request
+    threads share it without locking. banks and by_name cover every bank;
+    the other indexes cover active banks only, as search and stats do.
+    Index values are frozensets of bank ids: filters are set
+    intersections and lookups are dictionary reads.
+    """
+
+    def __init__(self, banks: Iterable[Bank], version: int):
+        self.version = version
+        records = [BankRecord.from_bank(bank) for bank in banks]
+        records.sort(key=lambda r: r.id)
+        self.banks: Mapping[int, BankRecord] = MappingProxyType({r.id: r for r in records})
+        self.by_name: Mapping[str, BankRecord] = MappingProxyType({r.name: r for r in records})
+
+        active = [r for r in records if r.is_active]
+        self.active_ids: FrozenSet[int] = frozenset(r.id for r in active)
+        self.by_country = _group(active, lambda r: (r.headquarters_country,))
+        self.by_type = _group(active, lambda r: (r.bank_type,))
+        self.by_risk_appetite = _group(active, lambda r: (r.risk_appetite,))
+        self.by_sector = _group(active, lambda r: r.preferred_sectors)
+        self.by_region = _group(active, lambda r: r.regions_served)
+        self.by_rating_rank = _group(active, lambda r: (r.rating_rank,) if r.rating_rank is not None else ())
+
+        # Banks rated at least each rank, so a minimum-rating filter is one lookup
+        self._rating_ranks = sorted(self.by_rating_rank)
+        self._at_least_rank: Dict[int, FrozenSet[int]] = {}
+        at_least: FrozenSet[int] = frozenset()
+        for rank in reversed(self._rating_ranks):
+            at_least = at_least | self.by_rating_rank[rank]
+            self._at_least_rank[rank] = at_least
+
+        self.capacity = CapacityIndex(
+            (r.id, r.min_loan_amount, r.max_loan_amount)
+            for r in active if r.max_loan_amount is None or r.max_loan_amount >= r.min_loan_amount
+        )
+
+    def get(self, bank_id: int) -> Optional[BankRecord]:
+        return self.banks.get(bank_id)
+
+    def get_many(self, bank_ids: Iterable[int]) -> List[BankRecord]:
+        """Records for the ids that exist, in the order given"""
+        return [self.banks[i] for i in bank_ids if i in self.banks]
+
+    def ids_for_amount(self, amount: float) -> FrozenSet[int]:
+        """Active banks whose ticket size range contains amount"""
+        return frozenset(self.capacity.containing(amount))
+
+    def ids_for_share(self, deal_amount: float, min_share: float) -> FrozenSet[int]:
+        """Active banks that can take at least min_share (a fraction) of deal_amount"""
+        return frozenset(self.capacity.can_take_share(deal_amount, min_share))
+
+    def ids_with_min_rating(self, min_rank: int) -> FrozenSet[int]:
+        """Active banks rated min_rank or better (unrated banks never match)"""
+        i = bisect.bisect_left(self._rating_ranks, min_rank)
+        return self._at_least_rank[self._rating_ranks[i]] if i < len(self._rating_ranks) else frozenset()
+
+    def search(
+        self,
+        loan_amount: Optional[float] = None,
+        sector: Optional[str] = None,
+        region: Optional[str] = None,
+        min_rank: Optional[int] = None
+    ) -> List[BankRecord]:
+        """Active banks matching every given filter, by id"""
+        filters = []
+        if loan_amount:
+            filters.append(self.capacity.containing(loan_amount))
+        if sector:
+            filters.append(self.by_sector.get(sector, _EMPTY))
+        if region:
+            filters.append(self.by_region.get(region, _EMPTY))
+        if min_rank is not None:
+            filters.append(self.ids_with_min_rating(min_rank))
+
+        if not filters:
+            ids = self.active_ids
+        else:
+            # Smallest set first keeps every intersection step small
+            filters.sort(key=len)
+            ids = filters[0].intersection(*filters[1:])
+        return [self.banks[i] for i in sorted(ids)]
+
+    def stats(self) -> dict:
+        """Counts of active banks, as served by /api/banks/stats"""
+        return {
+            "total_banks": len(self.active_ids),
+            "by_country": {country: len(ids) for country, ids in self.by_country.items()},
+            "by_type": {type_: len(ids) for type_, ids in self.by_type.items()},
+            "by_risk_appetite": {risk: len(ids) for risk, ids in self.by_risk_appetite.items()},
+        }
+
+
+_directory: Optional[BankDirectory] = None
+_checked_at = 0.0
+_stale = False
+_lock = threading.Lock()
+
+def _stored_version(db: Session) -> int:
+    version = db.query(BankDirectoryVersion.version).filter(BankDirectoryVersion.id == 1).scalar()
+    return version or 0
+
+def get_bank_directory(db: Session) -> BankDirectory:
+    """
+    The current directory snapshot, reloaded when the stored version moves
+
+    Writes in this process invalidate it on commit. Writes by other workers
+    are noticed on the next version check, which runs at most once per
+    BANK_DIRECTORY_CHECK_SECONDS (a primary key lookup); in between, calls
+    cost no queries at all.
+    """
+    global _directory, _checked_at, _stale
+    now = time.monotonic()
+    directory = _directory
+    if directory is not None and not _stale and now - _checked_at < settings.BANK_DIRECTORY_CHECK_SECONDS:
+        return directory
+
+    with _lock:
+        if _directory is not None and not _stale and now - _checked_at < settings.BANK_DIRECTORY_CHECK_SECONDS:
+            return _directory
+        # Read the version before the rows: a write in between makes the
+        # snapshot newer than its label (reloaded again next check), never older
+        _stale = False
+        version = _stored_version(db)
+        if _directory is None or _directory.version != version:
+            _directory = BankDirectory(db.query(Bank).all(), version)
+        _checked_at = now
+        return _directory
+
+def invalidate_bank_directory():
+    """Reload on the next get_bank_directory call"""
+    global _stale
+    _stale = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("bank_directory_changed", False):
+        invalidate_bank_directory()
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session):
+    session.info.pop("bank_directory_changed", None)
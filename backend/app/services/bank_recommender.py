@@ -0,0 +1,290 @@
+"""Rank banks by how likely they are to take part in a loan proposal"""
+import heapq
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.client_research import ClientResearch
+from app.models.loan_proposal import LoanProposal
+from app.models.quotation import Quotation, QuotationStatus
+from app.services.bank_directory import BankDirectory, BankRecord, get_bank_directory
+
+# Relative weight of each feature score (each in [0, 1]) in a bank's total
+FEATURE_WEIGHTS = {
+    "sector": 0.25,
+    "region": 0.15,
+    "capacity": 0.15,
+    "risk": 0.15,
+    "pricing": 0.10,
+    "participation": 0.05,
+    "acceptance": 0.15,
+}
+
+# Score given when a feature cannot be judged (unknown industry, unrated pricing, ...)
+NEUTRAL = 0.5
+
+RISK_APPETITE_LEVELS = {"conservative": 0, "moderate": 1, "aggressive": 2}
+BORROWER_RISK_LEVELS = {"low": 0, "medium": 1, "moderate": 1, "high": 2}
+
+# Region names used in Bank.regions_served, by borrower country
+COUNTRY_REGIONS = {
+    **dict.fromkeys([
+        "Austria", "Belgium", "France", "Germany", "Greece", "Ireland", "Italy", "Luxembourg",
+        "Netherlands", "Poland", "Portugal", "Spain", "Switzerland", "UK", "United Kingdom",
+    ], ("Europe",)),
+    **dict.fromkeys(["Denmark", "Finland", "Iceland", "Norway", "Sweden"], ("Europe", "Nordic Region")),
+    **dict.fromkeys([
+        "Bahrain", "Egypt", "Israel", "Jordan", "Kuwait", "Oman", "Qatar", "Saudi Arabia",
+        "Turkey", "UAE", "United Arab Emirates",
+    ], ("Middle East",)),
+    **dict.fromkeys([
+        "Ghana", "Kenya", "Morocco", "Nigeria", "South Africa", "Tanzania", "Uganda",
+    ], ("Africa",)),
+    **dict.fromkeys([
+        "China", "Hong Kong", "India", "Indonesia", "Japan", "Malaysia", "Singapore",
+        "South Korea", "Thailand", "Vietnam",
+    ], ("Asia",)),
+    **dict.fromkeys(["Canada", "United States", "USA", "US"], ("North America",)),
+    **dict.fromkeys(["Argentina", "Brazil", "Chile", "Colombia", "Mexico", "Peru"], ("Latin America",)),
+}
+
+@dataclass
+class BankRecommendation:
+    """A ranked bank with the feature scores behind its rank"""
+    bank: BankRecord
+    score: float
+    max_ticket: float  # Largest amount the bank can lend on this deal
+    features: Dict[str, float]
+
+
+class BankFeatures:
+    """
+    Per-bank feature vectors that do not depend on the proposal
+
+    Built once per directory version, as arrays aligned with ids: ticket
+    size limits, risk appetite level, average rate and normalized track
+    record. Proposal-specific scores are then whole-array operations.
+    Acceptance rates come from the quotations table, not the directory, so
+    they are cached here as (computed at, scores) and recounted after
+    BANK_ACCEPTANCE_REFRESH_SECONDS.
+    """
+
+    def __init__(self, directory: BankDirectory):
+        self.version = directory.version
+        self.ids = np.array(sorted(directory.active_ids), dtype=np.int64)
+        self.position = {int(bank_id): i for i, bank_id in enumerate(self.ids)}
+        banks = [directory.banks[int(i)] for i in self.ids]
+
+        self.max_loan = np.array([
+            math.inf if b.max_loan_amount is None else b.max_loan_amount for b in banks
+        ], dtype=float)
+        self.appetite = np.array([
+            RISK_APPETITE_LEVELS.get((b.risk_appetite or "").lower(), np.nan) for b in banks
+        ], dtype=float)
+        self.avg_rate = np.array([
+            np.nan if b.avg_interest_rate is None else b.avg_interest_rate for b in banks
+        ], dtype=float)
+        self.hq_country = np.array([(b.headquarters_country or "").lower() for b in banks])
+
+        participation = np.log1p(np.array([b.participation_count for b in banks], dtype=float))
+        top = participation.max() if len(participation) else 0
+        self.participation = participation / top if top > 0 else np.full(len(banks), NEUTRAL)
+        self.acceptance: Optional[Tuple[float, np.ndarray]] = None
+
+    def mask(self, bank_ids: Iterable[int]) -> np.ndarray:
+        """Boolean array marking bank_ids"""
+        marked = np.zeros(len(self.ids), dtype=bool)
+        positions = [self.position[i] for i in bank_ids if i in self.position]
+        marked[positions] = True
+        return marked
+
+
+_features: Optional[BankFeatures] = None
+_features_lock = threading.Lock()
+
+def get_bank_features(directory: BankDirectory) -> BankFeatures:
+    """Feature vectors for the given directory snapshot, rebuilt when its version changes"""
+    global _features
+    features = _features
+    if features is not None and features.version == directory.version:
+        return features
+    with _features_lock:
+        if _features is None or _features.version != directory.version:
+            _features = BankFeatures(directory)
+        return _features
+
+
+class BankRecommender:
+    """
+    Rank the directory's banks for a loan proposal
+
+    Each bank gets a score in [0, 1] for sector fit, region served,
+    capacity (share of the deal it can take), risk appetite against the
+    researched borrower risk, pricing, track record and how often its
+    quotes were accepted, combined with FEATURE_WEIGHTS. Banks that
+    cannot lend on the deal at all are left out. The top k are taken with
+    a heap, so ranking costs O(n log k).
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def recommend(
+        self,
+        proposal: LoanProposal,
+        k: int = 10,
+        exclude_bank_ids: Optional[Set[int]] = None
+    ) -> List[BankRecommendation]:
+        directory = get_bank_directory(self.db)
+        features = get_bank_features(directory)
+        deal = proposal.requested_amount or 0
+        if deal <= 0 or not len(features.ids):
+            return []
+
+        research = self.db.query(ClientResearch.industry_sector, ClientResearch.risk_assessment).filter(
+            ClientResearch.loan_proposal_id == proposal.id
+        ).first()
+        industry = proposal.client_industry or (research.industry_sector if research else None)
+        risk_assessment = research.risk_assessment if research else None
+
+        scores = {
+            "sector": self._sector_scores(directory, features, industry),
+            "region": self._region_scores(directory, features, proposal.client_country),
+            "capacity": np.minimum(features.max_loan, deal) / deal,
+            "risk": self._risk_scores(features, risk_assessment),
+            "pricing": self._pricing_scores(features, proposal.max_acceptable_rate),
+            "participation": features.participation,
+            "acceptance": self._acceptance_scores(features),
+        }
+        total = sum(FEATURE_WEIGHTS[name] * values for name, values in scores.items())
+
+        eligible = features.mask(directory.ids_for_share(deal, 0))
+        if exclude_bank_ids:
+            eligible &= ~features.mask(exclude_bank_ids)
+
+        top = heapq.nlargest(
+            k,
+            ((float(total[i]), -int(features.ids[i]), i) for i in np.flatnonzero(eligible))
+        )
+        return [
+            BankRecommendation(
+                bank=directory.banks[int(features.ids[i])],
+                score=round(score, 4),
+                max_ticket=float(min(features.max_loan[i], deal)),
+                features={name: round(float(values[i]), 4) for name, values in scores.items()}
+            )
+            for score, _, i in top
+        ]
+
+    def _sector_scores(self, directory: BankDirectory, features: BankFeatures, industry: Optional[str]) -> np.ndarray:
+        """1 for a preferred sector named like the industry, 0.7 when one contains the other"""
+        if not industry:
+            return np.full(len(features.ids), NEUTRAL)
+        industry = industry.strip().lower()
+        scores = np.zeros(len(features.ids))
+        for sector, bank_ids in directory.by_sector.items():
+            name = sector.lower()
+            if name == industry:
+                score = 1.0
+            elif name in industry or industry in name:
+                score = 0.7
+            else:
+                continue
+            marked = features.mask(bank_ids)
+            scores[marked] = np.maximum(scores[marked], score)
+        return scores
+
+    def _region_scores(self, directory: BankDirectory, features: BankFeatures, country: Optional[str]) -> np.ndarray:
+        """1 for banks serving the borrower's region or based in its country"""
+        if not country:
+            return np.full(len(features.ids), NEUTRAL)
+        country = country.strip()
+        regions = COUNTRY_REGIONS.get(country, ())
+        served: Set[int] = set()
+        for region in regions:
+            served |= directory.by_region.get(region, set())
+        scores = features.mask(served).astype(float)
+        scores[features.hq_country == country.lower()] = 1.0
+        if not regions:
+            # Country not mapped to a region: only same-country banks are known fits
+            scores[scores == 0] = NEUTRAL
+        return scores
+
+    def _risk_scores(self, features: BankFeatures, risk_assessment: Optional[str]) -> np.ndarray:
+        """
+        Fit of risk appetite to borrower risk
+
+        An appetite below the borrower's risk costs 0.5 per level (a
+        conservative bank rarely quotes a high-risk borrower); above it
+        only 0.25 per level (an aggressive bank still lends, less keenly).
+        """
+        level = _borrower_risk_level(risk_assessment)
+        if level is None:
+            return np.full(len(features.ids), NEUTRAL)
+        gap = features.appetite - level
+        scores = np.where(gap >= 0, 1 - 0.25 * gap, 1 + 0.5 * gap)
+        return np.nan_to_num(scores, nan=NEUTRAL)
+
+    def _pricing_scores(self, features: BankFeatures, max_acceptable_rate: Optional[float]) -> np.ndarray:
+        """Cheapest average rate 1, dearest 0; 0 above the borrower's maximum rate"""
+        rates = features.avg_rate
+        known = ~np.isnan(rates)
+        scores = np.full(len(rates), NEUTRAL)
+        if known.any():
+            low, high = rates[known].min(), rates[known].max()
+            scores[known] = 1.0 if high == low else (high - rates[known]) / (high - low)
+            if max_acceptable_rate:
+                scores[known & (rates > max_acceptable_rate)] = 0.0
+        return scores
+
+    def _acceptance_scores(self, features: BankFeatures) -> np.ndarray:
+        """
+        Share of past quotation requests that ended with the bank's quote accepted
+
+        A quote counts when it was accepted or selected into a syndicate.
+        Smoothed as (accepted + 1) / (answered + 2), so a bank never asked
+        scores 0.5 and a few answers move it only part of the way.
+        """
+        cached = features.acceptance
+        if cached is not None and time.monotonic() - cached[0] < settings.BANK_ACCEPTANCE_REFRESH_SECONDS:
+            return cached[1]
+
+        computed_at = time.monotonic()
+        accepted, answered = np.zeros(len(features.ids)), np.zeros(len(features.ids))
+        for bank_id, bank_accepted, bank_answered in self._quotation_history():
+            position = features.position.get(bank_id)
+            if position is not None:
+                accepted[position] = bank_accepted
+                answered[position] = bank_answered
+        scores = (accepted + 1) / (answered + 2)
+        features.acceptance = (computed_at, scores)
+        return scores
+
+    def _quotation_history(self) -> List[Tuple[int, int, int]]:
+        """(bank_id, requests accepted, requests answered) over all quotations, in one query"""
+        answered = (
+            QuotationStatus.RESPONDED, QuotationStatus.ACCEPTED,
+            QuotationStatus.REJECTED, QuotationStatus.EXPIRED
+        )
+        accepted = (Quotation.status == QuotationStatus.ACCEPTED) | Quotation.is_selected.is_(True)
+        return self.db.query(
+            Quotation.bank_id,
+            func.sum(case((accepted, 1), else_=0)),
+            func.sum(case((Quotation.status.in_(answered), 1), else_=0))
+        ).group_by(Quotation.bank_id).all()
+
+
+def _borrower_risk_level(risk_assessment: Optional[str]) -> Optional[int]:
+    """0/1/2 for a Low/Medium/High research risk level, None if it names none"""
+    if not risk_assessment:
+        return None
+    words = risk_assessment.lower().replace("-", " ").split()
+    for word in words:
+        if word in BORROWER_RISK_LEVELS:
+            return BORROWER_RISK_LEVELS[word]
+    return None
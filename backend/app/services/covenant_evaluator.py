@@ -0,0 +1,170 @@
+"""Covenant compliance testing, one covenant at a time or thousands at once"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+from app.models.covenant import Covenant, CovenantStatus
+from app.models.portfolio_summary import refresh_for_loans
+
+# Headroom rules: within 20% of a <= / >= threshold is a warning, and an
+# == covenant is compliant within 5% of its threshold
+WARNING_MARGIN = 0.2
+EQUALITY_TOLERANCE = 0.05
+
+# Status codes used in the vectorized evaluation, indexes into STATUSES
+STATUSES = [CovenantStatus.COMPLIANT, CovenantStatus.WARNING, CovenantStatus.BREACH, CovenantStatus.UNKNOWN]
+COMPLIANT, WARNING, BREACH, UNKNOWN = range(4)
+
+OPERATOR_CODES = {"<=": 0, ">=": 1, "==": 2, "=": 2}
+LESS_EQUAL, GREATER_EQUAL, EQUAL, UNSUPPORTED = 0, 1, 2, -1
+
+def covenant_status(current: float, threshold: float, operator: str) -> CovenantStatus:
+    """Status of one covenant; same rules as evaluate_statuses"""
+    statuses = evaluate_statuses(
+        np.array([current], dtype=float),
+        np.array([threshold], dtype=float),
+        np.array([OPERATOR_CODES.get((operator or "").strip(), UNSUPPORTED)])
+    )
+    return STATUSES[statuses[0]]
+
+def evaluate_statuses(current: np.ndarray, threshold: np.ndarray, operator: np.ndarray) -> np.ndarray:
+    """
+    Status codes for aligned arrays of values, thresholds and operator codes
+
+    <= covenants are compliant up to (1 - WARNING_MARGIN) x threshold, a
+    warning up to the threshold and a breach above it; >= mirrors that
+    with (1 + WARNING_MARGIN). == covenants are compliant within
+    EQUALITY_TOLERANCE of the threshold, otherwise breached. Unsupported
+    operators and missing numbers give UNKNOWN.
+    """
+    with np.errstate(invalid="ignore"):
+        less_equal = np.where(
+            current <= threshold * (1 - WARNING_MARGIN), COMPLIANT,
+            np.where(current <= threshold, WARNING, BREACH)
+        )
+        greater_equal = np.where(
+            current >= threshold * (1 + WARNING_MARGIN), COMPLIANT,
+            np.where(current >= threshold, WARNING, BREACH)
+        )
+        equal = np.where(np.abs(current - threshold) <= threshold * EQUALITY_TOLERANCE, COMPLIANT, BREACH)
+
+    statuses = np.select(
+        [operator == LESS_EQUAL, operator == GREATER_EQUAL, operator == EQUAL],
+        [less_equal, greater_equal, equal],
+        default=UNKNOWN
+    )
+    statuses[np.isnan(current) | np.isnan(threshold)] = UNKNOWN
+    return statuses
+
+
+class CovenantEvaluator:
+    """
+    Re-test covenants against a batch of metric observations
+
+    Every active covenant with a threshold and operator whose loan and
+    metric (case-insensitive) match an observation is evaluated in one
+    NumPy pass. All of them are written with one executemany UPDATE that
+    sets the value, status and test date and bumps version, and the
+    portfolio summary is refreshed for the loans involved.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def evaluate(
+        self,
+        observations: Iterable[Tuple[int, str, float]],
+        tested_at: Optional[datetime] = None,
+        dry_run: bool = False
+    ) -> dict:
+        """
+        Apply (loan_id, metric_name, value) observations
+
+        Returns the number of covenants evaluated, the status transitions
+        (covenants whose status changed) and observations that matched no
+        covenant. With dry_run nothing is written.
+        """
+        values: Dict[Tuple[int, str], float] = {}
+        names: Dict[Tuple[int, str], str] = {}
+        for loan_id, metric_name, value in observations:
+            key = (loan_id, metric_name.strip().lower())
+            values[key] = value  # Last observation wins
+            names[key] = metric_name
+
+        result = {"evaluated": 0, "transitions": [], "unmatched": []}
+        if not values:
+            return result
+
+        rows = self._matching_covenants(values)
+        matched = {(row.loan_id, row.metric_name.strip().lower()) for row in rows}
+        result["unmatched"] = [
+            {"loan_id": key[0], "metric_name": names[key], "value": value}
+            for key, value in values.items() if key not in matched
+        ]
+        if not rows:
+            return result
+
+        current = np.array([values[(row.loan_id, row.metric_name.strip().lower())] for row in rows], dtype=float)
+        threshold = np.array([row.threshold_value for row in rows], dtype=float)
+        operator = np.array([OPERATOR_CODES.get((row.comparison_operator or "").strip(), UNSUPPORTED) for row in rows])
+        statuses = evaluate_statuses(current, threshold, operator)
+
+        previous = np.array([STATUSES.index(row.status or CovenantStatus.UNKNOWN) for row in rows])
+        changed = np.flatnonzero(statuses != previous)
+
+        result["evaluated"] = len(rows)
+        result["transitions"] = [
+            {
+                "covenant_id": rows[i].id,
+                "loan_id": rows[i].loan_id,
+                "covenant_name": rows[i].covenant_name,
+                "metric_name": rows[i].metric_name,
+                "threshold_value": rows[i].threshold_value,
+                "comparison_operator": rows[i].comparison_operator,
+                "current_value": float(current[i]),
+                "previous_status": STATUSES[previous[i]],
+                "status": STATUSES[statuses[i]],
+            }
+            for i in changed
+        ]
+
+        if not dry_run:
+            self._write(rows, current, statuses, tested_at or datetime.utcnow())
+        return result
+
+    def _matching_covenants(self, values: Dict[Tuple[int, str], float]) -> List:
+        """Evaluable covenants of the observed loans and metrics, as plain rows"""
+        loan_ids = {loan_id for loan_id, _ in values}
+        metrics = {metric for _, metric in values}
+        rows = self.db.execute(
+            select(
+                Covenant.id, Covenant.loan_id, Covenant.covenant_name, Covenant.metric_name,
+                Covenant.threshold_value, Covenant.comparison_operator, Covenant.status
+            ).where(
+                Covenant.loan_id.in_(loan_ids),
+                func.lower(func.trim(Covenant.metric_name)).in_(metrics),
+                Covenant.is_active == True,
+                Covenant.threshold_value.isnot(None),
+                Covenant.comparison_operator.isnot(None)
+            ).order_by(Covenant.id)
+        ).all()
+        # loan_id IN x metric IN can pair a loan with another loan's metric
+        return [row for row in rows if (row.loan_id, row.metric_name.strip().lower()) in values]
+
+    def _write(self, rows: List, current: np.ndarray, statuses: np.ndarray, tested_at: datetime):
+        table = Covenant.__table__
+        statement = update(table).where(table.c.id == bindparam("b_id")).values(
+            current_value=bindparam("b_value"),
+            status=bindparam("b_status"),
+            last_tested_date=bindparam("b_tested_at"),
+            updated_at=func.now(),
+            version=table.c.version + 1  # The versioned hook does not see Core updates
+        )
+        connection = self.db.connection()
+        connection.execute(statement, [
+            {"b_id": row.id, "b_value": float(value), "b_status": STATUSES[status], "b_tested_at": tested_at}
+            for row, value, status in zip(rows, current, statuses)
+        ])
+        refresh_for_loans(connection, {row.loan_id for row in rows})
+        self.db.commit()
@@ -1,14 +1,29 @@
 import os
-import shutil
+import uuid
+import hashlib
+import aiofiles
 from typing import Optional
 from fastapi import UploadFile
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
 from app.models.document import Document, DocumentStatus
 from app.models.loan import Loan
 from app.models.covenant import Covenant, CovenantType, CovenantStatus
 from app.services.pdf_extractor import PDFExtractor
 from app.services.ai_extractor import AIExtractor
 from app.core.config import settings
+from app.core.pagination import paginate
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+PDF_MAGIC = b"%PDF-"
+
+class UploadRejected(Exception):
+    """Raised when an upload fails validation while it is being streamed"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
 
 class DocumentService:
     """Service for handling document upload and processing"""
@@ -19,19 +34,62 @@ class DocumentService:
         self.ai_extractor = AIExtractor()
 
     async def upload_document(self, file: UploadFile) -> Document:
-        """Upload and save document"""
-        file_path = os.path.join(settings.UPLOAD_DIR, file.filename)
+        """
+        Upload and save document
+
+        The file is streamed to disk in chunks without blocking the event
+        loop. The PDF header is checked on the first chunk and the upload is
+        abandoned as soon as it passes settings.MAX_UPLOAD_SIZE.
+
+        Files are stored by the SHA-256 of their contents, so identical
+        uploads share one file on disk. If the same content was already
+        processed, the new document reuses that extraction and comes back
+        with status COMPLETED.
+
+        Raises:
+            UploadRejected: If the file is not a PDF or is too large
+        """
+        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+        temp_path = os.path.join(settings.UPLOAD_DIR, f".upload-{uuid.uuid4().hex}")
+
+        sha256 = hashlib.sha256()
+        file_size = 0
+
+        try:
+            async with aiofiles.open(temp_path, "wb") as buffer:
+                while True:
+                    chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+
+                    if file_size == 0 and not chunk.startswith(PDF_MAGIC):
+                        raise UploadRejected(400, "File is not a valid PDF")
+
+                    file_size += len(chunk)
+                    if file_size > settings.MAX_UPLOAD_SIZE:
+                        raise UploadRejected(
+                            413,
+                            f"File exceeds maximum upload size of {settings.MAX_UPLOAD_SIZE} bytes"
+                        )
 
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+                    sha256.update(chunk)
+                    await buffer.write(chunk)
 
-        file_size = os.path.getsize(file_path)
+            if file_size == 0:
+                raise UploadRejected(400, "Uploaded file is empty")
+
+            content_hash = sha256.hexdigest()
+            file_path = self._store_content_addressed(temp_path, content_hash)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
 
         document = Document(
             filename=file.filename,
             file_path=file_path,
             file_type=file.content_type or "application/pdf",
             file_size=file_size,
+            content_hash=content_hash,
             status=DocumentStatus.UPLOADED
         )
 
@@ -39,29 +97,96 @@ class DocumentService:
         self.db.commit()
         self.db.refresh(document)
 
+        self._reuse_prior_extraction(document)
+
         return document
 
-    def process_document(self, document_id: int) -> Optional[Document]:
-        """Extract text and loan data from document"""
+    def _store_content_addressed(self, temp_path: str, content_hash: str) -> str:
+        """Move an uploaded temp file to UPLOAD_DIR/<hash[:2]>/<hash>.pdf"""
+        directory = os.path.join(settings.UPLOAD_DIR, content_hash[:2])
+        os.makedirs(directory, exist_ok=True)
+        file_path = os.path.join(directory, f"{content_hash}.pdf")
+
+        if not os.path.exists(file_path):
+            os.replace(temp_path, file_path)
+
+        return file_path
+
+    def _find_prior_extraction(self, document: Document) -> Optional[Document]:
+        """Find an earlier completed document with the same content"""
+        if not document.content_hash:
+            return None
+
+        return self.db.query(Document).filter(
+            Document.content_hash == document.content_hash,
+            Document.id != document.id,
+            Document.status == DocumentStatus.COMPLETED
+        ).order_by(Document.id).first()
+
+    def _reuse_prior_extraction(self, document: Document) -> bool:
+        """
+        Copy extracted text, loan and covenants from a document with the same hash
+
+        Returns:
+            True if a prior extraction was reused
+        """
+        source = self._find_prior_extraction(document)
+        if not source:
+            return False
+
+        document.extracted_text = source.extracted_text
+        document.page_count = source.page_count
+        document.page_offsets = source.page_offsets
+        document.source_document_id = source.id
+
+        for source_loan in self.db.query(Loan).filter(Loan.document_id == source.id).all():
+            loan_data = source_loan.raw_extracted_data or {}
+            loan = self._create_loan_from_data(document.id, loan_data)
+            self.db.add(loan)
+
+            for cov_data in loan_data.get("covenants") or []:
+                self.db.add(self._create_covenant_from_data(loan, cov_data))
+
+        document.status = DocumentStatus.COMPLETED
+        document.error_message = None
+        self.db.commit()
+        self.db.refresh(document)
+
+        return True
+
+    def process_document(self, document_id: int, raise_errors: bool = False) -> Optional[Document]:
+        """
+        Extract text and loan data from document
+
+        On an error the document is marked FAILED with the message. With
+        raise_errors the error is then re-raised, so the job worker can
+        retry transient failures (AI or PDF errors) up to JOB_MAX_ATTEMPTS;
+        AI errors are raised rather than falling back to regex extraction.
+        """
         document = self.db.query(Document).filter(Document.id == document_id).first()
         if not document:
             return None
 
         try:
+            if self._reuse_prior_extraction(document):
+                return document
+
             document.status = DocumentStatus.PROCESSING
             self.db.commit()
 
-            extracted_text = self.pdf_extractor.extract_text(document.file_path)
+            extraction = self.pdf_extractor.extract_text_with_timings(
+                document.file_path, raise_errors=raise_errors
+            )
+            extracted_text = extraction.text if extraction else None
 
             if not extracted_text:
-                document.status = DocumentStatus.FAILED
-                document.error_message = "Failed to extract text from PDF"
-                self.db.commit()
-                return document
+                raise ValueError("Failed to extract text from PDF")
 
             document.extracted_text = extracted_text
+            document.page_count = extraction.page_count
+            document.page_offsets = extraction.page_offsets
 
-            loan_data = self.ai_extractor.extract_loan_data(extracted_text)
+            loan_data = self.ai_extractor.extract_loan_data(extracted_text, raise_errors=raise_errors)
 
             loan = self._create_loan_from_data(document.id, loan_data)
             self.db.add(loan)
@@ -78,9 +203,13 @@ class DocumentService:
             return document
 
         except Exception as e:
+            # Drop a partially added loan so a retry does not duplicate it
+            self.db.rollback()
             document.status = DocumentStatus.FAILED
             document.error_message = str(e)
             self.db.commit()
+            if raise_errors:
+                raise
             return document
 
     def _create_loan_from_data(self, document_id: int, data: dict) -> Loan:
@@ -111,7 +240,7 @@ class DocumentService:
             covenant_type = CovenantType.FINANCIAL
 
         return Covenant(
-            loan_id=loan.id,
+            loan=loan,
             covenant_type=covenant_type,
             covenant_name=data.get("covenant_name", "Unknown"),
             description=data.get("description"),
@@ -126,6 +255,52 @@ class DocumentService:
         """Get document by ID"""
         return self.db.query(Document).filter(Document.id == document_id).first()
 
-    def list_documents(self, skip: int = 0, limit: int = 100):
-        """List all documents"""
-        return self.db.query(Document).offset(skip).limit(limit).all()
+    def list_documents(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Query:
+        """
+        Query for one page of documents (see app.core.pagination)
+
+        extracted_text is deferred, so listing never loads it.
+        """
+        return paginate(self.db.query(Document), Document.created_at, Document.id, skip, limit, cursor)
+
+    def get_text_pages(self, document_id: int, start_page: int = 1, pages: int = 10) -> Optional[dict]:
+        """
+        Extracted text of pages start_page .. start_page + pages - 1
+
+        Only that slice is read from the database (SQL substr), so serving a
+        page range never loads the whole agreement. Slices of consecutive
+        ranges concatenate back to the full text. Documents extracted before
+        page offsets were recorded are served as a single page.
+
+        Returns:
+            Page range and text, or None if the document does not exist
+        """
+        row = self.db.query(Document.page_offsets, func.length(Document.extracted_text)).filter(
+            Document.id == document_id
+        ).first()
+        if row is None:
+            return None
+
+        offsets = row[0] or [0]
+        length = row[1] or 0
+        total_pages = len(offsets)
+        start_page = max(1, start_page)
+        end_page = min(total_pages, start_page + pages - 1)
+
+        text = ""
+        if start_page <= end_page:
+            begin = offsets[start_page - 1]
+            end = offsets[end_page] if end_page < total_pages else length
+            if end > begin:
+                text = self.db.query(func.substr(Document.extracted_text, begin + 1, end - begin)).filter(
+                    Document.id == document_id
+                ).scalar()
+
+        return {
+            "document_id": document_id,
+            "page_count": total_pages,
+            "start_page": start_page,
+            "end_page": max(end_page, start_page - 1),
+            "next_page": end_page + 1 if end_page < total_pages else None,
+            "text": text
+        }
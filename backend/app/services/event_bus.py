@@ -0,0 +1,182 @@
+"""Publish/subscribe of proposal change events, streamed to the UI as server-sent events"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+from app.core.config import settings
+
+# Messages waiting per subscriber; a slow client loses the oldest (it refetches anyway)
+SUBSCRIBER_QUEUE_SIZE = 100
+
+class EventBus:
+    """
+    In-process pub/sub keyed by proposal id
+
+    Subscribers are asyncio queues owned by SSE responses. publish() may be
+    called from any thread (sync endpoints run in the threadpool), so
+    messages are handed to each subscriber's event loop thread-safely.
+    Events are notifications that something changed, not the changed data;
+    clients refetch what they show.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, proposal_id: int) -> asyncio.Queue:
+        """Queue of messages for a proposal; call from the subscriber's event loop"""
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(proposal_id, set()).add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, proposal_id: int, queue: asyncio.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(proposal_id, set())
+            subscribers.difference_update({s for s in subscribers if s[1] is queue})
+            if not subscribers:
+                self._subscribers.pop(proposal_id, None)
+
+    def subscriber_count(self, proposal_id: Optional[int] = None) -> int:
+        with self._lock:
+            if proposal_id is not None:
+                return len(self._subscribers.get(proposal_id, ()))
+            return sum(len(s) for s in self._subscribers.values())
+
+    def publish(self, proposal_id: int, event: str, data: Optional[Dict[str, Any]] = None):
+        """Notify subscribers of a proposal; never raises into the caller"""
+        self._deliver({"proposal_id": proposal_id, "event": event, "data": data or {}})
+
+    def _deliver(self, message: dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get(message["proposal_id"], ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, message)
+            except RuntimeError:
+                pass  # Loop already closed; the SSE response is gone
+
+
+def _offer(queue: asyncio.Queue, message: dict):
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(message)
+
+
+class SQLiteEventBus(EventBus):
+    """
+    EventBus shared by every API worker on a host through a SQLite file
+
+    publish() appends to an event log instead of delivering directly. Each
+    process polls the log for rows newer than the last it saw (one query
+    per EVENT_BUS_POLL_INTERVAL per process, however many clients are
+    connected) and delivers them to its local subscribers, so an event
+    published in a background task on one worker reaches tabs connected to
+    another. Rows older than EVENT_BUS_RETENTION_SECONDS are pruned.
+    """
+
+    def __init__(self, path: str = None, poll_interval: float = None):
+        super().__init__()
+        self.path = path or settings.EVENT_BUS_PATH
+        self.poll_interval = poll_interval if poll_interval is not None else settings.EVENT_BUS_POLL_INTERVAL
+        self._db_lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS proposal_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                proposal_id INTEGER NOT NULL,
+                event TEXT NOT NULL,
+                data TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_proposal_events_created_at ON proposal_events (created_at)")
+
+        # Only events published after this process started are delivered
+        self._last_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM proposal_events").fetchone()[0]
+        self._poller: Optional[threading.Thread] = None
+
+    def subscribe(self, proposal_id: int) -> asyncio.Queue:
+        queue = super().subscribe(proposal_id)
+        self._ensure_poller()
+        return queue
+
+    def publish(self, proposal_id: int, event: str, data: Optional[Dict[str, Any]] = None):
+        now = time.time()
+        try:
+            with self._db_lock:
+                self._conn.execute(
+                    "INSERT INTO proposal_events (proposal_id, event, data, created_at) VALUES (?, ?, ?, ?)",
+                    (proposal_id, event, json.dumps(data or {}), now)
+                )
+                self._conn.execute(
+                    "DELETE FROM proposal_events WHERE created_at < ?",
+                    (now - settings.EVENT_BUS_RETENTION_SECONDS,)
+                )
+        except sqlite3.Error as e:
+            print(f"Event bus publish failed: {e}")
+
+    def poll(self) -> List[dict]:
+        """Deliver log rows newer than the last poll; returns them"""
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT id, proposal_id, event, data FROM proposal_events WHERE id > ? ORDER BY id",
+                (self._last_id,)
+            ).fetchall()
+        messages = []
+        for row_id, proposal_id, event, data in rows:
+            self._last_id = row_id
+            message = {"proposal_id": proposal_id, "event": event, "data": json.loads(data)}
+            self._deliver(message)
+            messages.append(message)
+        return messages
+
+    def _ensure_poller(self):
+        with self._lock:
+            if self._poller is None or not self._poller.is_alive():
+                self._poller = threading.Thread(target=self._poll_forever, name="event-bus-poller", daemon=True)
+                self._poller.start()
+
+    def _poll_forever(self):
+        while True:
+            time.sleep(self.poll_interval)
+            if not self.subscriber_count():
+                # Skip the rows nobody here is listening for
+                with self._db_lock:
+                    self._last_id = self._conn.execute(
+                        "SELECT COALESCE(MAX(id), ?) FROM proposal_events", (self._last_id,)
+                    ).fetchone()[0]
+                continue
+            try:
+                self.poll()
+            except sqlite3.Error as e:
+                print(f"Event bus poll failed: {e}")
+
+
+def format_sse(message: dict) -> str:
+    """One server-sent event frame"""
+    return f"event: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+
+
+_event_bus: Optional[EventBus] = None
+_event_bus_lock = threading.Lock()
+
+def get_event_bus() -> EventBus:
+    """Process-wide bus selected by EVENT_BUS_BACKEND ("memory" or "sqlite")"""
+    global _event_bus
+    with _event_bus_lock:
+        if _event_bus is None:
+            _event_bus = SQLiteEventBus() if settings.EVENT_BUS_BACKEND == "sqlite" else EventBus()
+        return _event_bus
+
+def publish(proposal_id: int, event: str, data: Optional[Dict[str, Any]] = None):
+    """Publish on the process-wide bus"""
+    get_event_bus().publish(proposal_id, event, data)
@@ -0,0 +1,219 @@
+"""Durable job queue backed by the application database"""
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+from sqlalchemy import or_, and_
+from sqlalchemy.orm import Session
+from app.models.job import Job, JobStatus
+from app.core.config import settings
+
+JOB_PROCESS_DOCUMENT = "process_document"
+
+class JobQueue:
+    """Enqueue, lease and settle jobs stored in the `jobs` table
+
+    Claiming is a compare-and-set UPDATE, so any number of worker processes
+    can share the table without row locks. A running job keeps its lease by
+    heartbeating; if a worker dies, the lease expires and another worker
+    picks the job up again.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(self, job_type: str, payload: Dict[str, Any], max_attempts: int = None) -> Job:
+        """Add a job to the queue"""
+        job = Job(
+            job_type=job_type,
+            payload=payload,
+            status=JobStatus.QUEUED,
+            attempts=0,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def claim(self, worker_id: str) -> Optional[Job]:
+        """
+        Lease the oldest runnable job for this worker
+
+        Runnable means queued, or running with an expired lease (the worker
+        that held it stopped heartbeating).
+
+        Returns:
+            The leased Job, or None if the queue is empty
+        """
+        now = datetime.utcnow()
+        runnable = or_(
+            Job.status == JobStatus.QUEUED,
+            and_(Job.status == JobStatus.RUNNING, Job.lease_expires_at < now)
+        )
+
+        candidates = self.db.query(Job.id).filter(runnable).order_by(Job.id).limit(5).all()
+
+        for (job_id,) in candidates:
+            claimed = self.db.query(Job).filter(Job.id == job_id, runnable).update(
+                {
+                    Job.status: JobStatus.RUNNING,
+                    Job.locked_by: worker_id,
+                    Job.lease_expires_at: now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+                    Job.heartbeat_at: now,
+                    Job.started_at: now,
+                    Job.attempts: Job.attempts + 1
+                },
+                synchronize_session=False
+            )
+            self.db.commit()
+
+            if claimed:
+                return self.db.query(Job).filter(Job.id == job_id).first()
+
+        return None
+
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """Extend the lease on a running job. Returns False if the lease was lost."""
+        now = datetime.utcnow()
+        extended = self.db.query(Job).filter(
+            Job.id == job_id,
+            Job.locked_by == worker_id,
+            Job.status == JobStatus.RUNNING
+        ).update(
+            {
+                Job.heartbeat_at: now,
+                Job.lease_expires_at: now + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+            },
+            synchronize_session=False
+        )
+        self.db.commit()
+        return bool(extended)
+
+    def complete(self, job_id: int, worker_id: str):
+        """Mark a job as finished"""
+        self.db.query(Job).filter(Job.id == job_id, Job.locked_by == worker_id).update(
+            {
+                Job.status: JobStatus.COMPLETED,
+                Job.finished_at: datetime.utcnow(),
+                Job.lease_expires_at: None
+            },
+            synchronize_session=False
+        )
+        self.db.commit()
+
+    def fail(self, job_id: int, worker_id: str, error: str):
+        """Record a failure, re-queueing the job if it has attempts left"""
+        job = self.db.query(Job).filter(Job.id == job_id, Job.locked_by == worker_id).first()
+        if not job:
+            return
+
+        job.last_error = error
+        job.lease_expires_at = None
+        job.locked_by = None
+
+        if job.attempts >= job.max_attempts:
+            job.status = JobStatus.FAILED
+            job.finished_at = datetime.utcnow()
+        else:
+            job.status = JobStatus.QUEUED
+
+        self.db.commit()
+
+    def get_job(self, job_id: int) -> Optional[Job]:
+        """Get job by ID"""
+        return self.db.query(Job).filter(Job.id == job_id).first()
+
+
+def _process_document(db: Session, payload: Dict[str, Any]):
+    """Handler for document ingestion jobs; raises on failure so the job is retried"""
+    from app.services.document_service import DocumentService
+    DocumentService(db).process_document(payload["document_id"], raise_errors=True)
+
+
+JOB_HANDLERS: Dict[str, Callable[[Session, Dict[str, Any]], None]] = {
+    JOB_PROCESS_DOCUMENT: _process_document,
+}
+
+
+class _Heartbeat(threading.Thread):
+    """Background thread that keeps a job lease alive while its handler runs"""
+
+    def __init__(self, job_id: int, worker_id: str):
+        super().__init__(daemon=True)
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self._stop_event = threading.Event()
+
+    def run(self):
+        from app.core.database import SessionLocal
+
+        while not self._stop_event.wait(settings.JOB_HEARTBEAT_SECONDS):
+            db = SessionLocal()
+            try:
+                if not JobQueue(db).heartbeat(self.job_id, self.worker_id):
+                    print(f"Worker {self.worker_id} lost lease on job {self.job_id}")
+                    return
+            except Exception as e:
+                print(f"Heartbeat failed for job {self.job_id}: {str(e)}")
+            finally:
+                db.close()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def run_worker(worker_id: Optional[str] = None, stop_event=None):
+    """
+    Poll the queue and run jobs until stop_event is set
+
+    Args:
+        worker_id: Identifier stored on leased jobs (defaults to host:pid)
+        stop_event: threading/multiprocessing Event used to request shutdown
+    """
+    from app.core.database import SessionLocal, engine
+
+    # Connections inherited from a forked parent must not be reused
+    engine.dispose(close=False)
+
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    print(f"Ingestion worker {worker_id} started")
+
+    while not (stop_event and stop_event.is_set()):
+        db = SessionLocal()
+        try:
+            queue = JobQueue(db)
+            job = queue.claim(worker_id)
+
+            if not job:
+                db.close()
+                time.sleep(settings.JOB_POLL_INTERVAL)
+                continue
+
+            handler = JOB_HANDLERS.get(job.job_type)
+            if not handler:
+                queue.fail(job.id, worker_id, f"Unknown job type: {job.job_type}")
+                continue
+
+            heartbeat = _Heartbeat(job.id, worker_id)
+            heartbeat.start()
+            try:
+                handler(db, job.payload or {})
+                queue.complete(job.id, worker_id)
+            except Exception as e:
+                db.rollback()
+                print(f"Job {job.id} ({job.job_type}) failed: {str(e)}")
+                queue.fail(job.id, worker_id, traceback.format_exc())
+            finally:
+                heartbeat.stop()
+
+        except Exception as e:
+            print(f"Worker {worker_id} error: {str(e)}")
+            time.sleep(settings.JOB_POLL_INTERVAL)
+        finally:
+            db.close()
+
+    print(f"Ingestion worker {worker_id} stopped")
@@ -0,0 +1,220 @@
+"""Persistent cache for LLM responses shared by all AI services"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from app.core.config import settings
+
+class CachedResponse:
+    """Minimal stand-in for a Gemini response served from the cache"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class LLMCache:
+    """
+    SQLite-backed LLM response cache keyed by model name + prompt hash
+
+    Entries expire after LLM_CACHE_TTL_SECONDS. When the stored responses
+    exceed LLM_CACHE_MAX_BYTES, the least recently used entries are evicted.
+    Hit/miss counters are kept per namespace (one per service) in the same
+    file, so counts from worker processes show up in the API too.
+    """
+
+    def __init__(self, path: str = None, ttl_seconds: int = None, max_bytes: int = None):
+        self.path = path or settings.LLM_CACHE_PATH
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.LLM_CACHE_TTL_SECONDS
+        self.max_bytes = max_bytes if max_bytes is not None else settings.LLM_CACHE_MAX_BYTES
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_accessed ON llm_cache (last_accessed)")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS llm_cache_stats (
+                namespace TEXT PRIMARY KEY,
+                hits INTEGER NOT NULL DEFAULT 0,
+                misses INTEGER NOT NULL DEFAULT 0
+            )"""
+        )
+
+    @staticmethod
+    def make_key(model: str, prompt: str) -> str:
+        """Cache key for a model/prompt pair"""
+        return hashlib.sha256(f"{model}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, model: str, prompt: str, namespace: str = "default") -> Optional[str]:
+        """Return the cached response text, or None on a miss or expired entry"""
+        key = self.make_key(model, prompt)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row and now - row[1] <= self.ttl_seconds:
+                self._conn.execute("UPDATE llm_cache SET last_accessed = ? WHERE key = ?", (now, key))
+                self._record(namespace, hit=True)
+                return row[0]
+
+            if row:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._record(namespace, hit=False)
+            return None
+
+    def contains(self, model: str, prompt: str) -> bool:
+        """Check for a live entry without touching counters or LRU order"""
+        key = self.make_key(model, prompt)
+        with self._lock:
+            row = self._conn.execute("SELECT created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        return bool(row) and time.time() - row[0] <= self.ttl_seconds
+
+    def set(self, model: str, prompt: str, response: str):
+        """Store a response and evict least recently used entries if over the size limit"""
+        key = self.make_key(model, prompt)
+        now = time.time()
+        size = len(response.encode("utf-8"))
+
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO llm_cache (key, model, response, size, created_at, last_accessed)
+                VALUES (?, ?, ?, ?, ?, ?)""",
+                (key, model, response, size, now, now)
+            )
+            self._evict(now)
+
+    def delete(self, model: str, prompt: str):
+        """Drop the cached response for a model/prompt pair, e.g. one that could not be parsed"""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (self.make_key(model, prompt),))
+
+    def _evict(self, now: float):
+        """Drop expired entries, then LRU entries until under max_bytes"""
+        self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_accessed"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", victims)
+
+    def _record(self, namespace: str, hit: bool):
+        column = "hits" if hit else "misses"
+        self._conn.execute(
+            f"""INSERT INTO llm_cache_stats (namespace, {column}) VALUES (?, 1)
+            ON CONFLICT(namespace) DO UPDATE SET {column} = {column} + 1""",
+            (namespace,)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per namespace plus overall size"""
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+            rows = self._conn.execute("SELECT namespace, hits, misses FROM llm_cache_stats").fetchall()
+
+        by_namespace = {}
+        for namespace, hits, misses in rows:
+            lookups = hits + misses
+            by_namespace[namespace] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / lookups if lookups else 0.0
+            }
+
+        return {
+            "entries": entries,
+            "total_bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "by_service": by_namespace
+        }
+
+    def clear(self):
+        """Remove all cached responses and reset counters"""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.execute("DELETE FROM llm_cache_stats")
+
+
+class CachedGenerativeModel:
+    """
+    Wraps a Gemini GenerativeModel so generate_content is served from LLMCache
+
+    Only text responses are cached; anything else (including errors and
+    blocked responses) passes through untouched.
+    """
+
+    def __init__(self, model, namespace: str, cache: LLMCache):
+        self._model = model
+        self.namespace = namespace
+        self.cache = cache
+        self.model_name = getattr(model, "model_name", type(model).__name__)
+
+    def generate_content(self, prompt, **kwargs):
+        if not isinstance(prompt, str) or kwargs:
+            return self._model.generate_content(prompt, **kwargs)
+
+        cached = self.cache.get(self.model_name, prompt, self.namespace)
+        if cached is not None:
+            return CachedResponse(cached)
+
+        response = self._model.generate_content(prompt)
+        self.cache.set(self.model_name, prompt, response.text)
+        return response
+
+    def is_cached(self, prompt) -> bool:
+        """True if generate_content(prompt) would be served from the cache"""
+        return isinstance(prompt, str) and self.cache.contains(self.model_name, prompt)
+
+    def forget(self, prompt):
+        """Drop the cached response to prompt, so the next call asks the model again"""
+        if isinstance(prompt, str):
+            self.cache.delete(self.model_name, prompt)
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+def get_llm_cache() -> LLMCache:
+    """Process-wide LLMCache instance"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
+
+def with_llm_cache(model, namespace: str, enabled: bool):
+    """Return model wrapped with the shared cache if caching is enabled for this service"""
+    if not (settings.LLM_CACHE_ENABLED and enabled):
+        return model
+    return CachedGenerativeModel(model, namespace, get_llm_cache())
@@ -0,0 +1,71 @@
+"""Async adapter for the synchronous Gemini client"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from app.core.config import settings
+from app.services.rate_limiter import get_llm_rate_limiter
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Process-wide bounded pool that runs blocking LLM calls"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.LLM_MAX_CONCURRENT_CALLS,
+                thread_name_prefix="llm"
+            )
+        return _executor
+
+
+class LLMTimeoutError(Exception):
+    """Raised when an LLM call does not finish within its timeout"""
+
+
+class AsyncLLMClient:
+    """
+    Run generate_content on a bounded thread pool so async endpoints never block the event loop
+
+    All services share one pool of LLM_MAX_CONCURRENT_CALLS threads, which
+    also caps how many LLM requests the process has in flight. Calls that
+    will not be served from the LLM cache first take a token from the
+    rate limiter shared by the host (LLM_RATE_LIMIT_PER_MINUTE). Each call has
+    a timeout. If the awaiting task is cancelled or times out, its result is
+    discarded. The SDK call cannot be interrupted, so the pool thread is
+    only freed once the request returns.
+    """
+
+    def __init__(self, model, timeout: Optional[float] = None):
+        self.model = model
+        self.timeout = timeout if timeout is not None else settings.LLM_CALL_TIMEOUT_SECONDS
+
+    async def generate_content(self, prompt: str, timeout: Optional[float] = None):
+        """
+        Call the model without blocking the event loop
+
+        Args:
+            prompt: Prompt text
+            timeout: Seconds to wait once the call starts, excluding rate
+                limiter wait (defaults to the client timeout)
+
+        Returns:
+            The model response (has a .text attribute)
+
+        Raises:
+            LLMTimeoutError: If the call exceeds the timeout
+        """
+        limiter = get_llm_rate_limiter()
+        is_cached = getattr(self.model, "is_cached", None)
+        if limiter and not (is_cached and is_cached(prompt)):
+            await limiter.acquire()
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(_get_executor(), self.model.generate_content, prompt)
+
+        try:
+            return await asyncio.wait_for(future, timeout=timeout or self.timeout)
+        except asyncio.TimeoutError:
+            raise LLMTimeoutError(f"LLM call timed out after {timeout or self.timeout}s")
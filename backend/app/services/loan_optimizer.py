@@ -1,5 +1,27 @@
-from typing import List, Dict, Tuple
-from dataclasses import dataclass
+import bisect
+import heapq
+import time
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+from dataclasses import dataclass, replace
+
+# Funding shortfall accepted when the bank limits make the full target unreachable
+FUNDING_TOLERANCE = 0.99
+# Smallest share of the target each bank holds when min_banks > 1 (at most an even split)
+MIN_TICKET_SHARE = 0.05
+# Branch-and-bound nodes explored before the Lagrangian bank-count bound is built
+CARDINALITY_BOUND_AFTER_NODES = 256
+
+# Columns of the matrix returned by LoanOptimizer.sweep_scenarios
+SWEEP_METRICS = (
+    "target_amount",
+    "max_interest_rate",
+    "max_banks",
+    "funded_amount",
+    "weighted_avg_rate",
+    "number_of_banks",
+    "is_feasible",
+)
 
 @dataclass
 class QuotationData:
@@ -10,6 +32,10 @@ class QuotationData:
     offered_amount: float
     interest_rate: float
     conditions: str = ""
+    fees: Optional[dict] = None
+    early_repayment_penalty: Optional[float] = None
+    term_months: Optional[int] = None
+    all_in_rate: Optional[float] = None  # Interest plus annualized fees, see AllInCostModel
 
 @dataclass
 class OptimizationResult:
@@ -20,6 +46,9 @@ class OptimizationResult:
     number_of_banks: int
     optimization_score: float
     is_feasible: bool
+    is_optimal: bool = False  # True when the exact search finished within its time budget
+    weighted_all_in_rate: Optional[float] = None
+    concentration: float = 0.0  # Largest single-bank share of total_amount
 
 class LoanOptimizer:
     """Optimize syndicate composition to minimize interest rate while meeting loan requirements"""
@@ -30,17 +59,35 @@ class LoanOptimizer:
         target_amount: float,
         max_interest_rate: float = None,
         min_banks: int = 1,
-        max_banks: int = 10
+        max_banks: int = 10,
+        time_budget: float = 1.0,
+        use_all_in_cost: bool = False
     ) -> OptimizationResult:
         """
         Find optimal combination of banks for syndicated loan
 
+        Solves exactly with branch-and-bound (see _branch_and_bound). The
+        greedy heuristics only provide the starting incumbent. If the time
+        budget runs out, the best syndicate found so far is returned with
+        is_optimal=False.
+
+        The full target is funded whenever min_banks/max_banks allow it;
+        otherwise the largest reachable amount is funded, provided it is at
+        least 99% of the target. With min_banks > 1 every bank holds at
+        least a minimum ticket (see _min_ticket), so banks counted towards
+        min_banks carry a real share rather than a token amount.
+
         Args:
             quotations: List of bank quotations
             target_amount: Required loan amount
             max_interest_rate: Maximum acceptable weighted average rate
             min_banks: Minimum number of banks in syndicate
             max_banks: Maximum number of banks in syndicate
+            time_budget: Seconds the exact search may run
+            use_all_in_cost: Minimize the precomputed all_in_rate instead of
+                the interest rate (quotes without one fall back to their
+                interest rate). max_interest_rate still caps the interest rate:
+                quotes whose interest rate is above it are left out of the solve.
 
         Returns:
             OptimizationResult with selected banks
@@ -48,6 +95,24 @@ class LoanOptimizer:
         if not quotations:
             return self._empty_result()
 
+        if use_all_in_cost:
+            # Solve on all-in rates, then report against the original quotes. The
+            # solve cannot see the interest-rate cap, so quotes above it are left out
+            by_id = {q.id: q for q in quotations}
+            ranked = [
+                replace(q, interest_rate=q.all_in_rate if q.all_in_rate is not None else q.interest_rate)
+                for q in quotations
+                if not max_interest_rate or (q.interest_rate or 0) <= max_interest_rate
+            ]
+            result = self.optimize(ranked, target_amount, None, min_banks, max_banks, time_budget)
+            if not result.selected_quotations:
+                return result
+            result = self._build_result(
+                [(by_id[q.id], q.offered_amount) for q in result.selected_quotations],
+                result.is_optimal
+            )
+            return self._check_rate(result, max_interest_rate)
+
         # Filter out invalid quotations
         valid_quotations = [
             q for q in quotations
@@ -58,24 +123,694 @@ class LoanOptimizer:
         if not valid_quotations:
             return self._empty_result()
 
-        # Try greedy algorithm first (best rate first)
-        greedy_result = self._greedy_optimization(
-            valid_quotations, target_amount, max_interest_rate, min_banks, max_banks
+        sorted_quotes = sorted(valid_quotations, key=lambda q: (q.interest_rate, -q.offered_amount))
+        min_banks = max(1, min_banks or 1)
+        max_banks = min(max_banks or len(sorted_quotes), len(sorted_quotes))
+
+        if min_banks > max_banks:
+            return self._empty_result()
+
+        # Fund the target if the bank limits allow it, else the most they can reach
+        largest = sorted((q.offered_amount for q in sorted_quotes), reverse=True)
+        funded_amount = min(target_amount, sum(largest[:max_banks]))
+        if funded_amount < target_amount * FUNDING_TOLERANCE:
+            return self._empty_result()
+
+        ticket = self._min_ticket(funded_amount, min_banks)
+        by_id = {q.id: q for q in sorted_quotes}
+
+        # Heuristic solutions seed the search with an upper bound
+        incumbent = None
+        for heuristic in (self._greedy_optimization, self._large_amounts_first):
+            result = heuristic(valid_quotations, funded_amount, None, min_banks, max_banks)
+            if result.selected_quotations and abs(result.total_amount - funded_amount) <= 1e-6 * funded_amount:
+                selected = [(by_id[q.id], q.offered_amount) for q in result.selected_quotations]
+                if not self._meets_min_ticket(selected, ticket):
+                    continue
+                if incumbent is None or result.weighted_avg_rate < incumbent.weighted_avg_rate:
+                    incumbent = result
+
+        # Greedy ignores max_banks until it runs out of slots; rate-ordered
+        # fills restricted to large offers usually land much closer to the optimum
+        for selected in self._size_threshold_fills(sorted_quotes, funded_amount, min_banks, max_banks):
+            if not self._meets_min_ticket(selected, ticket):
+                continue
+            result = self._build_result(selected, False)
+            if incumbent is None or result.weighted_avg_rate < incumbent.weighted_avg_rate:
+                incumbent = result
+
+        allocation, is_optimal = self._branch_and_bound(
+            sorted_quotes,
+            funded_amount,
+            min_banks,
+            max_banks,
+            incumbent.weighted_avg_rate * funded_amount if incumbent else float('inf'),
+            time_budget,
+            ticket
         )
 
-        # Try alternative: largest amounts first (reduce number of banks)
-        large_first_result = self._large_amounts_first(
-            valid_quotations, target_amount, max_interest_rate, min_banks, max_banks
+        if allocation is None:
+            if incumbent is None:
+                return self._empty_result()
+            # Heuristic results carry bare copies of the quotes; rebuild from the originals
+            result = self._build_result(
+                [(by_id[q.id], q.offered_amount) for q in incumbent.selected_quotations],
+                is_optimal
+            )
+            return self._check_rate(result, max_interest_rate)
+
+        result = self._build_result(
+            [(sorted_quotes[i], amount) for i, amount in allocation],
+            is_optimal
         )
+        return self._check_rate(result, max_interest_rate)
+
+    def pareto_frontier(
+        self,
+        quotations: List[QuotationData],
+        target_amount: float,
+        min_banks: int = 1,
+        max_banks: int = 10,
+        concentration_step: float = 0.05,
+        time_budget: float = 5.0,
+        use_all_in_cost: bool = False
+    ) -> List[OptimizationResult]:
+        """
+        Non-dominated syndicates trading cost against bank count and concentration
+
+        Concentration is the largest single-bank share of the loan. The
+        frontier is built by the epsilon-constraint method: for each share
+        cap on a grid (1.0, 1.0 - step, ... down to 1/max_banks) every offer
+        is clipped to cap * target, and for each bank limit k the cheapest
+        syndicate of at most k banks is found. Clipping keeps the problem in
+        the same form, so each point is an ordinary optimize() solve.
+
+        Most solves are skipped by dominance:
+            - once the rate-ordered fill at a cap uses g banks, it is also
+              optimal for every k >= g
+            - a solve that uses fewer than k banks is that fill, so larger
+              limits are skipped
+            - if a cap is infeasible for k banks, lower caps are too
+            - a syndicate found under one cap stays optimal for lower caps
+              down to its own concentration, so those caps are skipped
+        The last two only hold with min_banks == 1. A bank that could fund
+        the whole remainder always closes, so a binding min_banks can turn
+        feasible or cheaper once a cap clips that bank.
+        The remaining points are filtered to those no other point beats
+        on all three of cost, bank count and concentration.
+
+        Args:
+            quotations: List of bank quotations
+            target_amount: Required loan amount
+            min_banks: Minimum number of banks in syndicate
+            max_banks: Maximum number of banks in syndicate
+            concentration_step: Spacing of the share-cap grid
+            time_budget: Seconds shared by all the solves
+            use_all_in_cost: Measure cost by all_in_rate (see optimize)
+
+        Returns:
+            Frontier syndicates, cheapest first
+        """
+        valid = [
+            q for q in quotations
+            if q.offered_amount and q.offered_amount > 0
+            and q.interest_rate and q.interest_rate > 0
+        ]
+        if not valid:
+            return []
+
+        def cost_rate(q: QuotationData) -> float:
+            if use_all_in_cost and q.all_in_rate is not None:
+                return q.all_in_rate
+            return q.interest_rate
+
+        valid.sort(key=lambda q: (cost_rate(q), -q.offered_amount))
+        min_banks = max(1, min_banks or 1)
+        max_banks = min(max_banks or len(valid), len(valid))
+
+        caps = []
+        cap = 1.0
+        while cap * max_banks >= 1 - 1e-9:
+            caps.append(cap)
+            cap = round(cap - concentration_step, 10)
+
+        deadline = time.perf_counter() + time_budget
+        candidates = []
+        monotone = min_banks == 1
+        # Smallest bank count still worth solving; lower caps never need fewer banks
+        first_k = min_banks
+        skip_above = float('inf')
+
+        for cap in caps:
+            if cap >= skip_above - 1e-9:
+                continue
+            limit = cap * target_amount
+            clipped = [q if q.offered_amount <= limit else replace(q, offered_amount=limit) for q in valid]
+
+            # Banks the rate-ordered fill needs at this cap
+            fill_banks = None
+            funded = 0.0
+            for count, q in enumerate(clipped, start=1):
+                funded += q.offered_amount
+                if funded >= target_amount * (1 - 1e-12):
+                    fill_banks = count
+                    break
+            if fill_banks is None:
+                break
+
+            found = []
+            k = first_k if monotone else min_banks
+            while k <= max_banks:
+                if k >= fill_banks and fill_banks >= min_banks:
+                    selected = []
+                    remaining = target_amount
+                    for q in clipped[:fill_banks]:
+                        selected.append((q, min(q.offered_amount, remaining)))
+                        remaining -= q.offered_amount
+                    found.append(self._build_result(selected, True))
+                    break
+
+                result = self.optimize(
+                    clipped,
+                    target_amount,
+                    min_banks=min_banks,
+                    max_banks=k,
+                    time_budget=max(0.0, deadline - time.perf_counter()),
+                    use_all_in_cost=use_all_in_cost
+                )
+                if not result.is_feasible or result.total_amount < target_amount * (1 - 1e-9):
+                    if monotone:
+                        first_k = k + 1
+                    k += 1
+                    continue
+
+                found.append(result)
+                # Fewer banks than allowed means the limit no longer binds
+                k = max(k, result.number_of_banks) + 1
+
+            candidates.extend(found)
+            if monotone:
+                if first_k > max_banks:
+                    break
+                # Every point found also satisfies caps down to its own concentration
+                skip_above = max((r.concentration for r in found), default=cap)
+
+        def objectives(result: OptimizationResult):
+            rate = result.weighted_all_in_rate if use_all_in_cost and result.weighted_all_in_rate is not None \
+                else result.weighted_avg_rate
+            return (round(rate, 9), result.number_of_banks, round(result.concentration, 9))
+
+        frontier = []
+        seen = set()
+        for result in sorted(candidates, key=objectives):
+            point = objectives(result)
+            if point in seen:
+                continue
+            if any(all(a <= b for a, b in zip(objectives(kept), point)) for kept in frontier):
+                continue
+            seen.add(point)
+            frontier.append(result)
+
+        return frontier
+
+    def sweep_scenarios(
+        self,
+        offered_amounts: Sequence[float],
+        interest_rates: Sequence[float],
+        target_amounts: Sequence[float],
+        max_interest_rates: Sequence[float],
+        max_banks: Sequence[int]
+    ) -> np.ndarray:
+        """
+        Evaluate many constraint scenarios against one quote book at once
+
+        Each scenario fills the target from the cheapest quotes in rate
+        order (cumulative-sum allocation), using at most max_banks banks and
+        accepting the usual 1% shortfall. All scenarios are evaluated in a
+        single vectorized pass: one sort and cumsum of the book, then a
+        searchsorted per scenario. This is the rate-ordered fill, not the
+        exact search in optimize(); when max_banks binds, the exact optimum
+        may fund the target where the fill cannot.
+
+        Args:
+            offered_amounts: Offer per quote
+            interest_rates: Rate per quote
+            target_amounts: Target per scenario
+            max_interest_rates: Weighted-average rate cap per scenario (NaN or inf for none)
+            max_banks: Bank limit per scenario
 
-        # Return better result
-        if large_first_result.is_feasible and (
-            not greedy_result.is_feasible or
-            large_first_result.weighted_avg_rate < greedy_result.weighted_avg_rate
-        ):
-            return large_first_result
+        Returns:
+            Array of shape (scenarios, len(SWEEP_METRICS)); is_feasible is 0/1
+            and rate/bank metrics are NaN/0 for infeasible scenarios
+        """
+        amounts = np.asarray(offered_amounts, dtype=float)
+        rates = np.asarray(interest_rates, dtype=float)
+        targets = np.asarray(target_amounts, dtype=float)
+        rate_caps = np.asarray(max_interest_rates, dtype=float)
+        bank_limits = np.asarray(max_banks, dtype=int)
+
+        valid = (amounts > 0) & (rates > 0)
+        amounts = amounts[valid]
+        rates = rates[valid]
+
+        metrics = np.zeros((targets.size, len(SWEEP_METRICS)))
+        metrics[:, 0] = targets
+        metrics[:, 1] = rate_caps
+        metrics[:, 2] = bank_limits
+        metrics[:, 4] = np.nan
+
+        n = amounts.size
+        if n == 0:
+            return metrics
+
+        order = np.argsort(rates, kind="stable")
+        amounts = amounts[order]
+        rates = rates[order]
+        cum_amount = np.cumsum(amounts)
+        cum_cost = np.cumsum(amounts * rates)
+
+        # Most that the cheapest max_banks quotes can fund
+        usable = np.clip(bank_limits, 1, n)
+        funded = np.minimum(targets, cum_amount[usable - 1])
+        feasible = (bank_limits >= 1) & (targets > 0) & (funded >= targets * FUNDING_TOLERANCE)
+
+        # Closing quote: first position where the cumulative amount covers funded
+        closing = np.searchsorted(cum_amount, funded * (1 - 1e-12), side="left")
+        closing = np.minimum(closing, n - 1)
+        before_amount = np.where(closing > 0, cum_amount[closing - 1], 0.0)
+        before_cost = np.where(closing > 0, cum_cost[closing - 1], 0.0)
+        cost = before_cost + rates[closing] * (funded - before_amount)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weighted_rate = cost / funded
+
+        caps = np.where(np.isnan(rate_caps), np.inf, rate_caps)
+        feasible &= weighted_rate <= caps
+
+        metrics[:, 3] = np.where(feasible, funded, 0.0)
+        metrics[:, 4] = np.where(feasible, weighted_rate, np.nan)
+        metrics[:, 5] = np.where(feasible, closing + 1, 0)
+        metrics[:, 6] = feasible
+        return metrics
+
+    @staticmethod
+    def scenario_grid(
+        target_amounts: Sequence[float],
+        max_interest_rates: Sequence[float],
+        max_banks: Sequence[int]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Flatten the cartesian product of the three axes into per-scenario arrays"""
+        grid = np.meshgrid(
+            np.asarray(target_amounts, dtype=float),
+            np.asarray(max_interest_rates, dtype=float),
+            np.asarray(max_banks, dtype=int),
+            indexing="ij"
+        )
+        return tuple(axis.ravel() for axis in grid)
+
+    def _branch_and_bound(
+        self,
+        quotes: List[QuotationData],
+        target: float,
+        min_banks: int,
+        max_banks: int,
+        best_cost: float,
+        time_budget: float,
+        ticket: float = 0.0
+    ) -> Tuple[Optional[List[Tuple[int, float]]], bool]:
+        """
+        Exact minimum-cost syndicate that funds exactly `target`
+
+        quotes must be sorted by rate. Every selected bank holds at least
+        its floor, min(ticket, offer) (see _min_ticket). For a fixed set of
+        banks the cheapest allocation gives each its floor and fills the
+        rest in rate order, so the cheaper banks are taken in full, one bank
+        takes a partial share, and the dearer ones keep their floor. With
+        no ticket this is the usual fill: all in full but the closing bank.
+        The search walks quotes in rate order and for each decides: skip,
+        take in full, or take as the partial bank; after the partial bank it
+        decides skip or take at the floor, and completes once min_banks is
+        met and the partial share lies between its floor and its offer.
+
+        Pruning:
+            - cost bound: current cost plus the fractional rate-ordered fill
+              of the remaining need (ignores bank count), via prefix sums
+            - cardinality bound: Lagrangian relaxation of the bank limit
+              (see _cardinality_bounds), which the cost bound ignores
+            - capacity bound: the largest (max_banks - used) offers left
+              must cover the remaining need
+            - once a bank can close the gap and min_banks is met, every
+              later bank is at least as expensive, so the skip branch
+              cannot improve
+            - after the partial bank, the partial share at its rate plus
+              any excess over its offer at the next bank's rate; when there
+              is no excess, the cheapest floors still needed for min_banks,
+              which also complete the node directly if the partial share
+              stays above its own floor
+
+        Returns:
+            (allocation as [(quote_index, amount)] or None if no solution
+            beat best_cost, whether the search completed)
+        """
+        n = len(quotes)
+        rates = [q.interest_rate for q in quotes]
+        caps = [q.offered_amount for q in quotes]
+        epsilon = 1e-9 * target
+        floors = [min(ticket, cap) for cap in caps]
+
+        cum_cap = [0.0]
+        cum_cost = [0.0]
+        for rate, cap in zip(rates, caps):
+            cum_cap.append(cum_cap[-1] + cap)
+            cum_cost.append(cum_cost[-1] + rate * cap)
+
+        # top_caps[i][k-1]: total of the k largest offers among quotes[i:]
+        top_caps: List[List[float]] = [[] for _ in range(n + 1)]
+        largest_desc: List[float] = []
+        for i in range(n - 1, -1, -1):
+            bisect.insort(largest_desc, -caps[i])
+            del largest_desc[max_banks:]
+            running = 0.0
+            sums = []
+            for neg_cap in largest_desc:
+                running -= neg_cap
+                sums.append(running)
+            top_caps[i] = sums
+
+        def fill_bound(i: int, need: float) -> float:
+            """Cheapest fractional cost to cover `need` from quotes[i:], or inf"""
+            j = bisect.bisect_left(cum_cap, cum_cap[i] + need - epsilon)
+            if j > n:
+                return float('inf')
+            return (cum_cost[j - 1] - cum_cost[i]) + rates[j - 1] * (need - (cum_cap[j - 1] - cum_cap[i]))
+
+        # Building the cardinality bounds costs a few milliseconds, which
+        # dominates searches the cheaper bounds already finish
+        cardinality_bounds = []
+
+        best_allocation = None
+        deadline = time.perf_counter() + time_budget
+        completed = True
+        nodes = 0
+
+        # Stack entries: (index, banks_used, funded, cost, chosen, partial).
+        # partial is -1 until the bank between full and floor is picked; its
+        # amount is then target - funded once the search stops adding banks
+        stack = [(0, 0, 0.0, 0.0, (), -1)]
+
+        while stack:
+            nodes += 1
+            if nodes % 2048 == 0 and time.perf_counter() > deadline:
+                completed = False
+                break
+            if nodes == CARDINALITY_BOUND_AFTER_NODES:
+                cardinality_bounds = self._cardinality_bounds(rates, caps, target, max_banks)
+
+            i, used, funded, cost, chosen, partial = stack.pop()
+            need = target - funded
+
+            if partial >= 0:
+                # Later banks only take their floor, which the partial bank gives up
+                if used >= min_banks and floors[partial] - epsilon <= need <= caps[partial] + epsilon:
+                    closing_cost = cost + rates[partial] * need
+                    if closing_cost < best_cost - epsilon:
+                        best_cost = closing_cost
+                        best_allocation = sorted(chosen + ((partial, need),))
+                    # Any further floor costs more than the partial bank's rate
+                    continue
+                if need < floors[partial] - epsilon:
+                    continue
+                if i >= n or used >= max_banks or n - i < min_banks - used:
+                    continue
+                excess = max(0.0, need - caps[partial])
+                if excess <= epsilon:
+                    # Each floor taken moves it from the partial rate to a dearer one;
+                    # the cheapest min_banks - used of those moves bound the completion
+                    extra = heapq.nsmallest(
+                        min_banks - used,
+                        range(i, n),
+                        key=lambda j: (rates[j] - rates[partial]) * floors[j]
+                    )
+                    completion = cost + rates[partial] * need + sum(
+                        rates[j] * floors[j] - rates[partial] * floors[j] for j in extra
+                    )
+                    if completion >= best_cost - epsilon:
+                        continue
+                    if need - sum(floors[j] for j in extra) >= floors[partial] - epsilon:
+                        best_cost = completion
+                        best_allocation = sorted(
+                            chosen + tuple((j, floors[j]) for j in extra)
+                            + ((partial, need - sum(floors[j] for j in extra)),)
+                        )
+                        continue
+                elif cost + rates[partial] * (need - excess) + rates[i] * excess >= best_cost - epsilon:
+                    continue
+                stack.append((i + 1, used, funded, cost, chosen, partial))
+                stack.append((
+                    i + 1, used + 1, funded + floors[i], cost + rates[i] * floors[i],
+                    chosen + ((i, floors[i]),), partial
+                ))
+                continue
+
+            if i >= n or used >= max_banks or n - i < min_banks - used:
+                continue
+
+            banks_left = max_banks - used
+            top = top_caps[i]
+            if top[min(banks_left, len(top)) - 1] < need - epsilon:
+                continue
+
+            if cost + fill_bound(i, need) >= best_cost - epsilon:
+                continue
+            if any(cost + bound(i, need, banks_left) >= best_cost - epsilon for bound in cardinality_bounds):
+                continue
+
+            rate = rates[i]
+            cap = caps[i]
+
+            if cap >= need - epsilon:
+                if need < floors[i] - epsilon:
+                    stack.append((i + 1, used, funded, cost, chosen, -1))
+                    continue
+                if used + 1 >= min_banks:
+                    closing_cost = cost + rate * need
+                    if closing_cost < best_cost - epsilon:
+                        best_cost = closing_cost
+                        best_allocation = list(chosen) + [(i, need)]
+                    # Any later closing bank is at least as expensive
+                    continue
+                stack.append((i + 1, used, funded, cost, chosen, -1))
+                # Take a partial share and leave later banks their floor
+                stack.append((i + 1, used + 1, funded, cost, chosen, i))
+                continue
+
+            stack.append((i + 1, used, funded, cost, chosen, -1))
+            if used + 1 < max_banks:
+                # Later floors must make up what the partial bank cannot take
+                if ticket > 0 and need - cap <= (banks_left - 1) * ticket + epsilon:
+                    stack.append((i + 1, used + 1, funded, cost, chosen, i))
+                stack.append((i + 1, used + 1, funded + cap, cost + rate * cap, chosen + ((i, cap),), -1))
+
+        return best_allocation, completed
+
+    def _size_threshold_fills(
+        self,
+        quotes: List[QuotationData],
+        target: float,
+        min_banks: int,
+        max_banks: int,
+        steps: int = 24
+    ):
+        """
+        Yield feasible rate-ordered fills that skip offers below a size threshold
+
+        quotes must be sorted by rate. A bank below the threshold is still
+        taken if it can close the remaining gap on its own.
+        """
+        epsilon = 1e-9 * target
+        caps = sorted(q.offered_amount for q in quotes)
+        thresholds = sorted({caps[(len(caps) - 1) * k // steps] for k in range(steps + 1)})
+
+        for threshold in thresholds:
+            selected = []
+            funded = 0.0
+            for quote in quotes:
+                need = target - funded
+                if need <= epsilon or len(selected) >= max_banks:
+                    break
+                if quote.offered_amount >= threshold or quote.offered_amount >= need - epsilon:
+                    amount = min(quote.offered_amount, need)
+                    selected.append((quote, amount))
+                    funded += amount
+            if target - funded <= epsilon and len(selected) >= min_banks:
+                yield selected
+
+    def _cardinality_bounds(self, rates: List[float], caps: List[float], target: float, max_banks: int):
+        """
+        Lower bounds on completion cost that respect the bank limit
+
+        Taking amount a from a bank with offer cap uses a/cap of a bank
+        slot, so for any penalty lam >= 0 the cost of covering `need` from
+        quotes[i:] with at most b banks is at least the fractional fill at
+        per-unit cost rate + lam/cap, minus lam * b. lam is tuned by ternary
+        search on the root problem, and neighbouring values cover nodes
+        deeper in the tree.
+
+        The fill order depends on lam rather than rate, so prefix sums over
+        quotes[i:] don't apply. Instead each lam gets a wavelet matrix over
+        the quotes' lam-order positions (see _suffix_fill_bound), and a bound
+        is a single descent over log n levels.
+
+        Returns:
+            Functions bound(i, need, banks_left)
+        """
+        rate_array = np.asarray(rates, dtype=float)
+        cap_array = np.asarray(caps, dtype=float)
+        if cap_array.sum() < target:
+            return []
+
+        def root_value(lam: float) -> float:
+            unit = rate_array + lam / cap_array
+            order = np.argsort(unit, kind="stable")
+            cum_cap = np.cumsum(cap_array[order])
+            cum_cost = np.cumsum(cap_array[order] * unit[order])
+            j = min(int(np.searchsorted(cum_cap, target)), len(cum_cap) - 1)
+            before_cap = cum_cap[j - 1] if j else 0.0
+            before_cost = cum_cost[j - 1] if j else 0.0
+            return before_cost + unit[order[j]] * (target - before_cap) - lam * max_banks
+
+        # The bound is concave in lam; the useful range tops out near the
+        # value of one bank slot, which cannot exceed rate * largest offer
+        low, high = 0.0, max(rates) * max(caps)
+        for _ in range(30):
+            third = (high - low) / 3
+            if root_value(low + third) < root_value(high - third):
+                low += third
+            else:
+                high -= third
+
+        best_lam = (low + high) / 2
+        if best_lam <= 0:
+            return []
+        return [self._suffix_fill_bound(rates, caps, best_lam * factor) for factor in (0.5, 1.0, 2.0)]
+
+    @staticmethod
+    def _suffix_fill_bound(rates: List[float], caps: List[float], lam: float):
+        """
+        Wavelet matrix behind one lam of _cardinality_bounds
+
+        Stores, for each quote index, the quote's position in lam order.
+        Each level keeps prefix sums of offer and cost over the quotes whose
+        current bit is 0, so "cheapest fill of need from quotes[i:] in lam
+        order" is one descent over log n levels. It is built with a handful
+        of numpy passes per level.
+        """
+        n = len(rates)
+        cap_array = np.asarray(caps, dtype=float)
+        unit = np.asarray(rates, dtype=float) + lam / cap_array
+        order = np.argsort(unit, kind="stable")
+        unit_sorted = unit[order].tolist()
+
+        values = np.empty(n, dtype=np.int64)
+        values[order] = np.arange(n)
+        level_caps = cap_array.copy()
+        level_costs = cap_array * unit
+
+        levels = max(1, (n - 1).bit_length())
+        zero_counts = []  # per level: prefix count of zero bits
+        zero_caps = []  # per level: prefix offer over zero bits
+        zero_costs = []  # per level: prefix cost over zero bits
+        zero_totals = []
+        for level in range(levels):
+            bit = (values >> (levels - 1 - level)) & 1
+            is_zero = bit == 0
+            zero_counts.append(np.concatenate(([0], np.cumsum(is_zero))).tolist())
+            zero_caps.append(np.concatenate(([0.0], np.cumsum(np.where(is_zero, level_caps, 0.0)))).tolist())
+            zero_costs.append(np.concatenate(([0.0], np.cumsum(np.where(is_zero, level_costs, 0.0)))).tolist())
+            zero_totals.append(int(is_zero.sum()))
+
+            # Stable partition: zero bits first, as the next level sees them
+            regroup = np.argsort(bit, kind="stable")
+            values = values[regroup]
+            level_caps = level_caps[regroup]
+            level_costs = level_costs[regroup]
+
+        suffix_caps = np.concatenate((np.cumsum(cap_array[::-1])[::-1], [0.0])).tolist()
+
+        def bound(i: int, need: float, banks_left: int) -> float:
+            if suffix_caps[i] < need:
+                return float('inf')
+            total = 0.0
+            value = 0
+            lo, hi = i, n
+            for level in range(levels):
+                counts = zero_counts[level]
+                caps_at = zero_caps[level]
+                zeros_lo, zeros_hi = counts[lo], counts[hi]
+                left_cap = caps_at[hi] - caps_at[lo]
+                if left_cap >= need:
+                    lo, hi = zeros_lo, zeros_hi
+                else:
+                    need -= left_cap
+                    costs_at = zero_costs[level]
+                    total += costs_at[hi] - costs_at[lo]
+                    offset = zero_totals[level]
+                    lo, hi = offset + lo - zeros_lo, offset + hi - zeros_hi
+                    value |= 1 << (levels - 1 - level)
+            return total + unit_sorted[value] * need - lam * banks_left
+
+        return bound
+
+    @staticmethod
+    def _min_ticket(target: float, min_banks: int) -> float:
+        """
+        Smallest amount a bank holds, short of its whole offer
+
+        Without a floor, min_banks could be met by banks holding an
+        arbitrarily small amount, and the cheapest such syndicate does not
+        exist. Only applies when min_banks > 1.
+        """
+        if min_banks <= 1:
+            return 0.0
+        return min(MIN_TICKET_SHARE * target, target / min_banks)
+
+    @staticmethod
+    def _meets_min_ticket(selected: List[Tuple[QuotationData, float]], ticket: float) -> bool:
+        """Whether every (quote, amount) pair holds at least min(ticket, offer)"""
+        return all(amount >= min(ticket, q.offered_amount) * (1 - 1e-9) for q, amount in selected)
+
+    def _build_result(self, selected: List[Tuple[QuotationData, float]], is_optimal: bool) -> OptimizationResult:
+        """Build an OptimizationResult from (quote, allocated amount) pairs"""
+        total_amount = sum(amt for _, amt in selected)
+        weighted_rate = sum(q.interest_rate * amt for q, amt in selected) / total_amount
+
+        weighted_all_in = None
+        if any(q.all_in_rate is not None for q, _ in selected):
+            weighted_all_in = sum(
+                (q.all_in_rate if q.all_in_rate is not None else q.interest_rate) * amt
+                for q, amt in selected
+            ) / total_amount
+
+        return OptimizationResult(
+            selected_quotations=[
+                replace(q, offered_amount=amt)  # Use allocated amount
+                for q, amt in selected
+            ],
+            total_amount=total_amount,
+            weighted_avg_rate=weighted_rate,
+            number_of_banks=len(selected),
+            optimization_score=(weighted_all_in or weighted_rate) + len(selected) * 0.01,
+            is_feasible=True,
+            is_optimal=is_optimal,
+            weighted_all_in_rate=weighted_all_in,
+            concentration=max(amt for _, amt in selected) / total_amount
+        )
 
-        return greedy_result
+    def _check_rate(self, result: OptimizationResult, max_rate: Optional[float]) -> OptimizationResult:
+        """Flag the result infeasible if it breaks the weighted-average rate cap"""
+        if max_rate and result.weighted_avg_rate > max_rate:
+            result.is_feasible = False
+        return result
 
     def _greedy_optimization(
         self,
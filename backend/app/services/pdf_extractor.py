@@ -1,5 +1,72 @@
+import os
+import threading
+import time
 import PyPDF2
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+
+@dataclass
+class PageTiming:
+    """Extraction time for a single page"""
+    page_number: int  # 1-based
+    seconds: float
+    characters: int
+
+@dataclass
+class ExtractionResult:
+    """Text extracted from a PDF along with per-page timings"""
+    text: str
+    page_count: int
+    parallel: bool
+    total_seconds: float
+    page_timings: List[PageTiming] = field(default_factory=list)
+    page_offsets: List[int] = field(default_factory=list)  # Start of each page in text
+
+    def slowest_pages(self, n: int = 5) -> List[PageTiming]:
+        """Return the n slowest pages, slowest first"""
+        return sorted(self.page_timings, key=lambda p: p.seconds, reverse=True)[:n]
+
+
+def _extract_page_range(file_path: str, start: int, end: int) -> List[Tuple[int, str, float]]:
+    """
+    Extract pages [start, end) from a PDF
+
+    Runs inside pool processes, so it opens its own reader rather than
+    sharing one across processes.
+
+    Returns:
+        List of (page_index, text, seconds) tuples
+    """
+    results = []
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for page_index in range(start, end):
+            page_start = time.perf_counter()
+            page_text = pdf_reader.pages[page_index].extract_text() or ""
+            results.append((page_index, page_text, time.perf_counter() - page_start))
+    return results
+
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+def _get_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Process pool of max_workers shared by every extraction in this process"""
+    with _pools_lock:
+        pool = _pools.get(max_workers)
+        if pool is None:
+            pool = _pools[max_workers] = ProcessPoolExecutor(max_workers=max_workers)
+        return pool
+
+def _default_workers() -> int:
+    """PDF_EXTRACT_WORKERS, else this process's share of the CPUs among the ingestion workers"""
+    if settings.PDF_EXTRACT_WORKERS:
+        return settings.PDF_EXTRACT_WORKERS
+    return max(1, (os.cpu_count() or 1) // max(1, settings.INGEST_WORKERS))
+
 
 class PDFExtractor:
     """Extract text content from PDF documents"""
@@ -9,27 +76,121 @@ class PDFExtractor:
         """
         Extract text from a PDF file
 
+        Large files are split across a process pool; see extract_text_with_timings.
+
         Args:
             file_path: Path to the PDF file
 
         Returns:
             Extracted text as string, or None if extraction fails
         """
+        result = PDFExtractor.extract_text_with_timings(file_path)
+        return result.text if result else None
+
+    @staticmethod
+    def extract_text_with_timings(
+        file_path: str,
+        max_workers: Optional[int] = None,
+        min_pages_for_parallel: Optional[int] = None,
+        raise_errors: bool = False
+    ) -> Optional[ExtractionResult]:
+        """
+        Extract text page-parallel and report how long each page took
+
+        Page ranges are farmed out to a process pool shared by every
+        extraction in the process, and the pieces are joined in page order
+        with a single join. Files below min_pages_for_parallel pages are
+        extracted serially, where handing pages to the pool would dominate.
+
+        Args:
+            file_path: Path to the PDF file
+            max_workers: Pool size (defaults to settings.PDF_EXTRACT_WORKERS, else
+                CPU count divided by settings.INGEST_WORKERS)
+            min_pages_for_parallel: Page count below which extraction stays serial
+            raise_errors: Re-raise extraction errors instead of returning None
+
+        Returns:
+            ExtractionResult, or None if extraction fails
+        """
+        if min_pages_for_parallel is None:
+            min_pages_for_parallel = settings.PDF_PARALLEL_MIN_PAGES
+        max_workers = max_workers or _default_workers()
+
+        started = time.perf_counter()
+
         try:
             with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
+                page_count = len(PyPDF2.PdfReader(file).pages)
 
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text() + "\n"
+            parallel = max_workers > 1 and page_count >= min_pages_for_parallel
 
-                return text.strip()
+            if parallel:
+                page_results = PDFExtractor._extract_parallel(file_path, page_count, max_workers)
+            else:
+                page_results = _extract_page_range(file_path, 0, page_count)
 
         except Exception as e:
             print(f"Error extracting text from PDF: {str(e)}")
+            if raise_errors:
+                raise
             return None
 
+        page_results.sort(key=lambda r: r[0])
+
+        joined = "\n".join(text for _, text, _ in page_results)
+        text = joined.strip()
+        # Where each page starts in the stripped text
+        leading = len(joined) - len(joined.lstrip())
+        page_offsets = []
+        position = 0
+        for _, page_text, _ in page_results:
+            page_offsets.append(min(max(position - leading, 0), len(text)))
+            position += len(page_text) + 1
+
+        result = ExtractionResult(
+            text=text,
+            page_count=page_count,
+            parallel=parallel,
+            total_seconds=time.perf_counter() - started,
+            page_timings=[
+                PageTiming(page_number=index + 1, seconds=seconds, characters=len(text))
+                for index, text, seconds in page_results
+            ],
+            page_offsets=page_offsets
+        )
+
+        slow_pages = [p for p in result.page_timings if p.seconds >= settings.PDF_SLOW_PAGE_SECONDS]
+        if slow_pages:
+            pages = ", ".join(f"{p.page_number} ({p.seconds:.2f}s)" for p in slow_pages)
+            print(f"Slow PDF pages in {os.path.basename(file_path)}: {pages}")
+
+        return result
+
+    @staticmethod
+    def _extract_parallel(file_path: str, page_count: int, max_workers: int) -> List[Tuple[int, str, float]]:
+        """Split the page range into contiguous chunks and extract them in the shared process pool"""
+        # A few chunks per worker so one slow page range doesn't leave the pool idle
+        chunk_count = min(page_count, max_workers * 4)
+        chunk_size = -(-page_count // chunk_count)
+        ranges = [(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+
+        # One pool per process: a pool per file would start a full set of
+        # processes for every concurrent extraction and oversubscribe the host
+        pool = _get_pool(max_workers)
+        page_results = []
+        try:
+            futures = [pool.submit(_extract_page_range, file_path, start, end) for start, end in ranges]
+            for future in futures:
+                page_results.extend(future.result())
+        except BrokenProcessPool:
+            # A crashed worker breaks the pool for good; the next extraction starts a new one
+            with _pools_lock:
+                if _pools.get(max_workers) is pool:
+                    del _pools[max_workers]
+            raise
+
+        return page_results
+
     @staticmethod
     def get_metadata(file_path: str) -> dict:
         """Extract metadata from PDF"""
@@ -1,6 +1,8 @@
 from typing import Dict, Any
 from datetime import datetime
 from app.core.config import settings
+from app.services.llm_cache import with_llm_cache
+from app.services.llm_client import AsyncLLMClient
 import google.generativeai as genai
 
 class PitchGenerator:
@@ -9,7 +11,12 @@ class PitchGenerator:
     def __init__(self):
         if settings.GEMINI_API_KEY:
             genai.configure(api_key=settings.GEMINI_API_KEY)
-            self.client = genai.GenerativeModel('gemini-1.5-flash')
+            self.client = with_llm_cache(
+                genai.GenerativeModel('gemini-1.5-flash'),
+                "pitch_generator",
+                settings.LLM_CACHE_PITCH_GENERATOR
+            )
+            self.llm = AsyncLLMClient(self.client)
         else:
             self.client = None
 
@@ -106,7 +113,7 @@ Make it professional, compelling, and data-driven. Use markdown formatting.
 Return ONLY the pitch content in markdown format, starting with "# Syndicated Loan Proposal".
 """
 
-            response = self.client.generate_content(prompt)
+            response = await self.llm.generate_content(prompt)
             full_pitch = response.text
 
             # Parse sections from the generated pitch
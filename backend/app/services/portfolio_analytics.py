@@ -0,0 +1,67 @@
+"""Portfolio totals served from the materialized portfolio_summary table"""
+from typing import Dict, List
+from sqlalchemy.orm import Session
+from app.models.covenant import CovenantStatus
+from app.models.portfolio_summary import (
+    DOCUMENT_DIMENSION, LOAN_DIMENSIONS, NO_VALUE, STATUS_COLUMNS,
+    PortfolioSummary, refresh_portfolio_summary
+)
+from app.schemas.analytics import PortfolioAnalytics, PortfolioGroup
+
+class PortfolioAnalyticsService:
+    """
+    Read and rebuild the portfolio summary
+
+    The summary is kept current as loans, covenants and documents are
+    written (see app/models/portfolio_summary.py), so reading it is one
+    query over a table with a row per currency, facility type, governing
+    law, agent bank and document status, however large the portfolio.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def portfolio(self) -> PortfolioAnalytics:
+        rows = self.db.query(PortfolioSummary).all()
+
+        groups: Dict[str, List[PortfolioGroup]] = {dimension: [] for dimension in LOAN_DIMENSIONS}
+        documents_by_status: Dict[str, int] = {}
+        for row in rows:
+            if row.dimension == DOCUMENT_DIMENSION:
+                documents_by_status[row.key] = row.document_count
+            elif row.dimension in groups:
+                groups[row.dimension].append(PortfolioGroup(
+                    key=None if row.key == NO_VALUE else row.key,
+                    loan_count=row.loan_count,
+                    total_amount=row.total_amount,
+                    covenant_count=row.covenant_count,
+                    covenant_status={
+                        status.value: getattr(row, column) for status, column in STATUS_COLUMNS.items()
+                    }
+                ))
+        for dimension_groups in groups.values():
+            dimension_groups.sort(key=lambda g: (-g.loan_count, g.key or ""))
+
+        # Every loan has exactly one currency row, so portfolio totals sum those
+        by_currency = groups["currency"]
+        covenant_status = {
+            status.value: sum(g.covenant_status[status.value] for g in by_currency)
+            for status in STATUS_COLUMNS
+        }
+        return PortfolioAnalytics(
+            total_documents=sum(documents_by_status.values()),
+            documents_by_status=documents_by_status,
+            total_loans=sum(g.loan_count for g in by_currency),
+            total_covenants=sum(g.covenant_count for g in by_currency),
+            covenant_status=covenant_status,
+            at_risk_covenants=covenant_status[CovenantStatus.WARNING.value] + covenant_status[CovenantStatus.BREACH.value],
+            by_currency=by_currency,
+            by_facility_type=groups["facility_type"],
+            by_governing_law=groups["governing_law"],
+            by_agent_bank=groups["agent_bank"],
+        )
+
+    def rebuild(self):
+        """Recompute every row, e.g. after writes that bypassed the ORM"""
+        refresh_portfolio_summary(self.db.connection())
+        self.db.commit()
@@ -1,9 +1,12 @@
 """AI-powered quotation generator - simulates bank responses using Gemini"""
+import asyncio
 import json
 import re
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
 from app.core.config import settings
+from app.services.llm_cache import with_llm_cache
+from app.services.llm_client import AsyncLLMClient
 import google.generativeai as genai
 
 class QuotationGenerator:
@@ -12,7 +15,12 @@ class QuotationGenerator:
     def __init__(self):
         if settings.GEMINI_API_KEY:
             genai.configure(api_key=settings.GEMINI_API_KEY)
-            self.client = genai.GenerativeModel('gemini-1.5-flash')
+            self.client = with_llm_cache(
+                genai.GenerativeModel('gemini-1.5-flash'),
+                "quotation_generator",
+                settings.LLM_CACHE_QUOTATION_GENERATOR
+            )
+            self.llm = AsyncLLMClient(self.client)
         else:
             self.client = None
 
@@ -107,7 +115,7 @@ Return your response as JSON:
 Be realistic and professional. Return ONLY the JSON, no other text.
 """
 
-            response = self.client.generate_content(prompt)
+            response = await self.llm.generate_content(prompt)
             quotation_data = self._parse_json_from_text(response.text)
 
             # Validate and enhance
@@ -138,10 +146,15 @@ Be realistic and professional. Return ONLY the JSON, no other text.
         loan_proposal: Dict[str, Any],
         client_research: Dict[str, Any]
     ) -> List[Dict[str, Any]]:
-        """Generate quotations from multiple banks"""
-        quotations = []
+        """
+        Generate quotations from multiple banks concurrently
+
+        At most QUOTATION_FANOUT_CONCURRENCY requests run at once. Results are
+        returned in the same order as banks.
+        """
+        semaphore = asyncio.Semaphore(settings.QUOTATION_FANOUT_CONCURRENCY)
 
-        for bank in banks:
+        async def generate_for_bank(bank: Dict[str, Any]) -> Dict[str, Any]:
             bank_profile = {
                 'bank_type': bank.get('bank_type'),
                 'headquarters_country': bank.get('headquarters_country'),
@@ -154,20 +167,21 @@ Be realistic and professional. Return ONLY the JSON, no other text.
                 'contact_email': bank.get('contact_email')
             }
 
-            quotation = await self.generate_quotation(
-                bank.get('name'),
-                bank_profile,
-                loan_proposal,
-                client_research
-            )
+            async with semaphore:
+                quotation = await self.generate_quotation(
+                    bank.get('name'),
+                    bank_profile,
+                    loan_proposal,
+                    client_research
+                )
 
-            quotations.append({
+            return {
                 'bank_id': bank.get('id'),
                 'bank_name': bank.get('name'),
                 **quotation
-            })
+            }
 
-        return quotations
+        return list(await asyncio.gather(*(generate_for_bank(bank) for bank in banks)))
 
     def _parse_json_from_text(self, text: str) -> Dict:
         """Extract JSON from AI response"""
@@ -0,0 +1,171 @@
+"""Rate-ordered quote book with O(log n) updates and fill queries"""
+import random
+from typing import Dict, Iterator, List, Optional, Tuple
+from app.services.loan_optimizer import QuotationData
+
+class _Node:
+    __slots__ = ("key", "quote", "rate", "priority", "left", "right", "size", "amount", "cost")
+
+    def __init__(self, quote: QuotationData, rate: float):
+        self.key = (rate, -quote.offered_amount, quote.id)
+        self.quote = quote
+        self.rate = rate
+        self.priority = random.random()
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+        self.size = 1
+        self.amount = quote.offered_amount
+        self.cost = quote.offered_amount * rate
+
+    def update(self):
+        """Recompute subtree totals from the children"""
+        self.size = 1
+        self.amount = self.quote.offered_amount
+        self.cost = self.quote.offered_amount * self.rate
+        for child in (self.left, self.right):
+            if child:
+                self.size += child.size
+                self.amount += child.amount
+                self.cost += child.cost
+
+
+def _split(node: Optional[_Node], key) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """Split into (keys < key, keys >= key)"""
+    if node is None:
+        return None, None
+    if node.key < key:
+        node.right, right = _split(node.right, key)
+        node.update()
+        return node, right
+    left, node.left = _split(node.left, key)
+    node.update()
+    return left, node
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    """Merge two treaps where every key in left is below every key in right"""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.update()
+        return left
+    right.left = _merge(left, right.left)
+    right.update()
+    return right
+
+
+class QuoteBook:
+    """
+    Quotes kept in (rate, -amount) order in a treap with subtree totals
+
+    Every node carries the offered amount and amount * rate of its subtree,
+    so inserting, changing or withdrawing a quote and finding where a
+    rate-ordered fill of a target closes are all O(log n). Listing the
+    filled quotes is O(log n + banks).
+
+    With use_all_in_cost the book is ordered and costed by each quote's
+    precomputed all_in_rate instead of its interest rate.
+    """
+
+    def __init__(self, quotes: Optional[List[QuotationData]] = None, use_all_in_cost: bool = False):
+        self._root: Optional[_Node] = None
+        self._nodes: Dict[int, _Node] = {}
+        self.use_all_in_cost = use_all_in_cost
+        for quote in quotes or []:
+            self.upsert(quote)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, quote_id: int) -> bool:
+        return quote_id in self._nodes
+
+    @property
+    def total_amount(self) -> float:
+        return self._root.amount if self._root else 0.0
+
+    def upsert(self, quote: QuotationData):
+        """Insert a quote, or replace the quote with the same id"""
+        self.remove(quote.id)
+        rate = quote.interest_rate
+        if self.use_all_in_cost and quote.all_in_rate is not None:
+            rate = quote.all_in_rate
+        node = _Node(quote, rate)
+        left, right = _split(self._root, node.key)
+        self._root = _merge(_merge(left, node), right)
+        self._nodes[quote.id] = node
+
+    def remove(self, quote_id: int) -> bool:
+        """Withdraw a quote; returns False if it was not in the book"""
+        node = self._nodes.pop(quote_id, None)
+        if node is None:
+            return False
+        left, rest = _split(self._root, node.key)
+        _, right = _split(rest, (node.key[0], node.key[1], node.key[2] + 1))
+        self._root = _merge(left, right)
+        return True
+
+    def quotes(self) -> Iterator[QuotationData]:
+        """All quotes in rate order"""
+        stack = []
+        node = self._root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.quote
+            node = node.right
+
+    def fill_position(self, target: float) -> Optional[Tuple[int, float, float]]:
+        """
+        Where a rate-ordered fill of target closes
+
+        Returns:
+            (number of banks, amount taken from the closing quote, total
+            cost) or None if the book cannot cover target
+        """
+        if target <= 0 or self.total_amount < target * (1 - 1e-12):
+            return None
+
+        node = self._root
+        rank = 0
+        amount_before = 0.0
+        cost_before = 0.0
+        while node:
+            left_amount = node.left.amount if node.left else 0.0
+            if node.left and amount_before + left_amount >= target * (1 - 1e-12):
+                node = node.left
+                continue
+
+            rank += node.left.size if node.left else 0
+            amount_before += left_amount
+            cost_before += node.left.cost if node.left else 0.0
+
+            if amount_before + node.quote.offered_amount >= target * (1 - 1e-12) or node.right is None:
+                closing_amount = min(node.quote.offered_amount, target - amount_before)
+                return rank + 1, closing_amount, cost_before + node.rate * closing_amount
+
+            rank += 1
+            amount_before += node.quote.offered_amount
+            cost_before += node.quote.offered_amount * node.rate
+            node = node.right
+
+        return None
+
+    def fill(self, target: float) -> Optional[List[Tuple[QuotationData, float]]]:
+        """Rate-ordered fill of target as (quote, amount) pairs, or None if the book is too small"""
+        position = self.fill_position(target)
+        if position is None:
+            return None
+
+        banks, closing_amount, _ = position
+        selected = []
+        for quote in self.quotes():
+            if len(selected) == banks - 1:
+                selected.append((quote, closing_amount))
+                break
+            selected.append((quote, quote.offered_amount))
+        return selected
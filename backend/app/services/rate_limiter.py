@@ -0,0 +1,136 @@
+"""Token-bucket rate limiting for outbound LLM calls"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+from app.core.config import settings
+
+class TokenBucket:
+    """
+    Token bucket that refills at `rate` tokens per second up to `capacity`
+
+    acquire() reserves a token immediately under a thread lock and then
+    sleeps until that token is due. Because the bucket holds no asyncio
+    primitives, one instance can be shared by every event loop and thread
+    in the process (API loop, asyncio.run in workers, pool threads).
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    async def acquire(self):
+        """Wait until a token is available"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """
+    TokenBucket whose state lives in a SQLite file, shared by every process on a host
+
+    The API process and each ingestion worker reserve tokens from the same
+    row, so together they stay within one quota instead of one quota each.
+    A reservation is one short write transaction, but it may wait for
+    another process's lock, so acquire() makes it in a worker thread. If
+    the file cannot be used, the process falls back to its own in-memory
+    bucket.
+    """
+
+    def __init__(self, rate: float, capacity: float, path: str = None, name: str = "llm"):
+        super().__init__(rate, capacity)
+        self.path = path or settings.LLM_RATE_LIMIT_PATH
+        self.name = name
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS token_buckets (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL
+            )"""
+        )
+
+    def _reserve(self) -> float:
+        try:
+            with self._lock:
+                now = time.time()
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    row = self._conn.execute(
+                        "SELECT tokens, updated FROM token_buckets WHERE name = ?", (self.name,)
+                    ).fetchone()
+                    if row is None:
+                        tokens, updated = self.capacity, now
+                    else:
+                        tokens = min(self.capacity, row[0] + max(0.0, now - row[1]) * self.rate)
+                        updated = max(now, row[1])
+                    tokens -= 1
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO token_buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                        (self.name, tokens, updated)
+                    )
+                    self._conn.execute("COMMIT")
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error as e:
+            print(f"Shared rate limiter unavailable, limiting this process only: {e}")
+            return super()._reserve()
+
+        if tokens >= 0:
+            return 0.0
+        return -tokens / self.rate
+
+    async def acquire(self):
+        """Wait until a token is available, reserving it in a worker thread"""
+        wait = await asyncio.to_thread(self._reserve)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+_llm_bucket: Optional[TokenBucket] = None
+_llm_bucket_lock = threading.Lock()
+
+def get_llm_rate_limiter() -> Optional[TokenBucket]:
+    """
+    Bucket sized to the Gemini quota, or None if limiting is disabled
+
+    With LLM_RATE_LIMIT_BACKEND "sqlite" (the default) every process on the
+    host draws from one bucket in LLM_RATE_LIMIT_PATH; with "memory" each
+    process has its own, so the host total is the quota times the number of
+    processes.
+    """
+    global _llm_bucket
+    if not settings.LLM_RATE_LIMIT_PER_MINUTE:
+        return None
+
+    with _llm_bucket_lock:
+        if _llm_bucket is None:
+            bucket = SQLiteTokenBucket if settings.LLM_RATE_LIMIT_BACKEND == "sqlite" else TokenBucket
+            _llm_bucket = bucket(
+                rate=settings.LLM_RATE_LIMIT_PER_MINUTE / 60.0,
+                capacity=settings.LLM_RATE_LIMIT_BURST
+            )
+        return _llm_bucket
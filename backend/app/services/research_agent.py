@@ -1,10 +1,18 @@
+import asyncio
 import json
 import re
-from typing import Dict, Any, Optional
-from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
 from app.core.config import settings
+from app.models.client_research import CompanyResearchCache
+from app.services.llm_cache import with_llm_cache
+from app.services.llm_client import AsyncLLMClient
 import google.generativeai as genai
 
+# Research runs in progress, keyed by (event loop id, company key)
+_inflight_research: Dict[tuple, asyncio.Task] = {}
+
 class ResearchAgent:
     """AI-powered research agent with internet search capabilities"""
 
@@ -12,10 +20,15 @@ class ResearchAgent:
         if settings.GEMINI_API_KEY:
             genai.configure(api_key=settings.GEMINI_API_KEY)
             # Use Gemini Pro for research (has Google Search grounding)
-            self.client = genai.GenerativeModel(
-                'gemini-1.5-flash',
-                tools='google_search_retrieval'
+            self.client = with_llm_cache(
+                genai.GenerativeModel(
+                    'gemini-1.5-flash',
+                    tools='google_search_retrieval'
+                ),
+                "research_agent",
+                settings.LLM_CACHE_RESEARCH_AGENT
             )
+            self.llm = AsyncLLMClient(self.client)
         else:
             self.client = None
 
@@ -39,11 +52,59 @@ class ResearchAgent:
         if not self.client:
             return self._generate_mock_research(company_name)
 
-        try:
-            research_data = {}
+        company_key = self._company_key(company_name, company_website)
+
+        cached = self._load_cached_research(company_key)
+        if cached is None:
+            # Concurrent requests for the same company share one research run
+            loop = asyncio.get_running_loop()
+            inflight_key = (id(loop), company_key)
+            task = _inflight_research.get(inflight_key)
+            if task is None:
+                task = loop.create_task(self._research_and_cache(company_key, company_name))
+                _inflight_research[inflight_key] = task
+                task.add_done_callback(lambda _: _inflight_research.pop(inflight_key, None))
+
+            try:
+                cached = await asyncio.shield(task)
+            except Exception as e:
+                print(f"Research failed: {str(e)}")
+                return self._generate_mock_research(company_name)
+
+        research = dict(cached)
+        research["industry_sector"] = industry
+        research["researched_at"] = datetime.fromisoformat(research["researched_at"])
+        return research
+
+    async def _research_and_cache(self, company_key: str, company_name: str) -> Dict[str, Any]:
+        """
+        Run the research prompts and store the combined result in the company cache
+
+        Research where no section parsed (an LLM error or unusable answers)
+        is returned but not cached, so the next request tries again instead
+        of reusing it for RESEARCH_CACHE_TTL_SECONDS.
+        """
+        research, parsed = await self._run_research(company_name)
+        if parsed:
+            self._store_cached_research(company_key, company_name, research)
+        else:
+            print(f"Research for {company_name} returned no usable sections; not caching")
+        return research
+
+    async def _run_research(self, company_name: str) -> Tuple[Dict[str, Any], bool]:
+        """
+        Run the overview, financial and risk prompts concurrently
 
-            # 1. Company Overview Research
-            overview_prompt = f"""Research the company "{company_name}" and provide:
+        A response that does not parse is dropped from the LLM response
+        cache, so a retry asks the model again.
+
+        Returns:
+            Combined research as a JSON-serializable dict (researched_at is an
+            ISO string; industry_sector is filled in by the caller), and
+            whether any section parsed
+        """
+        # 1. Company Overview Research
+        overview_prompt = f"""Research the company "{company_name}" and provide:
 1. Company description and business model
 2. Year founded
 3. Headquarters location
@@ -63,11 +124,8 @@ Format the response as JSON with these exact keys:
     "recent_news": ["...", "..."]
 }}"""
 
-            overview_response = self.client.generate_content(overview_prompt)
-            research_data['overview'] = self._parse_json_from_text(overview_response.text)
-
-            # 2. Financial Research
-            financial_prompt = f"""Find the latest financial information for "{company_name}":
+        # 2. Financial Research
+        financial_prompt = f"""Find the latest financial information for "{company_name}":
 1. Annual revenue (latest year)
 2. Net income
 3. Total assets and liabilities
@@ -91,11 +149,8 @@ Format as JSON:
 
 If information is not available, use null."""
 
-            financial_response = self.client.generate_content(financial_prompt)
-            research_data['financial'] = self._parse_json_from_text(financial_response.text)
-
-            # 3. Risk Assessment
-            risk_prompt = f"""Analyze the credit risk for lending to "{company_name}". Consider:
+        # 3. Risk Assessment
+        risk_prompt = f"""Analyze the credit risk for lending to "{company_name}". Consider:
 1. Financial stability
 2. Industry trends
 3. Competitive position
@@ -120,40 +175,106 @@ Format as JSON:
     "sentiment_score": 0.5
 }}"""
 
-            risk_response = self.client.generate_content(risk_prompt)
-            research_data['risk_analysis'] = self._parse_json_from_text(risk_response.text)
-
-            # Combine all research
-            return {
-                "company_description": research_data['overview'].get('company_description'),
-                "founded_year": research_data['overview'].get('founded_year'),
-                "employee_count": research_data['overview'].get('employee_count'),
-                "headquarters_location": research_data['overview'].get('headquarters_location'),
-                "annual_revenue": research_data['financial'].get('annual_revenue'),
-                "net_income": research_data['financial'].get('net_income'),
-                "total_assets": research_data['financial'].get('total_assets'),
-                "total_liabilities": research_data['financial'].get('total_liabilities'),
-                "ebitda": research_data['financial'].get('ebitda'),
-                "stock_symbol": research_data['financial'].get('stock_symbol'),
-                "market_cap": research_data['financial'].get('market_cap'),
-                "credit_rating": research_data['financial'].get('credit_rating'),
-                "debt_to_equity_ratio": research_data['financial'].get('debt_to_equity'),
-                "industry_sector": industry,
-                "market_position": research_data['overview'].get('market_position'),
-                "recent_news": research_data['overview'].get('recent_news', []),
-                "sentiment_score": research_data['risk_analysis'].get('sentiment_score'),
-                "risk_assessment": research_data['risk_analysis'].get('risk_level'),
-                "strengths": research_data['risk_analysis'].get('strengths', []),
-                "weaknesses": research_data['risk_analysis'].get('weaknesses', []),
-                "opportunities": research_data['risk_analysis'].get('opportunities', []),
-                "threats": research_data['risk_analysis'].get('threats', []),
-                "data_sources": ["Google Search", "Gemini AI Analysis"],
-                "researched_at": datetime.utcnow().isoformat()
-            }
+        # The three prompts are independent, so run them together
+        overview_response, financial_response, risk_response = await asyncio.gather(
+            self.llm.generate_content(overview_prompt),
+            self.llm.generate_content(financial_prompt),
+            self.llm.generate_content(risk_prompt)
+        )
+
+        research_data = {
+            'overview': self._parse_json_from_text(overview_response.text),
+            'financial': self._parse_json_from_text(financial_response.text),
+            'risk_analysis': self._parse_json_from_text(risk_response.text)
+        }
+
+        forget = getattr(self.client, "forget", None)
+        if forget:
+            prompts = {'overview': overview_prompt, 'financial': financial_prompt, 'risk_analysis': risk_prompt}
+            for section, data in research_data.items():
+                if not data:
+                    forget(prompts[section])
+
+        # Combine all research
+        research = {
+            "company_description": research_data['overview'].get('company_description'),
+            "founded_year": research_data['overview'].get('founded_year'),
+            "employee_count": research_data['overview'].get('employee_count'),
+            "headquarters_location": research_data['overview'].get('headquarters_location'),
+            "annual_revenue": research_data['financial'].get('annual_revenue'),
+            "net_income": research_data['financial'].get('net_income'),
+            "total_assets": research_data['financial'].get('total_assets'),
+            "total_liabilities": research_data['financial'].get('total_liabilities'),
+            "ebitda": research_data['financial'].get('ebitda'),
+            "stock_symbol": research_data['financial'].get('stock_symbol'),
+            "market_cap": research_data['financial'].get('market_cap'),
+            "credit_rating": research_data['financial'].get('credit_rating'),
+            "debt_to_equity_ratio": research_data['financial'].get('debt_to_equity'),
+            "industry_sector": None,
+            "market_position": research_data['overview'].get('market_position'),
+            "recent_news": research_data['overview'].get('recent_news', []),
+            "sentiment_score": research_data['risk_analysis'].get('sentiment_score'),
+            "risk_assessment": research_data['risk_analysis'].get('risk_level'),
+            "strengths": research_data['risk_analysis'].get('strengths', []),
+            "weaknesses": research_data['risk_analysis'].get('weaknesses', []),
+            "opportunities": research_data['risk_analysis'].get('opportunities', []),
+            "threats": research_data['risk_analysis'].get('threats', []),
+            "data_sources": ["Google Search", "Gemini AI Analysis"],
+            "researched_at": datetime.utcnow().isoformat()
+        }
+        parsed = any(any(v is not None for v in data.values()) for data in research_data.values())
+        return research, parsed
+
+    @staticmethod
+    def _company_key(company_name: str, company_website: Optional[str] = None) -> str:
+        """Normalized cache key for a company"""
+        key = re.sub(r'[^a-z0-9]+', ' ', company_name.lower()).strip()
+        if company_website:
+            domain = re.sub(r'^(https?://)?(www\.)?', '', company_website.lower()).split('/')[0]
+            key = f"{key}|{domain}"
+        return key
 
+    def _load_cached_research(self, company_key: str) -> Optional[Dict[str, Any]]:
+        """Return cached research for the company if it is still fresh"""
+        from app.core.database import SessionLocal
+        db = SessionLocal()
+        try:
+            fresh_after = datetime.utcnow() - timedelta(seconds=settings.RESEARCH_CACHE_TTL_SECONDS)
+            entry = db.query(CompanyResearchCache).filter(
+                CompanyResearchCache.company_key == company_key,
+                CompanyResearchCache.researched_at >= fresh_after
+            ).first()
+            return entry.research_data if entry else None
+        finally:
+            db.close()
+
+    def _store_cached_research(self, company_key: str, company_name: str, research: Dict[str, Any]):
+        """Insert or refresh the company's cache entry"""
+        from app.core.database import SessionLocal
+        db = SessionLocal()
+        try:
+            for _ in range(2):
+                entry = db.query(CompanyResearchCache).filter(
+                    CompanyResearchCache.company_key == company_key
+                ).first()
+                if not entry:
+                    entry = CompanyResearchCache(company_key=company_key)
+                    db.add(entry)
+
+                entry.company_name = company_name
+                entry.research_data = research
+                entry.researched_at = datetime.utcnow()
+
+                try:
+                    db.commit()
+                    return
+                except IntegrityError:
+                    # Another process inserted the same company first; update theirs
+                    db.rollback()
         except Exception as e:
-            print(f"Research failed: {str(e)}")
-            return self._generate_mock_research(company_name)
+            print(f"Failed to cache research for {company_name}: {str(e)}")
+        finally:
+            db.close()
 
     def _parse_json_from_text(self, text: str) -> Dict:
         """Extract JSON from AI response"""
@@ -189,5 +310,5 @@ Format as JSON:
             "opportunities": [],
             "threats": [],
             "data_sources": ["Mock Data"],
-            "researched_at": datetime.utcnow().isoformat()
+            "researched_at": datetime.utcnow()
         }
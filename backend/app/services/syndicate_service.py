@@ -0,0 +1,332 @@
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.bank import Bank
+from app.models.loan_proposal import LoanProposal
+from app.models.quotation import Quotation, QuotationStatus
+from app.models.syndicate import Syndicate, SyndicateMember
+from app.services.all_in_cost import AllInCostModel
+from app.services.loan_optimizer import LoanOptimizer, OptimizationResult, QuotationData
+from app.services.quote_book import QuoteBook
+
+@dataclass
+class SyndicateConstraints:
+    """Constraints a proposal's syndicate is optimized under"""
+    target_amount: float
+    max_interest_rate: Optional[float] = None
+    min_banks: int = 1
+    max_banks: int = 10
+    use_all_in_cost: bool = False
+
+
+@dataclass
+class LiveSyndicate:
+    """Incremental optimizer state for one proposal"""
+    constraints: SyndicateConstraints
+    book: QuoteBook
+    allocation: Tuple[Tuple[int, float], ...] = ()  # (quotation id, amount) last persisted
+    quotation_versions: Dict[int, int] = field(default_factory=dict)  # Stored versions the book reflects
+    proposal_terms: Tuple[float, Optional[float]] = (0.0, None)  # (requested_amount, max_acceptable_rate) seen
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+# Per-process state. Each use checks it against the stored quotation
+# versions and rebuilds it from the database when another process (or a
+# write that bypassed this service) changed the proposal's quotations.
+_live_syndicates: Dict[int, LiveSyndicate] = {}
+_live_lock = threading.Lock()
+
+
+class SyndicateService:
+    """Persist optimized syndicates and keep them current as quotes arrive"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.optimizer = LoanOptimizer()
+        self.cost_model = AllInCostModel()
+
+    def responded_quotations(self, proposal_id: int) -> List[Tuple[Quotation, Bank]]:
+        """(Quotation, Bank) pairs for bank responses that carry an amount and a rate"""
+        return self.db.query(Quotation, Bank).join(Bank, Bank.id == Quotation.bank_id).filter(
+            Quotation.loan_proposal_id == proposal_id,
+            Quotation.status == QuotationStatus.RESPONDED,
+            Quotation.offered_amount.isnot(None),
+            Quotation.offered_interest_rate.isnot(None)
+        ).all()
+
+    def save_syndicate(self, proposal: LoanProposal, result: OptimizationResult, candidate: bool = False) -> Syndicate:
+        """
+        Replace the proposal's syndicate with an optimization result
+
+        The largest allocation leads. Quotations of the proposal are marked
+        selected or not to match. With candidate=True the result is stored
+        alongside the chosen syndicate as a frontier candidate instead, and
+        nothing else about the proposal changes. The caller commits.
+        """
+        if proposal.syndicate and not candidate:
+            self.db.delete(proposal.syndicate)
+            self.db.flush()
+            self.db.expire(proposal, ["syndicate"])
+
+        syndicate = Syndicate(
+            loan_proposal_id=proposal.id,
+            total_amount=result.total_amount,
+            weighted_avg_interest_rate=result.weighted_avg_rate,
+            number_of_banks=result.number_of_banks,
+            optimization_score=result.optimization_score,
+            total_fees=self._annual_fees(result),
+            concentration=result.concentration,
+            is_optimized=True,
+            is_candidate=candidate
+        )
+        self.db.add(syndicate)
+
+        lead = max(result.selected_quotations, key=lambda q: q.offered_amount)
+        for selected in result.selected_quotations:
+            syndicate.members.append(SyndicateMember(
+                bank_id=selected.bank_id,
+                quotation_id=selected.id,
+                allocated_amount=selected.offered_amount,
+                interest_rate=selected.interest_rate,
+                participation_percentage=selected.offered_amount / result.total_amount * 100,
+                role="Lead" if selected is lead else "Participant",
+                specific_conditions=selected.conditions or None
+            ))
+
+        if candidate:
+            self.db.flush()
+            return syndicate
+
+        selected_ids = {q.id for q in result.selected_quotations}
+        for quotation in proposal.quotations:
+            quotation.is_selected = quotation.id in selected_ids
+
+        self.db.flush()
+        self._remember(proposal.id, result)
+        return syndicate
+
+    def replace_candidates(self, proposal: LoanProposal, results: List[OptimizationResult]) -> List[Syndicate]:
+        """Store frontier results as the proposal's candidate syndicates, dropping older candidates"""
+        for old in self.db.query(Syndicate).filter(
+            Syndicate.loan_proposal_id == proposal.id,
+            Syndicate.is_candidate == True
+        ).all():
+            self.db.delete(old)
+        self.db.flush()
+        return [self.save_syndicate(proposal, result, candidate=True) for result in results]
+
+    def select_candidate(self, proposal: LoanProposal, candidate: Syndicate) -> Syndicate:
+        """
+        Promote a candidate to the proposal's syndicate
+
+        The previous syndicate is deleted and quotations are marked selected
+        to match. Live re-optimization continues from this allocation until
+        the next quote change. The caller commits.
+        """
+        if proposal.syndicate:
+            self.db.delete(proposal.syndicate)
+            self.db.flush()
+
+        candidate.is_candidate = False
+        selected_ids = {m.quotation_id for m in candidate.members}
+        for quotation in proposal.quotations:
+            quotation.is_selected = quotation.id in selected_ids
+
+        self.db.flush()
+        self.db.expire(proposal, ["syndicate"])
+
+        live = _live_syndicates.get(proposal.id)
+        if live is not None:
+            live.allocation = self._allocation_key_from_syndicate(candidate)
+            live.quotation_versions = self._quotation_versions(proposal.id)
+        return candidate
+
+    def set_constraints(self, proposal: LoanProposal, constraints: SyndicateConstraints):
+        """Use these constraints for live re-optimization of the proposal"""
+        live = self._live(proposal)
+        with live.lock:
+            self._sync(live, proposal)
+            if constraints.use_all_in_cost != live.book.use_all_in_cost:
+                live.book = QuoteBook(list(live.book.quotes()), constraints.use_all_in_cost)
+            live.constraints = constraints
+
+    def quotation_changed(self, quotation: Quotation) -> Optional[Syndicate]:
+        """
+        Fold one quotation change into the proposal's live syndicate
+
+        A responded quote with an amount and a rate is inserted or updated;
+        anything else is withdrawn. Both cost O(log n). Finding where the
+        rate-ordered fill closes is also O(log n). When that fill respects
+        the bank limits it is the exact optimum, because no syndicate can
+        beat filling the cheapest offers first. Only when the limits bind
+        does this fall back to a full LoanOptimizer solve over the book.
+
+        The syndicate is rewritten only if the allocation changed, and a
+        syndicate the client has approved is never touched. The caller
+        commits.
+
+        The quotation change must already be flushed. If any other
+        quotation of the proposal differs from the version the book holds,
+        the change came from another process and the book is rebuilt from
+        the database instead. A changed requested amount or rate cap on the
+        proposal replaces the target and cap in the constraints.
+
+        Returns:
+            The new syndicate if one was persisted, else None
+        """
+        proposal = quotation.loan_proposal
+        if proposal.syndicate and proposal.syndicate.is_approved_by_client:
+            return None
+
+        live = self._live(proposal)
+        with live.lock:
+            terms_changed = self._sync_terms(live, proposal)
+            versions = self._quotation_versions(proposal.id)
+            others = {i: v for i, v in versions.items() if i != quotation.id}
+            if others != {i: v for i, v in live.quotation_versions.items() if i != quotation.id}:
+                self._rebuild(live, proposal, versions)
+            else:
+                live.quotation_versions = versions
+                if self._is_quotable(quotation):
+                    live.book.upsert(self.quote_data(quotation, quotation.bank, proposal.desired_term_months))
+                elif not live.book.remove(quotation.id) and not terms_changed:
+                    return None
+
+            result = self._solve(live)
+            allocation = self._allocation_key(result)
+            if allocation == live.allocation:
+                return None
+
+        if result.is_feasible:
+            return self.save_syndicate(proposal, result)
+
+        # The saved syndicate may reference a withdrawn quote
+        if proposal.syndicate:
+            self.db.delete(proposal.syndicate)
+            for q in proposal.quotations:
+                q.is_selected = False
+            self.db.flush()
+            self.db.expire(proposal, ["syndicate"])
+        self._remember(proposal.id, result)
+        return None
+
+    def _solve(self, live: LiveSyndicate) -> OptimizationResult:
+        """Best syndicate for the live book: O(log n) fill, exact solve when bank limits bind"""
+        c = live.constraints
+        position = live.book.fill_position(c.target_amount)
+
+        # The fill is also optimal with a minimum ticket as long as the closing share meets it
+        if position and c.min_banks <= position[0] <= c.max_banks \
+                and position[1] >= self.optimizer._min_ticket(c.target_amount, c.min_banks) * (1 - 1e-9):
+            result = self.optimizer._build_result(live.book.fill(c.target_amount), True)
+            return self.optimizer._check_rate(result, c.max_interest_rate)
+
+        return self.optimizer.optimize(
+            list(live.book.quotes()),
+            c.target_amount,
+            max_interest_rate=c.max_interest_rate,
+            min_banks=c.min_banks,
+            max_banks=c.max_banks,
+            time_budget=settings.OPTIMIZER_TIME_BUDGET_SECONDS,
+            use_all_in_cost=c.use_all_in_cost
+        )
+
+    def _live(self, proposal: LoanProposal) -> LiveSyndicate:
+        """Live state for a proposal, loading its quote book on first use"""
+        with _live_lock:
+            live = _live_syndicates.get(proposal.id)
+            if live is None:
+                live = LiveSyndicate(
+                    constraints=SyndicateConstraints(
+                        target_amount=proposal.requested_amount,
+                        max_interest_rate=proposal.max_acceptable_rate
+                    ),
+                    book=QuoteBook(),
+                    proposal_terms=(proposal.requested_amount, proposal.max_acceptable_rate)
+                )
+                self._rebuild(live, proposal)
+                _live_syndicates[proposal.id] = live
+            return live
+
+    def _sync(self, live: LiveSyndicate, proposal: LoanProposal):
+        """Rebuild the book if any of the proposal's quotations changed since it was built"""
+        self._sync_terms(live, proposal)
+        versions = self._quotation_versions(proposal.id)
+        if versions != live.quotation_versions:
+            self._rebuild(live, proposal, versions)
+
+    def _sync_terms(self, live: LiveSyndicate, proposal: LoanProposal) -> bool:
+        """Follow a changed requested amount or rate cap; True if either changed"""
+        terms = (proposal.requested_amount, proposal.max_acceptable_rate)
+        if terms == live.proposal_terms:
+            return False
+        live.constraints.target_amount, live.constraints.max_interest_rate = terms
+        live.proposal_terms = terms
+        return True
+
+    def _rebuild(self, live: LiveSyndicate, proposal: LoanProposal, versions: Optional[Dict[int, int]] = None):
+        """Reload the book and persisted allocation from the database"""
+        live.book = QuoteBook([
+            self.quote_data(q, bank, proposal.desired_term_months)
+            for q, bank in self.responded_quotations(proposal.id)
+        ], live.constraints.use_all_in_cost)
+        live.allocation = self._allocation_key_from_syndicate(proposal.syndicate)
+        live.quotation_versions = versions if versions is not None else self._quotation_versions(proposal.id)
+
+    def _quotation_versions(self, proposal_id: int) -> Dict[int, int]:
+        """Stored version of every quotation of the proposal, in one query"""
+        return dict(self.db.query(Quotation.id, Quotation.version).filter(
+            Quotation.loan_proposal_id == proposal_id
+        ).all())
+
+    def _remember(self, proposal_id: int, result: OptimizationResult):
+        """Record a persisted allocation, and the quotation versions its selection flags produced"""
+        live = _live_syndicates.get(proposal_id)
+        if live is not None:
+            live.allocation = self._allocation_key(result)
+            live.quotation_versions = self._quotation_versions(proposal_id)
+
+    @staticmethod
+    def _is_quotable(quotation: Quotation) -> bool:
+        return (
+            quotation.status == QuotationStatus.RESPONDED
+            and bool(quotation.offered_amount) and quotation.offered_amount > 0
+            and bool(quotation.offered_interest_rate) and quotation.offered_interest_rate > 0
+        )
+
+    def quote_data(self, quotation: Quotation, bank: Bank, desired_term_months: Optional[int] = None) -> QuotationData:
+        """Optimizer view of a quotation, with its all-in rate precomputed"""
+        quote = QuotationData(
+            id=quotation.id,
+            bank_id=quotation.bank_id,
+            bank_name=bank.name if bank else "",
+            offered_amount=quotation.offered_amount,
+            interest_rate=quotation.offered_interest_rate,
+            conditions=quotation.conditions or "",
+            fees=quotation.fees,
+            early_repayment_penalty=quotation.early_repayment_penalty,
+            term_months=quotation.offered_term_months
+        )
+        quote.all_in_rate = self.cost_model.all_in_rate(quote, desired_term_months)
+        return quote
+
+    @staticmethod
+    def _annual_fees(result: OptimizationResult) -> Optional[float]:
+        """Yearly cost of everything but interest, in currency units"""
+        if result.weighted_all_in_rate is None:
+            return None
+        return (result.weighted_all_in_rate - result.weighted_avg_rate) / 100 * result.total_amount
+
+    @staticmethod
+    def _allocation_key(result: OptimizationResult) -> Tuple[Tuple[int, float], ...]:
+        if not result.is_feasible:
+            return ()
+        return tuple(sorted((q.id, round(q.offered_amount, 2)) for q in result.selected_quotations))
+
+    @staticmethod
+    def _allocation_key_from_syndicate(syndicate: Optional[Syndicate]) -> Tuple[Tuple[int, float], ...]:
+        if syndicate is None:
+            return ()
+        return tuple(sorted((m.quotation_id, round(m.allocated_amount, 2)) for m in syndicate.members))
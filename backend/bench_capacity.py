@@ -0,0 +1,71 @@
+"""Benchmark: bank capacity index on a large random directory
+
+Builds a CapacityIndex over random lender ticket size ranges (log-uniform
+minimums, a few lenders with no maximum) and times ticket-size and
+share-of-deal queries, checking each answer against a linear scan.
+Reports median, p99 and worst query time; with several thousand lenders
+p99 should stay under a millisecond (the worst case includes GC pauses).
+
+Usage:
+    python bench_capacity.py --banks 5000 --queries 2000
+"""
+import argparse
+import random
+import statistics
+import time
+from app.services.capacity_index import CapacityIndex
+
+def random_ranges(rng: random.Random, banks: int):
+    ranges = []
+    for bank_id in range(banks):
+        low = 10 ** rng.uniform(5, 8)
+        high = None if rng.random() < 0.02 else low * 10 ** rng.uniform(0, 2)
+        ranges.append((bank_id, low, high))
+    return ranges
+
+def linear_scan(ranges, lo: float, hi: float):
+    return {bank_id for bank_id, low, high in ranges if low <= hi and (high is None or high >= lo)}
+
+def run(banks: int, queries: int, seed: int):
+    rng = random.Random(seed)
+    ranges = random_ranges(rng, banks)
+
+    started = time.perf_counter()
+    index = CapacityIndex(ranges)
+    print(f"{banks} banks, index built in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    scenarios = {
+        "ticket size": lambda deal: (deal, deal),
+        "10% of deal": lambda deal: (0.1 * deal, deal),
+        "50% of deal": lambda deal: (0.5 * deal, deal),
+    }
+    for name, bounds in scenarios.items():
+        timings = []
+        matches = []
+        for _ in range(queries):
+            lo, hi = bounds(10 ** rng.uniform(5, 10))
+            started = time.perf_counter()
+            found = index.overlapping(lo, hi)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+            matches.append(len(found))
+            if found != linear_scan(ranges, lo, hi):
+                raise AssertionError(f"Wrong answer for [{lo}, {hi}]")
+
+        timings.sort()
+        print(
+            f"  {name:<12} median {statistics.median(timings):7.1f}us"
+            f"  p99 {timings[int(len(timings) * 0.99)]:7.1f}us"
+            f"  max {timings[-1]:7.1f}us"
+            f"  avg matches {statistics.mean(matches):.0f}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--banks", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.banks, args.queries, args.seed)
+
+if __name__ == "__main__":
+    main()
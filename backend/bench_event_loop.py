@@ -0,0 +1,73 @@
+"""Benchmark: health check latency on the event loop while pitches are generated
+
+Simulates a slow Gemini call (time.sleep) and runs several pitch generations
+concurrently with a stream of /health calls on the same event loop. Before
+AsyncLLMClient, every pitch blocked the loop for the full LLM latency.
+
+Usage:
+    python bench_event_loop.py --pitches 8 --llm-latency 2.0
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from app.main import health_check
+from app.services.pitch_generator import PitchGenerator
+from app.services.llm_client import AsyncLLMClient
+
+class _SlowResponse:
+    text = "# Syndicated Loan Proposal\n\n## Executive Summary\nBenchmark pitch."
+
+class _SlowModel:
+    """Blocking stand-in for GenerativeModel with fixed latency"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def generate_content(self, prompt):
+        time.sleep(self.latency)
+        return _SlowResponse()
+
+async def _probe_health(stop: asyncio.Event, interval: float, latencies: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        await health_check()
+        # Anything beyond the requested sleep is time the loop was unavailable
+        latencies.append((time.perf_counter() - started - interval) * 1000)
+
+async def run(pitches: int, llm_latency: float, interval: float):
+    generator = PitchGenerator()
+    generator.client = _SlowModel(llm_latency)
+    generator.llm = AsyncLLMClient(generator.client)
+
+    latencies = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe_health(stop, interval, latencies))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        generator.generate_pitch("Benchmark Corp", 100_000_000, "Refinancing", {}, "USD")
+        for _ in range(pitches)
+    ))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"Generated {pitches} pitches in {elapsed:.2f}s (LLM latency {llm_latency}s each)")
+    print(f"Health checks: {len(latencies)}")
+    print(f"  p50 delay: {statistics.median(latencies):.2f} ms")
+    print(f"  p99 delay: {p99:.2f} ms")
+    print(f"  max delay: {latencies[-1]:.2f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pitches", type=int, default=8)
+    parser.add_argument("--llm-latency", type=float, default=2.0)
+    parser.add_argument("--interval", type=float, default=0.01, help="Seconds between health checks")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.pitches, args.llm_latency, args.interval))
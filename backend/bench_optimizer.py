@@ -0,0 +1,81 @@
+"""Benchmark: exact syndicate optimizer on large random quote books
+
+Generates books of bank quotes (a mix of large tickets and small club
+participations) and solves each with LoanOptimizer, reporting solve time,
+whether the exact search finished inside its time budget, and how much the
+greedy heuristic overpays on the same book.
+
+Usage:
+    python bench_optimizer.py --quotes 500 --books 20
+"""
+import argparse
+import random
+import statistics
+import time
+from app.services.loan_optimizer import LoanOptimizer, QuotationData
+
+SCENARIOS = [
+    # (target amount, min banks, max banks)
+    (500_000_000, 4, 6),
+    (1_000_000_000, 1, 5),
+    (2_000_000_000, 3, 10),
+    (3_000_000_000, 1, 15),
+]
+
+def random_book(rng: random.Random, quotes: int):
+    book = []
+    for i in range(quotes):
+        if rng.random() < 0.5:
+            amount = rng.uniform(10_000_000, 300_000_000)
+        else:
+            amount = rng.uniform(1_000_000, 20_000_000)
+        book.append(QuotationData(
+            id=i,
+            bank_id=i,
+            bank_name=f"Bank {i}",
+            offered_amount=amount,
+            interest_rate=rng.uniform(3.0, 8.0)
+        ))
+    return book
+
+def run(quotes: int, books: int, time_budget: float, seed: int):
+    rng = random.Random(seed)
+    optimizer = LoanOptimizer()
+
+    print(f"{quotes}-quote books, {books} per scenario, time budget {time_budget}s")
+    for target, min_banks, max_banks in SCENARIOS:
+        timings = []
+        optimal = 0
+        savings = []
+
+        for _ in range(books):
+            book = random_book(rng, quotes)
+
+            started = time.perf_counter()
+            result = optimizer.optimize(book, target, min_banks=min_banks, max_banks=max_banks, time_budget=time_budget)
+            timings.append((time.perf_counter() - started) * 1000)
+            optimal += result.is_optimal
+
+            greedy = optimizer._greedy_optimization(book, target, None, min_banks, max_banks)
+            if greedy.is_feasible and result.is_feasible:
+                savings.append((greedy.weighted_avg_rate - result.weighted_avg_rate) * 100)
+
+        timings.sort()
+        print(f"\ntarget {target / 1e6:,.0f}M, {min_banks}-{max_banks} banks")
+        print(f"  solved to optimality: {optimal}/{books}")
+        print(f"  p50 solve time: {statistics.median(timings):.1f} ms")
+        print(f"  max solve time: {timings[-1]:.1f} ms")
+        if savings:
+            print(f"  saving vs greedy: {statistics.mean(savings):.1f} bps avg ({len(savings)} books where greedy was feasible)")
+        else:
+            print("  greedy found no feasible syndicate")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quotes", type=int, default=500)
+    parser.add_argument("--books", type=int, default=20)
+    parser.add_argument("--time-budget", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run(args.quotes, args.books, args.time_budget, args.seed)
@@ -0,0 +1,122 @@
+"""Multi-process check: live syndicates see quotation and proposal changes made elsewhere
+
+Seeds a proposal with a few bank responses in a temporary SQLite file.
+This process builds its live quote book through SyndicateService, then a
+second process (a separate worker, with its own per-process book) changes
+one quotation and the proposal's requested amount. When this process next
+folds in a quotation change, the syndicate it saves must equal a full
+LoanOptimizer solve over what is stored, not over its stale book. Exits
+non-zero on failure, so it can run as a CI step.
+
+Usage:
+    python check_live_syndicate.py
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models import (  # noqa: F401 - registers the remaining models
+    client_research, covenant, document, job, loan, mla_bid, pitch, portfolio_summary, syndicate
+)
+from app.models.bank import Bank
+from app.models.loan_proposal import LoanProposal
+from app.models.quotation import Quotation, QuotationStatus
+from app.services.loan_optimizer import LoanOptimizer
+from app.services.syndicate_service import SyndicateService
+
+# (offered amount, rate) of each bank response
+RESPONSES = [(40.0, 5.0), (40.0, 5.5), (40.0, 6.0), (40.0, 6.5)]
+
+def sessions(path: str):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def seed(db) -> int:
+    proposal = LoanProposal(client_name="Check", requested_amount=80.0)
+    db.add(proposal)
+    db.flush()
+    for i, (amount, rate) in enumerate(RESPONSES):
+        bank = Bank(name=f"Bank {i}", headquarters_country="UK")
+        db.add(bank)
+        db.flush()
+        db.add(Quotation(
+            loan_proposal_id=proposal.id,
+            bank_id=bank.id,
+            requested_amount=80.0,
+            offered_amount=amount,
+            offered_interest_rate=rate,
+            status=QuotationStatus.RESPONDED
+        ))
+    db.commit()
+    return proposal.id
+
+def change_quotation(db, quotation_id: int, **values):
+    """What the quotation endpoints do: commit the change, then fold it into the live syndicate"""
+    quotation = db.get(Quotation, quotation_id)
+    for name, value in values.items():
+        setattr(quotation, name, value)
+    db.commit()
+    SyndicateService(db).quotation_changed(quotation)
+    db.commit()
+
+def other_worker(path: str, proposal_id: int):
+    """Runs in a second process: make the dearest quote the cheapest and raise the requested amount"""
+    _, Session = sessions(path)
+    db = Session()
+    ids = sorted(q.id for q in db.query(Quotation).filter(Quotation.loan_proposal_id == proposal_id))
+    change_quotation(db, ids[-1], offered_interest_rate=4.0, offered_amount=60.0)
+    db.get(LoanProposal, proposal_id).requested_amount = 100.0
+    db.commit()
+    db.close()
+
+def stored_allocation(db, proposal_id: int):
+    proposal = db.get(LoanProposal, proposal_id)
+    if proposal.syndicate is None:
+        return ()
+    return tuple(sorted((m.quotation_id, round(m.allocated_amount, 2)) for m in proposal.syndicate.members))
+
+def expected_allocation(db, proposal_id: int):
+    proposal = db.get(LoanProposal, proposal_id)
+    service = SyndicateService(db)
+    quotes = [service.quote_data(q, bank) for q, bank in service.responded_quotations(proposal_id)]
+    result = LoanOptimizer().optimize(quotes, proposal.requested_amount, time_budget=5.0)
+    return tuple(sorted((q.id, round(q.offered_amount, 2)) for q in result.selected_quotations))
+
+def main() -> int:
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "check.db")
+    engine, Session = sessions(path)
+    Base.metadata.create_all(bind=engine)
+
+    db = Session()
+    proposal_id = seed(db)
+    ids = sorted(q.id for q in db.query(Quotation).filter(Quotation.loan_proposal_id == proposal_id))
+
+    # This process builds its live book
+    change_quotation(db, ids[0], offered_interest_rate=5.1)
+
+    # Another worker changes a quotation and the proposal
+    worker = multiprocessing.get_context("spawn").Process(target=other_worker, args=(path, proposal_id))
+    worker.start()
+    worker.join()
+    if worker.exitcode != 0:
+        print("FAIL  second process exited with", worker.exitcode)
+        return 1
+
+    # Back here: the next change must be folded into what is stored, not the stale book
+    db.expire_all()
+    change_quotation(db, ids[1], offered_interest_rate=5.4)
+    db.expire_all()
+
+    stored, expected = stored_allocation(db, proposal_id), expected_allocation(db, proposal_id)
+    ok = stored == expected
+    print(f"{'ok  ' if ok else 'FAIL'}  saved {stored}  optimum {expected}")
+    db.close()
+    engine.dispose()
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
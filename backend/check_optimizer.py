@@ -0,0 +1,112 @@
+"""Brute-force check: the exact optimizer matches exhaustive search on small books
+
+Generates small random quote books and, for a range of min_banks/max_banks
+limits, compares LoanOptimizer.optimize against trying every subset of
+banks. For a fixed subset the cheapest allocation gives each bank its
+minimum ticket and fills the rest in rate order. Exits non-zero on the
+first mismatch, so it can run as a CI step.
+
+Usage:
+    python check_optimizer.py --books 300
+"""
+import argparse
+import itertools
+import random
+import sys
+from app.services.loan_optimizer import FUNDING_TOLERANCE, LoanOptimizer, QuotationData
+
+def random_book(rng: random.Random, quotes: int):
+    return [
+        QuotationData(
+            id=i,
+            bank_id=i,
+            bank_name=f"Bank {i}",
+            offered_amount=rng.choice([rng.uniform(5, 100), rng.uniform(40, 150)]),
+            interest_rate=round(rng.uniform(3.0, 6.0), 2)
+        )
+        for i in range(quotes)
+    ]
+
+def subset_cost(quotes, target: float, ticket: float):
+    """Cheapest cost of funding target from exactly these quotes, or None"""
+    floors = [min(ticket, q.offered_amount) for q in quotes]
+    left = target - sum(floors)
+    if left < -1e-9 * target:
+        return None
+    cost = sum(q.interest_rate * floor for q, floor in zip(quotes, floors))
+    for q, floor in sorted(zip(quotes, floors), key=lambda pair: pair[0].interest_rate):
+        take = min(q.offered_amount - floor, max(left, 0.0))
+        cost += q.interest_rate * take
+        left -= take
+    return cost if left <= 1e-9 * target else None
+
+def brute_force(book, target: float, min_banks: int, max_banks: int):
+    """Minimum cost over every subset the bank limits allow, and the amount funded"""
+    largest = sorted((q.offered_amount for q in book), reverse=True)
+    funded = min(target, sum(largest[:max_banks]))
+    if funded < target * FUNDING_TOLERANCE:
+        return None, funded
+
+    ticket = LoanOptimizer._min_ticket(funded, min_banks)
+    best = None
+    for size in range(min_banks, max_banks + 1):
+        for subset in itertools.combinations(book, size):
+            cost = subset_cost(subset, funded, ticket)
+            if cost is not None and (best is None or cost < best):
+                best = cost
+    return best, funded
+
+def check(book, target: float, min_banks: int, max_banks: int) -> bool:
+    optimizer = LoanOptimizer()
+    result = optimizer.optimize(book, target, min_banks=min_banks, max_banks=max_banks, time_budget=5.0)
+    expected, funded = brute_force(book, target, min_banks, max_banks)
+
+    if expected is None:
+        ok = not result.is_feasible
+    else:
+        cost = result.weighted_avg_rate * result.total_amount if result.is_feasible else None
+        ticket = optimizer._min_ticket(funded, min_banks)
+        by_id = {q.id: q for q in book}
+        ok = (
+            cost is not None
+            and abs(result.total_amount - funded) <= 1e-6 * funded
+            and abs(cost - expected) <= 1e-6 * expected
+            and min_banks <= result.number_of_banks <= max_banks
+            and optimizer._meets_min_ticket([(by_id[q.id], q.offered_amount) for q in result.selected_quotations], ticket)
+        )
+
+    if not ok:
+        print(f"FAIL  target {target:.1f}, banks {min_banks}-{max_banks}, expected cost {expected}")
+        for q in book:
+            print(f"      quote {q.id}: {q.offered_amount:.2f} at {q.interest_rate}")
+        print(f"      got {[(q.id, round(q.offered_amount, 2)) for q in result.selected_quotations]}"
+              f" feasible={result.is_feasible}")
+    return ok
+
+def main(books: int, seed: int) -> int:
+    # Three equal offers that must all join: only feasible with partial shares
+    equal = [QuotationData(id=i, bank_id=i, bank_name=f"Bank {i}", offered_amount=100.0, interest_rate=5.0)
+             for i in range(3)]
+    if not check(equal, 100.0, 3, 3):
+        return 1
+
+    rng = random.Random(seed)
+    checked = 0
+    for _ in range(books):
+        book = random_book(rng, rng.randint(2, 8))
+        target = rng.uniform(20, 400)
+        for min_banks in range(1, len(book) + 1):
+            for max_banks in range(min_banks, len(book) + 1):
+                if not check(book, target, min_banks, max_banks):
+                    return 1
+                checked += 1
+
+    print(f"ok    {checked} books and bank limits match brute force")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    sys.exit(main(args.books, args.seed))
@@ -0,0 +1,172 @@
+"""Query-count check: catches N+1 regressions in the read endpoints
+
+Seeds an in-memory SQLite database with a proposal at two sizes (by
+default 40 and 80 banks), calls each endpoint function directly and counts
+the SQL statements it sends. Each call is repeated with the ETag it
+returned in If-None-Match, which must be answered 304 from one query. An
+endpoint fails if it exceeds its query budget or if its count grows with
+the number of rows. Exits non-zero on any failure, so it can run as a CI
+step.
+
+Usage:
+    python check_queries.py
+    python check_queries.py --sizes 10 40 200
+"""
+import argparse
+import sys
+from fastapi import Request, Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.core.database import Base
+from app.core.query_counter import count_queries
+from app.models import client_research, pitch, job, portfolio_summary  # noqa: F401 - registers the remaining models
+from app.models.bank import Bank
+from app.models.covenant import Covenant, CovenantType
+from app.models.document import Document
+from app.models.loan import Loan
+from app.models.loan_proposal import LoanProposal
+from app.models.mla_bid import MLABid
+from app.models.quotation import Quotation, QuotationStatus
+from app.models.syndicate import Syndicate, SyndicateMember
+from app.api.loan_proposals import get_loan_proposal
+from app.api.loans import get_loan
+from app.api.quotations import get_quotations_for_proposal
+from app.api.syndicates import get_syndicate_for_proposal, get_candidates_for_proposal
+
+# endpoint name -> most statements one call may run
+QUERY_BUDGETS = {
+    "get_loan_proposal": 2,
+    "get_quotations_for_proposal": 2,
+    "get_loan": 3,
+    "get_syndicate_for_proposal": 3,
+    "get_candidates_for_proposal": 3,
+}
+# Statements allowed for a conditional GET answered 304
+NOT_MODIFIED_BUDGET = 1
+
+def seed(db, size: int):
+    """A proposal with size banks quoting, bids, syndicates, and a loan with size covenants"""
+    proposal = LoanProposal(client_name=f"Client {size}", requested_amount=100.0 * size)
+    db.add(proposal)
+    db.flush()
+
+    quotations = []
+    for i in range(size):
+        bank = Bank(name=f"Bank {size}-{i}", headquarters_country="UK", credit_rating="A")
+        db.add(bank)
+        db.flush()
+        quotation = Quotation(
+            loan_proposal_id=proposal.id,
+            bank_id=bank.id,
+            requested_amount=100.0 * size,
+            offered_amount=100.0,
+            offered_interest_rate=4.0 + i / size,
+            status=QuotationStatus.RESPONDED
+        )
+        quotations.append(quotation)
+        db.add(MLABid(loan_proposal_id=proposal.id, organization_name=f"Arranger {i}", proposed_fee_percentage=1.0))
+    db.add_all(quotations)
+    db.flush()
+
+    for is_candidate in (False, True, True):
+        syndicate = Syndicate(
+            loan_proposal_id=proposal.id,
+            total_amount=100.0 * size,
+            weighted_avg_interest_rate=4.5,
+            number_of_banks=size,
+            is_candidate=is_candidate
+        )
+        for q in quotations:
+            syndicate.members.append(SyndicateMember(
+                bank_id=q.bank_id, quotation_id=q.id, allocated_amount=100.0, interest_rate=q.offered_interest_rate
+            ))
+        db.add(syndicate)
+
+    document = Document(filename="agreement.pdf", file_path="/tmp/agreement.pdf", file_type="pdf", file_size=1)
+    db.add(document)
+    db.flush()
+    loan = Loan(document_id=document.id, borrower_name=f"Client {size}")
+    for i in range(size):
+        loan.covenants.append(Covenant(covenant_type=CovenantType.FINANCIAL, covenant_name=f"Covenant {i}"))
+    db.add(loan)
+    db.commit()
+    return proposal.id, loan.id
+
+def make_request(etag: str = None) -> Request:
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+def measure(engine, Session, proposal_id: int, loan_id: int):
+    """Statements per endpoint: (full response, 304 response or None if it has no ETag)"""
+    calls = {
+        "get_loan_proposal": lambda db, req, resp: get_loan_proposal(proposal_id, req, resp, db),
+        "get_quotations_for_proposal": lambda db, req, resp: get_quotations_for_proposal(proposal_id, req, resp, db),
+        "get_loan": lambda db, req, resp: get_loan(loan_id, req, resp, db),
+        "get_syndicate_for_proposal": lambda db, req, resp: get_syndicate_for_proposal(proposal_id, db),
+        "get_candidates_for_proposal": lambda db, req, resp: get_candidates_for_proposal(proposal_id, db),
+    }
+    counts = {}
+    for name, call in calls.items():
+        etag = None
+        counts[name] = []
+        for attempt in range(2):
+            # A fresh session per call, as each request gets, so nothing is already loaded
+            db = Session()
+            response = Response()
+            try:
+                with count_queries(engine) as counter:
+                    result = call(db, make_request(etag), response)
+                    # Serializing touches whatever the endpoint left lazy
+                    if hasattr(result, "covenants"):
+                        list(result.covenants)
+            finally:
+                db.close()
+
+            if attempt == 0:
+                counts[name].append(counter.count)
+                etag = response.headers.get("etag")
+                if etag is None:
+                    counts[name].append(None)
+                    break
+            else:
+                not_modified = getattr(result, "status_code", None) == 304
+                counts[name].append(counter.count if not_modified else float("inf"))
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[40, 80])
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    results = {}
+    for size in args.sizes:
+        db = Session()
+        try:
+            proposal_id, loan_id = seed(db, size)
+        finally:
+            db.close()
+        results[size] = measure(engine, Session, proposal_id, loan_id)
+
+    failures = 0
+    print(f"{'endpoint':<30}" + "".join(f"{size:>8}" for size in args.sizes) + f"{'budget':>8}{'304':>8}")
+    for name, budget in QUERY_BUDGETS.items():
+        counts = [results[size][name][0] for size in args.sizes]
+        conditional = [results[size][name][1] for size in args.sizes]
+        ok = max(counts) <= budget and len(set(counts)) == 1
+        if conditional[0] is not None:
+            ok = ok and max(conditional) <= NOT_MODIFIED_BUDGET
+        failures += not ok
+        print(
+            f"{name:<30}" + "".join(f"{c:>8}" for c in counts) + f"{budget:>8}"
+            + f"{'-' if conditional[0] is None else max(conditional):>8}" + ("" if ok else "  FAIL")
+        )
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -323,7 +323,8 @@ def seed_banks():
         ),
     ]
 
-    db.bulk_save_objects(banks)
+    # add_all rather than bulk_save_objects, so the sector/region index rows are written too
+    db.add_all(banks)
     db.commit()
 
     print(f"✅ Seeded {len(banks)} EMEA banks successfully!")
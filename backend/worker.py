@@ -0,0 +1,43 @@
+"""Run document ingestion workers that consume the database job queue"""
+import argparse
+import multiprocessing
+import signal
+from app.core.config import settings
+from app.core.database import init_db
+from app.services.job_queue import run_worker
+
+def main():
+    parser = argparse.ArgumentParser(description="LoanLattice ingestion workers")
+    parser.add_argument(
+        "-n", "--workers",
+        type=int,
+        default=settings.INGEST_WORKERS,
+        help="Number of worker processes"
+    )
+    args = parser.parse_args()
+
+    init_db()
+
+    stop_event = multiprocessing.Event()
+    processes = [
+        multiprocessing.Process(target=run_worker, kwargs={"stop_event": stop_event}, daemon=False)
+        for _ in range(max(1, args.workers))
+    ]
+
+    def _shutdown(signum, frame):
+        print("Stopping workers after their current job...")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, _shutdown)
+    signal.signal(signal.SIGTERM, _shutdown)
+
+    for process in processes:
+        process.start()
+
+    print(f"Started {len(processes)} ingestion workers")
+
+    for process in processes:
+        process.join()
+
+if __name__ == "__main__":
+    main()
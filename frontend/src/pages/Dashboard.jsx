@@ -1,11 +1,11 @@
 import { useState, useEffect } from 'react'
 import { FileText, DollarSign, Calendar, Building2, AlertTriangle, TrendingUp, Loader } from 'lucide-react'
-import { loanAPI, documentAPI, covenantAPI } from '../services/api'
+import { loanAPI, documentAPI, analyticsAPI } from '../services/api'
 
 export default function Dashboard() {
   const [loans, setLoans] = useState([])
   const [documents, setDocuments] = useState([])
-  const [atRiskCovenants, setAtRiskCovenants] = useState([])
+  const [portfolio, setPortfolio] = useState(null)
   const [loading, setLoading] = useState(true)
   const [selectedLoan, setSelectedLoan] = useState(null)
 
@@ -16,14 +16,15 @@ export default function Dashboard() {
   const loadData = async () => {
     try {
       setLoading(true)
-      const [loansData, docsData, riskData] = await Promise.all([
+      // Totals come from the portfolio summary; the lists only feed the tables below
+      const [loansData, docsData, portfolioData] = await Promise.all([
         loanAPI.listLoans(),
         documentAPI.listDocuments(),
-        covenantAPI.getAtRiskCovenants()
+        analyticsAPI.getPortfolio()
       ])
       setLoans(loansData)
       setDocuments(docsData)
-      setAtRiskCovenants(riskData)
+      setPortfolio(portfolioData)
     } catch (err) {
       console.error('Error loading data:', err)
     } finally {
@@ -63,7 +64,10 @@ export default function Dashboard() {
     )
   }
 
-  const totalLoanValue = loans.reduce((sum, loan) => sum + (loan.loan_amount || 0), 0)
+  // Amounts are only added up within a currency; show the largest
+  const mainCurrency = portfolio?.by_currency
+    .filter((group) => group.key)
+    .reduce((best, group) => (!best || group.total_amount > best.total_amount ? group : best), null)
 
   return (
     <div className="px-4 py-6 sm:px-0">
@@ -85,7 +89,7 @@ export default function Dashboard() {
               <div className="ml-5 w-0 flex-1">
                 <dl>
                   <dt className="text-sm font-medium text-gray-500 truncate">Total Documents</dt>
-                  <dd className="text-lg font-semibold text-gray-900">{documents.length}</dd>
+                  <dd className="text-lg font-semibold text-gray-900">{portfolio?.total_documents ?? 0}</dd>
                 </dl>
               </div>
             </div>
@@ -101,7 +105,7 @@ export default function Dashboard() {
               <div className="ml-5 w-0 flex-1">
                 <dl>
                   <dt className="text-sm font-medium text-gray-500 truncate">Total Loans</dt>
-                  <dd className="text-lg font-semibold text-gray-900">{loans.length}</dd>
+                  <dd className="text-lg font-semibold text-gray-900">{portfolio?.total_loans ?? 0}</dd>
                 </dl>
               </div>
             </div>
@@ -118,7 +122,7 @@ export default function Dashboard() {
                 <dl>
                   <dt className="text-sm font-medium text-gray-500 truncate">Total Value</dt>
                   <dd className="text-lg font-semibold text-gray-900">
-                    {formatCurrency(totalLoanValue)}
+                    {mainCurrency ? formatCurrency(mainCurrency.total_amount, mainCurrency.key) : 'N/A'}
                   </dd>
                 </dl>
               </div>
@@ -135,7 +139,7 @@ export default function Dashboard() {
               <div className="ml-5 w-0 flex-1">
                 <dl>
                   <dt className="text-sm font-medium text-gray-500 truncate">At-Risk Covenants</dt>
-                  <dd className="text-lg font-semibold text-gray-900">{atRiskCovenants.length}</dd>
+                  <dd className="text-lg font-semibold text-gray-900">{portfolio?.at_risk_covenants ?? 0}</dd>
                 </dl>
               </div>
             </div>
@@ -17,11 +17,24 @@ export default function ProposalDetail() {
   useEffect(() => {
     loadProposal()
     loadQuotations()
-    const interval = setInterval(() => {
-      loadProposal()
-      loadQuotations()
-    }, 5000) // Refresh every 5 seconds
-    return () => clearInterval(interval)
+
+    // The server pushes an event when something changes; refetch only that part
+    const events = proposalAPI.subscribeToEvents(id)
+    let connected = false
+    events.onopen = () => {
+      // Catch up on anything missed while a dropped stream was reconnecting
+      if (connected) {
+        loadProposal()
+        loadQuotations()
+      }
+      connected = true
+    }
+    events.addEventListener('proposal', () => loadProposal())
+    events.addEventListener('research', () => loadProposal())
+    events.addEventListener('pitch', () => loadProposal())
+    events.addEventListener('quotation', () => loadQuotations())
+    events.addEventListener('syndicate', () => loadQuotations())
+    return () => events.close()
   }, [id])
 
   const loadProposal = async () => {
@@ -83,6 +83,13 @@ export const covenantAPI = {
   },
 };
 
+export const analyticsAPI = {
+  getPortfolio: async () => {
+    const response = await api.get('/api/analytics/portfolio');
+    return response.data;
+  },
+};
+
 export const proposalAPI = {
   createProposal: async (data) => {
     const response = await api.post('/api/loan-proposals/', data);
@@ -119,6 +126,11 @@ export const proposalAPI = {
     const response = await api.post(`/api/loan-proposals/${id}/pitch`);
     return response.data;
   },
+
+  // Server-sent events: "proposal", "research", "pitch", "quotation", "syndicate"
+  subscribeToEvents: (id) => {
+    return new EventSource(`${API_BASE_URL}/api/loan-proposals/${id}/events`);
+  },
 };
 
 export const bankAPI = {
@@ -141,6 +153,11 @@ export const bankAPI = {
     const response = await api.get('/api/banks/stats');
     return response.data;
   },
+
+  getRecommendations: async (proposalId, k = 10) => {
+    const response = await api.get(`/api/banks/recommendations/${proposalId}`, { params: { k } });
+    return response.data;
+  },
 };
 
 export const quotationAPI = {